@@ -0,0 +1,233 @@
+"""
+批量缩放命令行入口，不依赖 Qt，可在无界面的 Linux 渲染机上运行。
+
+用法：
+    python -m MuseLog.batch_resize 输入文件夹 输出文件夹 (--scale 50 | --width 1024 | --height 1024) [选项]
+
+进度以 JSON Lines 输出到标准输出，每行一个事件：
+    {"event": "start", ...}      任务参数
+    {"event": "scan_done", ...}  扫描结束，total 为需要处理的图片总数（增量模式下不含跳过的图片）
+    {"event": "progress", ...}   每处理完一张图片（包括失败）输出一行；done 为已处理数，
+                                 total 在 scan_done 之前为 null（边扫描边处理，总数未知），之后为总数
+    {"event": "done", ...}       汇总，status 为 ok / failed / cancelled
+    {"event": "error", ...}      参数或文件夹无效
+日志输出到标准错误。
+
+退出码：
+    0    全部成功（包括没有需要处理的图片）
+    1    有图片处理失败
+    2    参数或文件夹无效
+    130  被 Ctrl+C 取消
+    143  被 SIGTERM 取消
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import signal
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from MuseLog.batch_resize_encoders import KEEP_FORMAT, OUTPUT_FORMATS, OutputOptions
+from MuseLog.batch_resize_utils import (
+    RESIZE_POLICIES, RESIZE_POLICY_QUALITY, VARIANT_LAYOUT_FOLDER, VARIANT_LAYOUTS, BatchResizer, ResizeResult,
+    default_worker_count
+)
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_SIGINT = 130
+EXIT_SIGTERM = 143
+
+
+def _emit(event: str, **fields: Any) -> None:
+    fields = {"event": event, **fields}
+    # 默认 ASCII 转义，Windows 控制台编码下输出中文路径也不会出错
+    sys.stdout.write(json.dumps(fields) + "\n")
+    sys.stdout.flush()
+
+
+def _parse_variants(text: str) -> List[int]:
+    try:
+        values = [int(part) for part in text.replace("，", ",").split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"多尺寸格式错误: {text}")
+    if not values or any(v <= 0 for v in values):
+        raise argparse.ArgumentTypeError(f"多尺寸必须为正整数: {text}")
+    return values
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m MuseLog.batch_resize",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input", help="输入文件夹")
+    parser.add_argument("output", help="输出文件夹（不存在时自动创建）")
+    size = parser.add_mutually_exclusive_group(required=True)
+    size.add_argument("--scale", type=int, metavar="PERCENT", help="按比例缩放（百分比）")
+    size.add_argument("--width", type=int, metavar="PX", help="固定宽度，按比例计算高度")
+    size.add_argument("--height", type=int, metavar="PX", help="固定高度，按比例计算宽度")
+    parser.add_argument("--variants", type=_parse_variants, metavar="V1,V2,...",
+                        help="一次解码输出多个尺寸，数值含义与缩放模式相同，例如 100,50,25")
+    parser.add_argument("--variant-layout", choices=VARIANT_LAYOUTS, default=VARIANT_LAYOUT_FOLDER,
+                        help="多尺寸输出方式：按尺寸分文件夹或在文件名后加后缀（默认 folder）")
+    parser.add_argument("-j", "--workers", type=int, default=default_worker_count(),
+                        help="并行进程数，1 表示串行（默认 CPU 核心数 - 1）")
+    parser.add_argument("--chunk-size", type=int, default=None, help="每个进程任务包含的图片数")
+    parser.add_argument("--incremental", action="store_true", help="增量处理：跳过未变化的图片，清理源文件已删除的输出")
+    parser.add_argument("-r", "--recursive", action="store_true", help="包含子文件夹，并在输出中镜像目录结构")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB", help="只处理匹配的文件，可重复")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB", help="排除匹配的文件或目录，可重复")
+    parser.add_argument("--policy", choices=RESIZE_POLICIES, default=RESIZE_POLICY_QUALITY,
+                        help="quality 全分辨率解码；speed 缩小时先降采样解码（默认 quality）")
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default=KEEP_FORMAT,
+                        help="输出格式（默认保持原格式）")
+    parser.add_argument("--quality", type=int, choices=range(1, 101), metavar="1-100", help="JPEG / WebP / AVIF 质量 1-100")
+    parser.add_argument("--compress-level", type=int, choices=range(10), metavar="0-9", help="压缩力度 0-9")
+    parser.add_argument("--optimize", action="store_true", help="启用编码器优化")
+    parser.add_argument("--progressive", action="store_true", help="JPEG 渐进式编码")
+    parser.add_argument("--strip-metadata", action="store_true", help="去除 EXIF / ICC / 生成参数等元数据")
+    parser.add_argument("--memory-budget", type=int, metavar="MB", help="内存预算，限制同时解码的超大图片数量")
+    parser.add_argument("-v", "--verbose", action="store_true", help="在标准错误输出详细日志")
+    return parser
+
+
+def _build_resizer(args: argparse.Namespace) -> BatchResizer:
+    if args.scale is not None:
+        mode, value = "scale", args.scale
+    elif args.width is not None:
+        mode, value = "width", args.width
+    else:
+        mode, value = "height", args.height
+    if value <= 0:
+        raise ValueError("缩放参数必须为正整数")
+    output_options = OutputOptions(
+        output_format=args.format,
+        quality=args.quality,
+        compress_level=args.compress_level,
+        optimize=args.optimize,
+        progressive=args.progressive,
+        strip_metadata=args.strip_metadata,
+    )
+    kwargs: Dict[str, Any] = {}
+    if args.chunk_size:
+        kwargs["chunk_size"] = args.chunk_size
+    return BatchResizer(
+        in_folder=args.input,
+        out_folder=args.output,
+        mode=mode,
+        value=value,
+        workers=args.workers,
+        incremental=args.incremental,
+        policy=args.policy,
+        recursive=args.recursive,
+        include_patterns=args.include,
+        exclude_patterns=args.exclude,
+        output_options=output_options,
+        variants=args.variants,
+        variant_layout=args.variant_layout,
+        memory_budget_mb=args.memory_budget,
+        **kwargs,
+    )
+
+
+def _result_fields(result: ResizeResult) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {
+        "src": result.src_path,
+        "outputs": result.out_paths,
+        "ok": result.ok,
+        "src_bytes": result.src_bytes,
+        "out_bytes": result.out_bytes,
+    }
+    if result.error:
+        # 完整堆栈写入日志，JSON 中只保留最后一行异常信息
+        lines = result.error.strip().splitlines()
+        fields["error"] = lines[-1] if lines else result.error
+    return fields
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        stream=sys.stderr,
+    )
+    try:
+        resizer = _build_resizer(args)
+    except ValueError as e:
+        _emit("error", message=str(e))
+        return EXIT_USAGE
+    valid, msg = resizer.validate_folders()
+    if not valid:
+        _emit("error", message=msg)
+        return EXIT_USAGE
+
+    counts = {"processed": 0, "failed": 0}
+    received: Dict[str, int] = {}
+
+    def on_progress(idx: int, total: int, result: ResizeResult) -> None:
+        counts["processed" if result.ok else "failed"] += 1
+        _emit("progress", done=idx, total=total or None, **_result_fields(result))
+
+    def on_signal(signum, frame) -> None:
+        received.setdefault("signum", signum)
+        logging.warning("收到中断信号，等待进行中的图片完成后退出（再次中断将立即退出）")
+        resizer.cancel()
+        # 第二次中断恢复默认行为，直接结束进程
+        signal.signal(signum, signal.SIG_DFL)
+
+    resizer.progress_callback = on_progress
+    resizer.scan_callback = lambda total: _emit("scan_done", total=total)
+    signal.signal(signal.SIGINT, on_signal)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, on_signal)
+
+    _emit(
+        "start",
+        input=resizer.in_folder,
+        output=resizer.out_folder,
+        mode=resizer.mode,
+        value=resizer.value,
+        variants=resizer.variants or None,
+        workers=resizer.workers,
+        incremental=resizer.incremental,
+        recursive=resizer.recursive,
+        policy=resizer.policy,
+    )
+    started = time.perf_counter()
+    resizer.process_images()
+    elapsed = time.perf_counter() - started
+
+    if resizer.is_cancelled:
+        status = "cancelled"
+    elif counts["failed"]:
+        status = "failed"
+    else:
+        status = "ok"
+    _emit(
+        "done",
+        status=status,
+        processed=counts["processed"],
+        failed=counts["failed"],
+        skipped=resizer.skipped_count,
+        removed=resizer.removed_count,
+        bytes_in=resizer.bytes_in,
+        bytes_out=resizer.bytes_out,
+        peak_memory=resizer.peak_memory,
+        seconds=round(elapsed, 3),
+    )
+    if status == "cancelled":
+        return EXIT_SIGTERM if received.get("signum") == getattr(signal, "SIGTERM", None) else EXIT_SIGINT
+    return EXIT_FAILED if status == "failed" else EXIT_OK
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image, features
+
+# 输出格式：键 -> (Pillow 格式名, 扩展名, 显示名称)
+OUTPUT_FORMATS: Dict[str, Tuple[str, str, str]] = {
+    "png": ("PNG", ".png", "PNG"),
+    "jpeg": ("JPEG", ".jpg", "JPEG"),
+    "webp": ("WEBP", ".webp", "WebP"),
+    "avif": ("AVIF", ".avif", "AVIF"),
+}
+KEEP_FORMAT = ""
+
+# 去除元数据时需要清理的 info 键
+_METADATA_KEYS = ("exif", "icc_profile", "xmp", "XML:com.adobe.xmp", "comment", "parameters", "prompt", "workflow")
+
+# 不支持透明通道的格式，带 alpha 的图片会先与白色背景合成
+_NO_ALPHA_FORMATS = {"JPEG"}
+
+
+def _avif_available() -> bool:
+    if ".avif" in Image.registered_extensions():
+        return True
+    try:
+        # Pillow 11.2 之前需要 pillow-avif-plugin 插件，导入后自动注册
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        return False
+    return ".avif" in Image.registered_extensions()
+
+
+def available_output_formats() -> List[str]:
+    """返回当前环境可用的输出格式键（WebP/AVIF 取决于 Pillow 的编译选项与插件）。"""
+    available = ["png", "jpeg"]
+    if features.check("webp"):
+        available.append("webp")
+    if _avif_available():
+        available.append("avif")
+    return available
+
+
+def format_bytes(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+class OutputOptions:
+    """
+    输出编码参数，可在进程间传递。
+    默认值与 Pillow 默认行为一致（保持原格式、编码器默认参数、保留元数据）。
+    """
+
+    def __init__(
+        self,
+        output_format: str = KEEP_FORMAT,
+        quality: Optional[int] = None,
+        compress_level: Optional[int] = None,
+        optimize: bool = False,
+        progressive: bool = False,
+        strip_metadata: bool = False,
+    ):
+        if output_format and output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"不支持的输出格式: {output_format}")
+        self.output_format: str = output_format
+        # 1-100，作用于 JPEG / WebP / AVIF
+        self.quality: Optional[int] = quality
+        # 0-9，PNG 为 zlib 压缩级别；WebP / AVIF 映射为编码器的压缩力度
+        self.compress_level: Optional[int] = compress_level
+        self.optimize: bool = optimize
+        self.progressive: bool = progressive
+        self.strip_metadata: bool = strip_metadata
+
+    def output_extension(self, src_path: str) -> str:
+        if self.output_format:
+            return OUTPUT_FORMATS[self.output_format][1]
+        return os.path.splitext(src_path)[1]
+
+    def manifest_params(self) -> Dict[str, Any]:
+        """只记录非默认的编码参数，未调整编码参数时与旧清单保持兼容。"""
+        params: Dict[str, Any] = {}
+        if self.quality is not None:
+            params["quality"] = self.quality
+        if self.compress_level is not None:
+            params["compress_level"] = self.compress_level
+        if self.optimize:
+            params["optimize"] = True
+        if self.progressive:
+            params["progressive"] = True
+        if self.strip_metadata:
+            params["strip_metadata"] = True
+        return params
+
+    def prepare(self, image: Image.Image, pil_format: Optional[str]) -> Tuple[Image.Image, Dict[str, Any]]:
+        """根据目标格式调整图像模式并生成 save() 参数。"""
+        kwargs: Dict[str, Any] = {}
+        if pil_format in _NO_ALPHA_FORMATS and image.mode not in ("RGB", "L", "CMYK"):
+            image = _flatten_alpha(image)
+
+        if self.strip_metadata:
+            # 只去掉元数据，保留 transparency 等影响像素显示的信息
+            for key in _METADATA_KEYS:
+                image.info.pop(key, None)
+        else:
+            for key in ("exif", "icc_profile"):
+                if image.info.get(key):
+                    kwargs[key] = image.info[key]
+
+        if pil_format == "JPEG":
+            if self.quality is not None:
+                kwargs["quality"] = self.quality
+            kwargs["optimize"] = self.optimize
+            kwargs["progressive"] = self.progressive
+        elif pil_format == "PNG":
+            kwargs["optimize"] = self.optimize
+            if self.compress_level is not None:
+                kwargs["compress_level"] = self.compress_level
+        elif pil_format == "WEBP":
+            if self.quality is not None:
+                kwargs["quality"] = self.quality
+            if self.compress_level is not None:
+                kwargs["method"] = round(self.compress_level * 6 / 9)
+            elif self.optimize:
+                kwargs["method"] = 6
+        elif pil_format == "AVIF":
+            if self.quality is not None:
+                kwargs["quality"] = self.quality
+            if self.compress_level is not None:
+                # AVIF 的 speed 越小压缩越充分
+                kwargs["speed"] = max(0, 10 - self.compress_level)
+        return image, kwargs
+
+
+def _flatten_alpha(image: Image.Image) -> Image.Image:
+    rgba = image.convert("RGBA")
+    background = Image.new("RGB", rgba.size, (255, 255, 255))
+    background.paste(rgba, mask=rgba.getchannel("A"))
+    background.info = dict(image.info)
+    logging.debug("输出格式不支持透明通道，已与白色背景合成")
+    return background
@@ -0,0 +1,90 @@
+import logging
+import time
+from typing import Optional
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from MuseLog.batch_resize_utils import BatchResizer, ResizeResult
+
+# 进度信号的最短发送间隔（秒），避免大批量小图时刷屏阻塞界面事件循环
+PROGRESS_EMIT_INTERVAL = 0.1
+
+
+class BatchResizeJob(QThread):
+    """
+    在后台线程中运行 BatchResizer：
+    - 进度通过信号（跨线程自动排队）节流发送到界面线程
+    - 支持取消、暂停与继续
+    - 提供吞吐量（张/秒）与预计剩余时间
+    """
+
+    # 已处理数、总数、当前文件名、吞吐量（张/秒）、预计剩余秒数（未知时为 -1）
+    progress_changed = Signal(int, int, str, float, float)
+    # 成功数、失败数、是否被取消
+    job_finished = Signal(int, int, bool)
+
+    def __init__(self, resizer: BatchResizer, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._resizer = resizer
+        # 逐张的文字状态由界面根据节流后的进度信号生成
+        self._resizer.status_callback = None
+        self._resizer.progress_callback = self._on_progress
+        self._succeeded = 0
+        self._failed = 0
+        self._started_at = 0.0
+        self._paused_at: Optional[float] = None
+        self._paused_total = 0.0
+        self._last_emit = 0.0
+
+    @property
+    def resizer(self) -> BatchResizer:
+        return self._resizer
+
+    # ---------------------- 控制接口（界面线程调用） ----------------------
+    def cancel(self) -> None:
+        self._resizer.cancel()
+
+    def pause(self) -> None:
+        if self._paused_at is None:
+            self._paused_at = time.monotonic()
+        self._resizer.pause()
+
+    def resume(self) -> None:
+        if self._paused_at is not None:
+            self._paused_total += time.monotonic() - self._paused_at
+            self._paused_at = None
+        self._resizer.resume()
+
+    @property
+    def is_paused(self) -> bool:
+        return self._resizer.is_paused
+
+    def stop(self) -> None:
+        """取消并等待线程退出；正在写入的文件会以原子方式完成，不会残留半成品。"""
+        if self.isRunning():
+            self.cancel()
+            self.wait()
+
+    # ---------------------- 后台线程 ----------------------
+    def run(self) -> None:
+        self._started_at = time.monotonic()
+        try:
+            self._resizer.process_images()
+        except Exception:
+            logging.exception(f"批量缩放任务异常: {self._resizer.in_folder}")
+        self.job_finished.emit(self._succeeded, self._failed, self._resizer.is_cancelled)
+
+    def _on_progress(self, idx: int, total: int, result: ResizeResult) -> None:
+        if result.ok:
+            self._succeeded += 1
+        else:
+            self._failed += 1
+        now = time.monotonic()
+        # 总数未知（边扫描边处理）时 total 为 0，同样需要节流
+        if (not total or idx < total) and now - self._last_emit < PROGRESS_EMIT_INTERVAL:
+            return
+        self._last_emit = now
+        elapsed = max(now - self._started_at - self._paused_total, 1e-6)
+        throughput = idx / elapsed
+        eta = (total - idx) / throughput if total and throughput > 0 else -1.0
+        self.progress_changed.emit(idx, total, result.src_path, throughput, eta)
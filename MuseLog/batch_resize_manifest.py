@@ -0,0 +1,115 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MANIFEST_FILE_NAME = ".muselog_resize_manifest.json"
+MANIFEST_VERSION = 1
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ResizeManifest:
+    """
+    增量缩放清单，保存在输出文件夹中。
+    每条记录以源文件相对路径为键，记录源文件大小、mtime、内容哈希、缩放参数和输出文件。
+    """
+
+    def __init__(self, out_folder: str):
+        self.out_folder: str = out_folder
+        self.path: str = os.path.join(out_folder, MANIFEST_FILE_NAME)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+    def load(self) -> None:
+        self.entries = {}
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            logging.warning(f"增量清单读取失败，将全部重新处理: {self.path}", exc_info=True)
+            return
+        if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION:
+            entries = data.get("entries")
+            if isinstance(entries, dict):
+                self.entries = entries
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError:
+            logging.exception(f"增量清单写入失败: {self.path}")
+
+    def is_up_to_date(self, key: str, src_path: str, st: os.stat_result, params: Dict[str, Any]) -> bool:
+        """判断源文件与参数是否与上次输出一致；仅在 mtime 变化而大小相同时才计算哈希。"""
+        entry = self.entries.get(key)
+        if not entry or entry.get("params") != params:
+            return False
+        out_paths = self.output_paths(entry)
+        if not out_paths or not all(os.path.isfile(p) for p in out_paths):
+            return False
+        if entry.get("size") != st.st_size:
+            return False
+        if entry.get("mtime_ns") == st.st_mtime_ns:
+            return True
+        try:
+            if file_sha1(src_path) != entry.get("sha1"):
+                return False
+        except OSError:
+            return False
+        # 内容未变，只是被 touch 过：更新 mtime，下次无需再计算哈希
+        entry["mtime_ns"] = st.st_mtime_ns
+        self._dirty = True
+        return True
+
+    def record(self, key: str, st: os.stat_result, sha1: str, params: Dict[str, Any], out_paths: List[str]) -> None:
+        entry: Dict[str, Any] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha1": sha1,
+            "params": params,
+            # 输出路径相对输出文件夹保存，整个文件夹移动后清单依然有效
+            "output": os.path.relpath(out_paths[0], self.out_folder),
+        }
+        if len(out_paths) > 1:
+            # 多尺寸模式下的其他输出
+            entry["extra_outputs"] = [os.path.relpath(p, self.out_folder) for p in out_paths[1:]]
+        self.entries[key] = entry
+        self._dirty = True
+
+    def output_path(self, entry: Dict[str, Any]) -> Optional[str]:
+        output = entry.get("output")
+        if not output:
+            return None
+        return os.path.join(self.out_folder, output)
+
+    def output_paths(self, entry: Dict[str, Any]) -> List[str]:
+        first = self.output_path(entry)
+        if not first:
+            return []
+        return [first] + [os.path.join(self.out_folder, p) for p in entry.get("extra_outputs", [])]
+
+    def remove(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._dirty = True
+        return entry
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return iter(list(self.entries.items()))
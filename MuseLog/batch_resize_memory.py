@@ -0,0 +1,120 @@
+import math
+import os
+import sys
+from typing import Callable, List, Tuple
+
+from PIL import Image
+
+# 源图像素数超过该值时按条带重采样，避免一次性分配整幅中间缓冲
+STRIP_RESAMPLE_PIXELS = 32 * 1024 * 1024
+# 每个条带输出的行数
+STRIP_OUTPUT_ROWS = 256
+# LANCZOS 的采样半径（以源像素计，缩小时按缩放倍数放大）
+_LANCZOS_SUPPORT = 3.0
+
+# Pillow 内部每像素占用的字节数；RGB 等多通道模式按 4 字节对齐存储
+_MODE_BYTES = {"1": 1, "L": 1, "P": 1, "I;16": 2, "I;16B": 2, "I;16L": 2}
+
+
+def mode_bytes_per_pixel(mode: str) -> int:
+    return _MODE_BYTES.get(mode, 4)
+
+
+def estimate_resize_bytes(
+    src_path: str,
+    target_sizes: Callable[[int, int], List[Tuple[int, int]]],
+    strip_pixels: int = 0,
+) -> int:
+    """
+    只读取文件头，估算缩放一张图片所需的像素缓冲大小（target_sizes 根据源图宽高给出全部输出尺寸）：
+    源图解码缓冲 + 水平重采样的中间缓冲 + 全部输出缓冲。
+    无法识别的文件返回 0，交给实际处理时报错。
+    """
+    try:
+        with Image.open(src_path) as img:
+            width, height = img.size
+            bpp = mode_bytes_per_pixel(img.mode)
+    except Exception:
+        return 0
+    total = width * height * bpp
+    widest = 0
+    for new_w, new_h in target_sizes(width, height):
+        total += new_w * new_h * 4
+        widest = max(widest, new_w)
+    if strip_pixels and width * height > strip_pixels:
+        total += widest * min(height, STRIP_OUTPUT_ROWS * 4) * 4
+    else:
+        total += widest * height * 4
+    return total
+
+
+def resize_in_strips(img: Image.Image, size: Tuple[int, int], rows: int = STRIP_OUTPUT_ROWS) -> Image.Image:
+    """
+    按水平条带进行 LANCZOS 重采样，结果与整幅 resize 一致（仅有 ±1 的舍入差异）。
+    每个条带只裁剪所需的源行（含采样半径的余量），中间缓冲与 RGBA 预乘转换都限制在条带范围内；
+    源图本身仍需完整解码，这是 Pillow 的下限。
+    """
+    if img.mode in ("1", "P"):
+        return img.resize(size, Image.Resampling.LANCZOS)
+    width, height = img.size
+    new_w, new_h = size
+    scale = height / new_h
+    margin = math.ceil(_LANCZOS_SUPPORT * max(1.0, scale)) + 2
+    out = Image.new(img.mode, size)
+    for oy0 in range(0, new_h, rows):
+        oy1 = min(new_h, oy0 + rows)
+        y0 = oy0 * scale
+        y1 = oy1 * scale
+        sy0 = max(0, math.floor(y0) - margin)
+        sy1 = min(height, math.ceil(y1) + margin)
+        with img.crop((0, sy0, width, sy1)) as strip:
+            part = strip.resize((new_w, oy1 - oy0), Image.Resampling.LANCZOS, box=(0, y0 - sy0, width, y1 - sy0))
+        out.paste(part, (0, oy0))
+        part.close()
+    out.info = dict(img.info)
+    return out
+
+
+def peak_memory_bytes() -> int:
+    """当前进程的峰值常驻内存（字节），无法获取时返回 0。"""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_memory()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KB 为单位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _windows_peak_memory() -> int:
+    if os.name != "nt":
+        return 0
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    try:
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        kernel32 = ctypes.windll.kernel32
+        psapi = ctypes.windll.psapi
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return 0
+        return int(counters.PeakWorkingSetSize)
+    except (AttributeError, OSError):
+        return 0
@@ -1,17 +1,364 @@
-﻿import logging
+﻿import hashlib
+import io
+import logging
+import math
 import os
+import signal
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
 from PIL import Image
-from typing import Callable, List, Tuple, Optional
+
+from MuseLog.batch_resize_encoders import OutputOptions, format_bytes
+from MuseLog.batch_resize_manifest import ResizeManifest, file_sha1
+from MuseLog.batch_resize_memory import STRIP_RESAMPLE_PIXELS, estimate_resize_bytes, peak_memory_bytes, resize_in_strips
+from MuseLog.image_scanner import IMAGE_EXTENSIONS, iter_image_files
+
+DEFAULT_CHUNK_SIZE = 8
+PARTIAL_SUFFIX = ".part"
+
+# 速度/质量策略：quality 总是全分辨率解码后 LANCZOS；speed 在缩小时先以 2 的幂缩小解码再精细重采样
+RESIZE_POLICY_QUALITY = "quality"
+RESIZE_POLICY_SPEED = "speed"
+RESIZE_POLICIES: Tuple[str, ...] = (RESIZE_POLICY_QUALITY, RESIZE_POLICY_SPEED)
+# 快速缩小时粗缩放后至少保留目标尺寸的倍数，留给 LANCZOS 做最后一步以保证画质
+FAST_DOWNSCALE_GAP = 2.0
+
+# 多尺寸输出的组织方式：每个尺寸一个子文件夹，或在文件名后追加尺寸后缀
+VARIANT_LAYOUT_FOLDER = "folder"
+VARIANT_LAYOUT_SUFFIX = "suffix"
+VARIANT_LAYOUTS: Tuple[str, ...] = (VARIANT_LAYOUT_FOLDER, VARIANT_LAYOUT_SUFFIX)
+
+ProgressCallback = Callable[[int, int, "ResizeResult"], None]
+# (缩放参数值, 输出路径)
+ResizeTarget = Tuple[int, str]
+
+
+def default_worker_count() -> int:
+    """默认并行进程数：保留一个核心给界面线程。"""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def calculate_new_size(w: int, h: int, mode: str, value: int) -> Tuple[int, int]:
+    if mode == "scale":
+        scale = value / 100.0
+        return int(w * scale), int(h * scale)
+    elif mode == "width":
+        new_w = value
+        new_h = int(h * new_w / w)
+        return new_w, new_h
+    elif mode == "height":
+        new_h = value
+        new_w = int(w * new_h / h)
+        return new_w, new_h
+    else:
+        return w, h
+
+
+def variant_label(mode: str, value: int) -> str:
+    """多尺寸输出的文件夹名 / 文件名后缀，例如 50pct、w512、h256。"""
+    if mode == "width":
+        return f"w{value}"
+    if mode == "height":
+        return f"h{value}"
+    return f"{value}pct"
+
+
+class ResizeSettings:
+    """传给子进程的缩放参数，只包含可序列化的简单值。"""
+
+    def __init__(
+        self,
+        mode: str,
+        value: int,
+        compute_hash: bool = False,
+        policy: str = RESIZE_POLICY_QUALITY,
+        output: Optional[OutputOptions] = None,
+        memory_bounded: bool = False,
+    ):
+        self.mode: str = mode
+        self.value: int = value
+        self.policy: str = policy
+        self.resample: str = "draft+lanczos" if policy == RESIZE_POLICY_SPEED else "lanczos"
+        # 增量模式下顺带计算源文件哈希，避免再读一遍文件
+        self.compute_hash: bool = compute_hash
+        self.output: OutputOptions = output or OutputOptions()
+        # 内存受限模式：流式计算哈希而不是整文件读入内存，超大图按条带重采样
+        self.memory_bounded: bool = memory_bounded
+
+    def manifest_params(self, targets: List[ResizeTarget]) -> Dict[str, Any]:
+        """写入增量清单的参数；任意一项变化都会导致重新处理。"""
+        params: Dict[str, Any] = {
+            "mode": self.mode,
+            "value": self.value,
+            "resample": self.resample,
+            "format": os.path.splitext(targets[0][1])[1].lower(),
+        }
+        if len(targets) > 1 or targets[0][0] != self.value:
+            params["variants"] = [value for value, _ in targets]
+        encoder = self.output.manifest_params()
+        if encoder:
+            params["encoder"] = encoder
+        return params
+
+
+class ResizeResult:
+    """单张图片的处理结果，可在进程间传递（只包含路径与错误信息）。"""
+
+    def __init__(
+        self,
+        src_path: str,
+        out_path: str,
+        error: Optional[str] = None,
+        sha1: Optional[str] = None,
+        src_bytes: int = 0,
+        out_bytes: int = 0,
+        extra_outputs: Optional[List[str]] = None,
+        peak_memory: int = 0,
+        worker_pid: int = 0,
+    ):
+        self.src_path: str = src_path
+        self.out_path: str = out_path
+        self.error: Optional[str] = error
+        self.sha1: Optional[str] = sha1
+        self.src_bytes: int = src_bytes
+        # 多尺寸模式下为全部输出文件的总字节数
+        self.out_bytes: int = out_bytes
+        # 多尺寸模式下除 out_path 外的其他输出
+        self.extra_outputs: List[str] = extra_outputs or []
+        # 处理该图片的进程在此时的峰值常驻内存
+        self.peak_memory: int = peak_memory
+        self.worker_pid: int = worker_pid
+
+    @property
+    def out_paths(self) -> List[str]:
+        return [self.out_path] + self.extra_outputs
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.src_bytes - self.out_bytes
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def save_atomically(image: Image.Image, out_path: str, **save_kwargs) -> None:
+    """先写入同目录的临时文件再替换，任务中断时不会留下写了一半的输出文件。"""
+    ext = os.path.splitext(out_path)[1].lower()
+    save_kwargs.setdefault("format", Image.registered_extensions().get(ext))
+    tmp_path = out_path + PARTIAL_SUFFIX
+    out_dir = os.path.dirname(out_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    try:
+        image.save(tmp_path, **save_kwargs)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def resize_image_file(src_path: str, out_path: str, settings: ResizeSettings) -> ResizeResult:
+    """缩放单张图片；异常会记录到结果中而不是抛出，保证单个文件失败不影响整批。"""
+    return resize_image_targets(src_path, [(settings.value, out_path)], settings)
+
+
+def resize_image_targets(src_path: str, targets: List[ResizeTarget], settings: ResizeSettings) -> ResizeResult:
+    """
+    只解码一次源图，生成一个或多个尺寸的输出。
+    多尺寸时按从大到小的金字塔方式生成：每个尺寸都由上一个（最接近的更大）尺寸重采样得到，
+    上一级图像用完即释放，同一时刻最多只保留源图和当前一级。
+    """
+    out_path = targets[0][1]
+    extra_outputs = [path for _, path in targets[1:]]
+    sha1 = None
+    out_bytes = 0
+    try:
+        source: Any = src_path
+        if settings.compute_hash:
+            if settings.memory_bounded:
+                # 大文件不整体读入内存，哈希与解码各读一遍
+                sha1 = file_sha1(src_path)
+            else:
+                with open(src_path, "rb") as f:
+                    data = f.read()
+                sha1 = hashlib.sha1(data).hexdigest()
+                source = io.BytesIO(data)
+                del data
+        with Image.open(source) as img:
+            # draft 会改变 img.size，先按原始尺寸算好全部目标尺寸
+            sized = [
+                (calculate_new_size(img.width, img.height, settings.mode, value), path)
+                for value, path in targets
+            ]
+            sized.sort(key=lambda item: item[0][0] * item[0][1], reverse=True)
+            base: Image.Image = img
+            try:
+                for new_size, path in sized:
+                    resized = _resize_level(img, base, new_size, settings)
+                    if base is not img:
+                        base.close()
+                    base = resized
+                    out_bytes += _save_output(resized, path, settings)
+            finally:
+                # 出错时同样立即释放像素缓冲，不等待垃圾回收
+                if base is not img:
+                    base.close()
+        src_bytes = os.path.getsize(src_path)
+    except Exception:
+        return ResizeResult(src_path, out_path, error=traceback.format_exc(), extra_outputs=extra_outputs,
+                            peak_memory=peak_memory_bytes(), worker_pid=os.getpid())
+    return ResizeResult(src_path, out_path, sha1=sha1, src_bytes=src_bytes, out_bytes=out_bytes,
+                        extra_outputs=extra_outputs, peak_memory=peak_memory_bytes(), worker_pid=os.getpid())
+
+
+def _resize_level(img: Image.Image, base: Image.Image, size: Tuple[int, int], settings: ResizeSettings) -> Image.Image:
+    if base is img and settings.policy == RESIZE_POLICY_SPEED:
+        return fast_downscale(img, size)
+    if settings.memory_bounded and base.width * base.height > STRIP_RESAMPLE_PIXELS:
+        return resize_in_strips(base, size)
+    return base.resize(size, Image.Resampling.LANCZOS)
+
+
+def _save_output(image: Image.Image, out_path: str, settings: ResizeSettings) -> int:
+    pil_format = Image.registered_extensions().get(os.path.splitext(out_path)[1].lower())
+    prepared, save_kwargs = settings.output.prepare(image, pil_format)
+    save_atomically(prepared, out_path, format=pil_format, **save_kwargs)
+    if prepared is not image:
+        prepared.close()
+    return os.path.getsize(out_path)
+
+
+def fast_downscale(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """
+    快速缩小：JPEG 通过 draft 让解码器直接按 1/2、1/4、1/8 解码（少解码大部分像素）；
+    其他格式用 reduce 做整数倍的盒式缩小；最后再用 LANCZOS 缩放到目标尺寸。
+    放大或等比时与高质量路径一致。
+    """
+    width, height = size
+    if width >= img.width or height >= img.height:
+        return img.resize(size, Image.Resampling.LANCZOS)
+    if img.format == "JPEG":
+        # 必须在 load() 之前调用；解码尺寸保证不小于请求尺寸
+        img.draft(None, (int(width * FAST_DOWNSCALE_GAP), int(height * FAST_DOWNSCALE_GAP)))
+    return img.resize(size, Image.Resampling.LANCZOS, reducing_gap=FAST_DOWNSCALE_GAP)
+
+
+def _init_worker() -> None:
+    # Ctrl+C 由主进程处理（取消并等待进行中的分块），子进程忽略，避免进程池因 KeyboardInterrupt 损坏
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _resize_chunk(tasks: List[Tuple[str, List[ResizeTarget]]], settings: ResizeSettings) -> List[ResizeResult]:
+    # 子进程入口：只接收路径，由子进程自行解码，避免像素数据跨进程序列化
+    return [resize_image_targets(src, targets, settings) for src, targets in tasks]
+
+
+def _chunked(items: Iterable[Tuple[str, List[ResizeTarget]]], size: int) -> Iterator[List[Tuple[str, List[ResizeTarget]]]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
 class BatchResizer:
-    def __init__(self, in_folder: str, out_folder: str, mode: str, value: int, status_callback: Optional[Callable[[str], None]] = None):
+    def __init__(
+        self,
+        in_folder: str,
+        out_folder: str,
+        mode: str,
+        value: int,
+        status_callback: Optional[Callable[[str], None]] = None,
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback: Optional[ProgressCallback] = None,
+        incremental: bool = False,
+        policy: str = RESIZE_POLICY_QUALITY,
+        recursive: bool = False,
+        include_patterns: Optional[List[str]] = None,
+        exclude_patterns: Optional[List[str]] = None,
+        output_options: Optional[OutputOptions] = None,
+        variants: Optional[List[int]] = None,
+        variant_layout: str = VARIANT_LAYOUT_FOLDER,
+        memory_budget_mb: Optional[int] = None,
+    ):
         self.in_folder: str = in_folder
         self.out_folder: str = out_folder
         self.mode: str = mode
         self.value: int = value
         self.status_callback: Optional[Callable[[str], None]] = status_callback
+        # workers <= 1 时在当前进程串行处理；否则使用进程池
+        self.workers: int = max(1, int(workers))
+        self.chunk_size: int = max(1, int(chunk_size))
+        # 每处理完一张（包括失败）回调一次：(序号, 总数, 结果)
+        self.progress_callback: Optional[ProgressCallback] = progress_callback
+        # 增量模式：根据输出文件夹中的清单跳过未变化的图片，并清理源文件已删除的输出
+        self.incremental: bool = incremental
+        if policy not in RESIZE_POLICIES:
+            raise ValueError(f"未知的缩放策略: {policy}")
+        self.policy: str = policy
+        # 递归扫描时在输出文件夹中镜像子目录结构
+        self.recursive: bool = recursive
+        self.include_patterns: List[str] = list(include_patterns or [])
+        self.exclude_patterns: List[str] = list(exclude_patterns or [])
+        # 输出格式与编码参数
+        self.output_options: OutputOptions = output_options or OutputOptions()
+        # 多尺寸模式：一次解码生成多个尺寸（数值含义与 mode 相同），此时忽略 value
+        self.variants: List[int] = [int(v) for v in (variants or []) if int(v) > 0]
+        if variant_layout not in VARIANT_LAYOUTS:
+            raise ValueError(f"未知的多尺寸输出方式: {variant_layout}")
+        self.variant_layout: str = variant_layout
+        # 内存预算（字节）：按估算的像素缓冲大小限制同时解码的图片，0 表示不限制
+        self.memory_budget: int = max(0, int(memory_budget_mb or 0)) * 1024 * 1024
         self.image_paths: List[str] = []
+        self.skipped_count: int = 0
+        # 需要处理的图片总数：边扫描边处理时在扫描结束后才确定，之前为 None
+        self.scan_total: Optional[int] = None
+        # 边扫描边处理时扫描结束后回调一次：(需要处理的图片总数)
+        self.scan_callback: Optional[Callable[[int], None]] = None
+        # 本批次成功输出的源文件与输出文件总字节数
+        self.bytes_in: int = 0
+        self.bytes_out: int = 0
+        self.removed_count: int = 0
+        # 本批次的峰值常驻内存（字节）：peak_memory 为各处理进程峰值之和，是所有进程同时占用的上限；
+        # peak_process_memory 为单个进程的最大峰值
+        self.peak_memory: int = 0
+        self.peak_process_memory: int = 0
+        self._process_peaks: Dict[int, int] = {}
+        self._manifest: Optional[ResizeManifest] = None
+        self._source_stats: Dict[str, os.stat_result] = {}
+        self._cancel_event = threading.Event()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+
+    # ---------------------- 任务控制（可在其他线程调用） ----------------------
+    def cancel(self) -> None:
+        self._cancel_event.set()
+        # 暂停中取消时需要唤醒等待
+        self._resume_event.set()
+
+    def pause(self) -> None:
+        if not self._cancel_event.is_set():
+            self._resume_event.clear()
+
+    def resume(self) -> None:
+        self._resume_event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def is_paused(self) -> bool:
+        return not self._resume_event.is_set()
 
     def validate_folders(self) -> Tuple[bool, str]:
         if not self.in_folder or not os.path.isdir(self.in_folder):
@@ -25,47 +372,289 @@ class BatchResizer:
                 return False, f"无法创建输出文件夹: {str(e)}"
         return True, ""
 
+    def iter_image_paths(self, sort: bool = True) -> Iterator[str]:
+        return iter_image_files(
+            self.in_folder,
+            recursive=self.recursive,
+            include=self.include_patterns,
+            exclude=self.exclude_patterns,
+            extensions=IMAGE_EXTENSIONS,
+            # 输出目录位于输入目录内部时不能把输出再当作输入
+            skip_dirs=[self.out_folder],
+            sort=sort,
+        )
+
     def load_image_paths(self) -> List[str]:
-        self.image_paths = []
-        for fname in os.listdir(self.in_folder):
-            if fname.lower().endswith((".png", ".jpg", ".jpeg", ".bmp", ".gif")):
-                path = os.path.join(self.in_folder, fname)
-                self.image_paths.append(path)
+        self.image_paths = list(self.iter_image_paths())
         return self.image_paths
 
     def calculate_new_size(self, w: int, h: int) -> Tuple[int, int]:
-        if self.mode == "scale":
-            scale = self.value / 100.0
-            return int(w * scale), int(h * scale)
-        elif self.mode == "width":
-            new_w = self.value
-            new_h = int(h * new_w / w)
-            return new_w, new_h
-        elif self.mode == "height":
-            new_h = self.value
-            new_w = int(w * new_h / h)
-            return new_w, new_h
+        return calculate_new_size(w, h, self.mode, self.value)
+
+    def output_path_for(self, path: str) -> str:
+        return self.output_targets_for(path)[0][1]
+
+    def output_targets_for(self, path: str) -> List[ResizeTarget]:
+        if self.recursive:
+            rel_path = os.path.relpath(path, self.in_folder)
         else:
-            return w, h
+            rel_path = os.path.basename(path)
+        stem = os.path.splitext(rel_path)[0]
+        ext = self.output_options.output_extension(path)
+        if not self.variants:
+            return [(self.value, os.path.join(self.out_folder, stem + ext))]
+        targets: List[ResizeTarget] = []
+        for value in self.variants:
+            label = variant_label(self.mode, value)
+            if self.variant_layout == VARIANT_LAYOUT_SUFFIX:
+                targets.append((value, os.path.join(self.out_folder, f"{stem}_{label}{ext}")))
+            else:
+                targets.append((value, os.path.join(self.out_folder, label, stem + ext)))
+        return targets
+
+    def build_settings(self) -> ResizeSettings:
+        return ResizeSettings(
+            self.mode,
+            self.value,
+            compute_hash=self.incremental,
+            policy=self.policy,
+            output=self.output_options,
+            memory_bounded=bool(self.memory_budget),
+        )
+
+    def estimate_memory(self, path: str) -> int:
+        """估算处理一张图片需要的像素缓冲大小（字节）。"""
+        values = self.variants or [self.value]
+        return estimate_resize_bytes(
+            path,
+            lambda w, h: [calculate_new_size(w, h, self.mode, v) for v in values],
+            STRIP_RESAMPLE_PIXELS,
+        )
 
     def process_images(self) -> None:
-        if not self.image_paths:
-            self.load_image_paths()
-        total = len(self.image_paths)
-        for idx, path in enumerate(self.image_paths, 1):
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.peak_memory = 0
+        self.peak_process_memory = 0
+        self._process_peaks = {}
+        paths: Iterable[str]
+        total: Optional[int]
+        if self.image_paths:
+            paths, total = self.image_paths, len(self.image_paths)
+        else:
+            # 未预先加载列表时边扫描边处理，总数未知
+            paths, total = self._iter_and_collect(), None
+        self.scan_total = total
+        if self.incremental:
+            paths = self._plan_incremental(paths)
+            if total is not None:
+                paths = list(paths)
+                total = len(paths)
+        results = self._iter_results(paths, total)
+        try:
+            for idx, result in enumerate(results, 1):
+                self._handle_result(idx, total, result)
+                # 暂停时不再取下一个结果，并行模式下也就不会继续提交新的分块
+                self._resume_event.wait()
+                if self._cancel_event.is_set():
+                    break
+        finally:
+            results.close()
+            self._finish_incremental()
+            if self.workers <= 1:
+                self._update_peak_memory(os.getpid(), peak_memory_bytes())
+            if self.peak_memory:
+                logging.info(f"批量缩放{self.describe_peak_memory()}")
+        if self._cancel_event.is_set():
+            logging.info(f"批量缩放已取消: {self.in_folder}")
+            if self.status_callback:
+                self.status_callback("已取消批量缩放")
+            return
+        if self.status_callback:
+            if total is None:
+                total = len(self.image_paths) - self.skipped_count
+            skipped_text = f"，跳过 {self.skipped_count} 张未变化图片" if self.skipped_count else ""
+            self.status_callback(
+                f"完成: 共 {total} 张图片处理完毕{skipped_text}，{self.describe_bytes_saved()}，"
+                f"{self.describe_peak_memory()}，保存至 {self.out_folder}"
+            )
+
+    def describe_bytes_saved(self) -> str:
+        saved = self.bytes_in - self.bytes_out
+        if not self.bytes_in:
+            return "无输出"
+        ratio = saved / self.bytes_in * 100
+        return f"{format_bytes(self.bytes_in)} -> {format_bytes(self.bytes_out)}（节省 {format_bytes(saved)}，{ratio:.0f}%）"
+
+    def describe_peak_memory(self) -> str:
+        if not self.peak_memory:
+            return "峰值内存未知"
+        if self.peak_memory == self.peak_process_memory:
+            return f"峰值内存 {format_bytes(self.peak_memory)}"
+        return f"峰值内存 单进程 {format_bytes(self.peak_process_memory)} / 合计不超过 {format_bytes(self.peak_memory)}"
+
+    def _update_peak_memory(self, pid: int, peak: int) -> None:
+        if peak > self._process_peaks.get(pid, 0):
+            self._process_peaks[pid] = peak
+            self.peak_memory = sum(self._process_peaks.values())
+            self.peak_process_memory = max(self._process_peaks.values())
+
+    def _iter_and_collect(self) -> Iterator[str]:
+        self.image_paths = []
+        # 流式处理不依赖顺序，按 scandir 顺序边读边处理；扫描结束后再排序，
+        # 使 image_paths 的顺序与目录读取顺序无关
+        for path in self.iter_image_paths(sort=False):
+            self.image_paths.append(path)
+            yield path
+        self.image_paths.sort()
+        # 增量模式下取下一个路径时上一个路径已判断完是否跳过，此时跳过数也已确定
+        self.scan_total = len(self.image_paths) - (self.skipped_count if self.incremental else 0)
+        if self.scan_callback:
+            self.scan_callback(self.scan_total)
+
+    def _handle_result(self, idx: int, total: Optional[int], result: ResizeResult) -> None:
+        if total is None:
+            total = self.scan_total
+        self._update_peak_memory(result.worker_pid, result.peak_memory)
+        if result.ok:
+            self.bytes_in += result.src_bytes
+            self.bytes_out += result.out_bytes
+            logging.info(
+                f"处理图片: {result.src_path} -> {result.out_path} "
+                f"({format_bytes(result.src_bytes)} -> {format_bytes(result.out_bytes)})"
+            )
+            self._record_incremental(result)
+            if self.status_callback:
+                progress = f"{idx}/{total}" if total is not None else str(idx)
+                self.status_callback(f"处理 {progress}: {os.path.basename(result.src_path)}")
+        else:
+            logging.error(f"处理图片失败: {result.src_path}\n{result.error}")
+        if self.progress_callback:
+            # 总数未知（流式扫描尚未结束）时传 0
+            self.progress_callback(idx, total or 0, result)
+
+    # ---------------------- 增量处理 ----------------------
+    def _manifest_key(self, path: str) -> str:
+        return os.path.relpath(path, self.in_folder).replace(os.sep, "/")
+
+    def _plan_incremental(self, paths: Iterable[str]) -> Iterator[str]:
+        """删除源文件已不存在的旧输出，并逐个过滤掉源文件和参数都未变化的图片。"""
+        manifest = ResizeManifest(self.out_folder)
+        manifest.load()
+        self._manifest = manifest
+        self._source_stats = {}
+        self.skipped_count = 0
+        self._remove_orphans(manifest)
+        settings = self.build_settings()
+        for path in paths:
             try:
-                img = Image.open(path)
-                w, h = img.size
-                new_w, new_h = self.calculate_new_size(w, h)
-                resized = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-                fname = os.path.basename(path)
-                out_path = os.path.join(self.out_folder, fname)
-                resized.save(out_path)
-                logging.info(f"处理图片: {path} -> {out_path}")
-                if self.status_callback:
-                    self.status_callback(f"处理 {idx}/{total}: {fname}")
-            except Exception:
-                logging.exception(f"处理图片失败: {path}")
+                st = os.stat(path)
+            except OSError:
+                yield path
                 continue
-        if self.status_callback:
-            self.status_callback(f"完成: 共 {total} 张图片处理完毕，保存至 {self.out_folder}")
+            params = settings.manifest_params(self.output_targets_for(path))
+            if manifest.is_up_to_date(self._manifest_key(path), path, st, params):
+                self.skipped_count += 1
+                continue
+            self._source_stats[path] = st
+            yield path
+
+    def _remove_orphans(self, manifest: ResizeManifest) -> None:
+        self.removed_count = 0
+        for key, entry in manifest.items():
+            if os.path.exists(os.path.join(self.in_folder, key)):
+                continue
+            manifest.remove(key)
+            for out_path in manifest.output_paths(entry):
+                if not os.path.isfile(out_path):
+                    continue
+                try:
+                    os.remove(out_path)
+                    self.removed_count += 1
+                    logging.info(f"源文件已删除，移除旧输出: {out_path}")
+                except OSError:
+                    logging.exception(f"移除旧输出失败: {out_path}")
+        if self.removed_count:
+            logging.info(f"增量缩放: 移除 {self.removed_count} 个源文件已删除的旧输出")
+
+    def _record_incremental(self, result: ResizeResult) -> None:
+        if self._manifest is None or not result.sha1:
+            return
+        st = self._source_stats.pop(result.src_path, None)
+        if st is None:
+            return
+        key = self._manifest_key(result.src_path)
+        previous = self._manifest.entries.get(key)
+        current = {os.path.normcase(p) for p in result.out_paths}
+        for old_out in (self._manifest.output_paths(previous) if previous else []):
+            if os.path.normcase(old_out) in current or not os.path.isfile(old_out):
+                continue
+            # 输出格式或尺寸组合变化后，旧的输出已失效
+            try:
+                os.remove(old_out)
+            except OSError:
+                logging.exception(f"移除旧输出失败: {old_out}")
+        params = self.build_settings().manifest_params(self.output_targets_for(result.src_path))
+        self._manifest.record(key, st, result.sha1, params, result.out_paths)
+
+    def _finish_incremental(self) -> None:
+        # 取消时也保存已完成部分，下次只需处理剩余图片
+        if self._manifest is not None:
+            if self.skipped_count:
+                logging.info(f"增量缩放: 跳过 {self.skipped_count} 张未变化图片")
+            self._manifest.save()
+            self._manifest = None
+        self._source_stats = {}
+
+    # ---------------------- 执行 ----------------------
+    def _iter_results(self, paths: Iterable[str], total: Optional[int] = None) -> Iterator[ResizeResult]:
+        """按输入顺序逐个产出处理结果，保证进度回调的顺序与串行模式一致。"""
+        tasks = ((path, self.output_targets_for(path)) for path in paths)
+        settings = self.build_settings()
+        if self.workers <= 1:
+            for src, targets in tasks:
+                yield resize_image_targets(src, targets, settings)
+            return
+
+        chunk_size = self.chunk_size
+        if total:
+            # 图片较少时缩小分块，避免部分进程空闲
+            chunk_size = max(1, min(chunk_size, math.ceil(total / self.workers)))
+        # 只预先提交有限数量的分块，结果按提交顺序取回
+        max_pending = self.workers * 2
+        pending: Deque[Tuple[List[Tuple[str, List[ResizeTarget]]], Future, int]] = deque()
+        in_flight = 0
+        executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        try:
+            for chunk in _chunked(tasks, chunk_size):
+                # 分块内串行处理，占用取决于其中最大的一张
+                cost = max(self.estimate_memory(src) for src, _ in chunk) if self.memory_budget else 0
+                # 已提交分块的估算占用加上新分块会超出预算时，先等最早的分块完成；
+                # 单张就超出预算的图片在没有其他分块时单独处理
+                while pending and (len(pending) >= max_pending or self._over_budget(in_flight + cost)):
+                    done_chunk, future, done_cost = pending.popleft()
+                    in_flight -= done_cost
+                    yield from self._collect_chunk(done_chunk, future)
+                pending.append((chunk, executor.submit(_resize_chunk, chunk, settings), cost))
+                in_flight += cost
+            while pending:
+                done_chunk, future, _ = pending.popleft()
+                yield from self._collect_chunk(done_chunk, future)
+        finally:
+            # 提前结束（取消）时丢弃尚未开始的分块，已在执行的分块写完后退出
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _over_budget(self, estimated: int) -> bool:
+        return bool(self.memory_budget) and estimated > self.memory_budget
+
+    @staticmethod
+    def _collect_chunk(chunk: List[Tuple[str, List[ResizeTarget]]], future: Future) -> List[ResizeResult]:
+        try:
+            return future.result()
+        except Exception:
+            # 子进程异常退出等情况：整块标记为失败，其余分块继续
+            error = traceback.format_exc()
+            return [
+                ResizeResult(src, targets[0][1], error=error, extra_outputs=[path for _, path in targets[1:]])
+                for src, targets in chunk
+            ]
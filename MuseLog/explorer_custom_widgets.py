@@ -17,6 +17,15 @@ from PySide6.QtWidgets import (
 )
 
 from MuseLog.explorer_signals import signal_manager
+from MuseLog.file_operations import (
+    CopyTreeOperation,
+    DeleteOperation,
+    DeltaSyncOperation,
+    FileOperation,
+    FileTask,
+    OperationResult,
+)
+from MuseLog.sequence_player import SequencePlayerDialog
 
 CustomWidgetBuilder = Callable[[QWidget, str, Dict[str, Any]], Sequence[QWidget]]
 
@@ -152,6 +161,34 @@ def _emit_rename_request(folder_path: Path, new_name: str) -> None:
     signal_manager.rename_folder.emit(str(folder_path), str(new_path))
 
 
+def _enqueue_file_operation(operation: FileOperation) -> None:
+    # 由资源管理器页的文件操作队列执行，界面上显示进度并可取消
+    signal_manager.enqueue_file_operation.emit(operation)
+
+
+class _Json42SyncOperation(DeltaSyncOperation):
+    """
+    按内容将 json42 同步到游戏项目：只写入内容变化的 atlas、PNG 与 json，
+    json 直接以与 atlas 同名写入目标（不再先拷贝再重命名），内容未变时不会被改写。
+    """
+
+    def __init__(self, source: Path, destination: Path, on_finished: Callable[[OperationResult], None]):
+        super().__init__(str(source), str(destination), f"同步 json42 到 {destination}", on_finished)
+        self._json_names: Dict[str, str] = {}
+
+    def plan(self, result: OperationResult) -> List[FileTask]:
+        files = sorted(p for p in Path(self.source).iterdir() if p.is_file())
+        atlas_file = next((p for p in files if p.suffix == ".atlas"), None)
+        json_file = next((p for p in files if p.suffix == ".json"), None)
+        self._json_names = {}
+        if atlas_file and json_file:
+            self._json_names[json_file.name] = atlas_file.with_suffix(".json").name
+        return super().plan(result)
+
+    def target_name(self, relative: str) -> str:
+        return self._json_names.get(relative, relative)
+
+
 def _make_spacer(container: QWidget) -> QWidget:
     spacer = QWidget(container)
     spacer.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
@@ -210,6 +247,15 @@ def build_sequence_frames_widgets(container: QWidget, full_folder: str, meta: Di
     btn_modify_frame_rate.clicked.connect(on_modify_frame_rate_clicked)
     btn_modify_animation_type.clicked.connect(on_modify_animation_type_clicked)
 
+    btn_preview_sequence = QPushButton("预览动画", container)
+
+    def on_preview_sequence_clicked() -> None:
+        # 按当前帧率播放；窗口非模态，可一边预览一边修改帧率
+        dialog = SequencePlayerDialog(str(folder_path), frame_rate_value, container.window())
+        dialog.show()
+
+    btn_preview_sequence.clicked.connect(on_preview_sequence_clicked)
+
     btn_delete_sequence = QPushButton("删除选中的动画", container)
 
     def on_delete_sequence_clicked() -> None:
@@ -224,6 +270,7 @@ def build_sequence_frames_widgets(container: QWidget, full_folder: str, meta: Di
         frame_rate_input,
         btn_modify_animation_type,
         animation_type_combo,
+        btn_preview_sequence,
         btn_delete_sequence,
         _make_spacer(container),
     ]
@@ -264,30 +311,27 @@ def build_spine_widgets(container: QWidget, full_folder: str, meta: Dict[str, An
             QMessageBox.warning(container, "操作失败", f"{source} 不存在")
             return
         images_folder = spine_path / "images"
-        images_folder.mkdir(exist_ok=True)
-        shutil.copytree(source, images_folder, dirs_exist_ok=True)
-        QMessageBox.information(container, "拷贝成功", f"已成功拷贝序列帧到 {images_folder}")
+        # 在后台复制，目标中大小与 mtime 一致的帧直接跳过
+        _enqueue_file_operation(CopyTreeOperation(str(source), str(images_folder), f"拷贝序列帧到 {images_folder}"))
 
     def clean_extra_image_folders() -> None:
         images_dir = spine_path / "images"
         if not images_dir.exists():
             QMessageBox.warning(container, "操作失败", f"{images_dir} 不存在")
             return
+        extra_paths: List[str] = []
         for sub_dir in images_dir.iterdir():
             if not sub_dir.is_dir():
                 continue
             keep_dir = sub_dir / IMAGES_KEEP_FOLDER
             if not keep_dir.exists():
                 continue
-            for item in list(sub_dir.iterdir()):
-                if item == keep_dir:
-                    continue
-                if item.is_dir():
-                    shutil.rmtree(item)
-                else:
-                    item.unlink()
-                logging.info("Removed extra path: %s", item)
-        QMessageBox.information(container, "清理成功", "已清理 images 目录多余内容")
+            extra_paths.extend(str(item) for item in sub_dir.iterdir() if item != keep_dir)
+        if not extra_paths:
+            QMessageBox.information(container, "清理完成", "images 目录没有多余内容")
+            return
+        # 只在这里列出一层，逐个文件的删除在后台进行
+        _enqueue_file_operation(DeleteOperation(extra_paths, "清理 images 目录多余内容"))
 
     def create_spine_template() -> None:
         if not SPINE_TEMPLATE_SOURCE.exists():
@@ -371,20 +415,12 @@ def build_json42_widgets(container: QWidget, full_folder: str, meta: Dict[str, A
             QMessageBox.warning(container, "操作失败", "请填写怪物编号")
             return
         destination = GAME_MONSTER_BASE_PATH / f"jiangshi_{monster_number}"
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copytree(source_path, destination, dirs_exist_ok=True)
 
-        atlas_file = next((p for p in destination.iterdir() if p.suffix == ".atlas"), None)
-        json_file = next((p for p in destination.iterdir() if p.suffix == ".json"), None)
-        if atlas_file and json_file:
-            target_json = atlas_file.with_suffix(".json")
-            if target_json.exists():
-                target_json.unlink()
-            json_file.rename(target_json)
-            logging.info("Renamed json file to match atlas: %s", target_json)
-
-        QMessageBox.information(container, "拷贝成功", f"已成功拷贝 {source_path} 到 {destination}")
-        os.startfile(str(destination))
+        def on_copied(result: OperationResult) -> None:
+            if result.ok:
+                os.startfile(str(destination))
+
+        _enqueue_file_operation(_Json42SyncOperation(source_path, destination, on_copied))
 
         history_values = [item for item in history_values if item != monster_number]
         history_values.insert(0, monster_number)
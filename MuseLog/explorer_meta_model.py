@@ -0,0 +1,233 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QEvent,
+    QModelIndex,
+    QObject,
+    QPersistentModelIndex,
+    QSize,
+    Qt,
+    Signal,
+)
+from PySide6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton, QStyleOptionViewItem
+
+from MuseLog.explorer_metadata import MEDIA_PAGE_SIZE, MediaList, MetaStruct
+
+META_HEADERS = ("键", "值", "操作")
+META_KEY_COLUMN = 0
+META_VALUE_COLUMN = 1
+META_OP_COLUMN = 2
+
+MetaRow = Tuple[str, MetaStruct]
+
+
+class MetaTableModel(QAbstractTableModel):
+    """
+    资源管理器右侧元数据表格的数据模型，每行是 (键, MetaStruct)。
+    set_rows 按键比较新旧两组行：只对中间增删的行发出插入 / 删除通知，
+    前后相同键的行只在内容变化时发出 dataChanged，视图据此只重绘可见区域。
+    视频 / 参考图等媒体列表排在固定行之后，先生成一页，其余通过 fetchMore 在滚动到底部时追加。
+    """
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._rows: List[MetaRow] = []
+        self._base_rows: List[MetaRow] = []
+        # 各媒体列表及其当前排序
+        self._media: List[Tuple[MediaList, List[str]]] = []
+        # 已生成行的媒体条目数
+        self._media_loaded: int = 0
+        self._sort_key: str = "name"
+        self._descending: bool = False
+
+    # ---------------------- Qt 接口 ----------------------
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(META_HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return META_HEADERS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        key, entry = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == META_KEY_COLUMN:
+                return key
+            if column == META_VALUE_COLUMN:
+                return entry.name
+        elif role == Qt.ItemDataRole.ToolTipRole and column == META_VALUE_COLUMN:
+            return entry.name
+        return None
+
+    # ---------------------- 数据更新 ----------------------
+    def entry(self, row: int) -> Optional[MetaStruct]:
+        if 0 <= row < len(self._rows):
+            return self._rows[row][1]
+        return None
+
+    def rows(self) -> List[MetaRow]:
+        return list(self._rows)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and self._media_loaded < self.media_count()
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if parent.isValid():
+            return
+        start = self._media_loaded
+        stop = min(start + MEDIA_PAGE_SIZE, self.media_count())
+        if stop <= start:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + stop - start - 1)
+        self._rows.extend(self._media_rows(start, stop))
+        self._media_loaded = stop
+        self.endInsertRows()
+
+    def media_count(self) -> int:
+        return sum(len(order) for _, order in self._media)
+
+    def set_rows(self, rows: Sequence[MetaRow], media: Sequence[MediaList] = (), keep_loaded: bool = False) -> None:
+        """
+        设置固定行与媒体列表。keep_loaded 为 True 时（同一目录刷新）保留已加载的媒体行数，
+        滚动位置不会因为刷新跳回第一页。
+        """
+        loaded = max(MEDIA_PAGE_SIZE, self._media_loaded) if keep_loaded else MEDIA_PAGE_SIZE
+        self._base_rows = list(rows)
+        self._media = [(m, m.sorted_paths(self._sort_key, self._descending)) for m in media]
+        self._media_loaded = min(loaded, self.media_count())
+        self._apply_rows(self._base_rows + self._media_rows(0, self._media_loaded))
+
+    def sort_media(self, key: str, descending: bool = False) -> None:
+        """按名称、大小或修改时间重新排列媒体行，已加载的行数不变。"""
+        self._sort_key = key
+        self._descending = descending
+        self._media = [(m, m.sorted_paths(key, descending)) for m, _ in self._media]
+        self._apply_rows(self._base_rows + self._media_rows(0, self._media_loaded))
+
+    def _media_rows(self, start: int, stop: int) -> List[MetaRow]:
+        rows: List[MetaRow] = []
+        offset = 0
+        for media, order in self._media:
+            lo = max(start - offset, 0)
+            hi = min(stop - offset, len(order))
+            rows.extend(media.row(i, order[i]) for i in range(lo, hi))
+            offset += len(order)
+            if offset >= stop:
+                break
+        return rows
+
+    def _apply_rows(self, rows: Sequence[MetaRow]) -> None:
+        new_rows = list(rows)
+        old_rows = self._rows
+        # 相同键的公共前缀与后缀
+        limit = min(len(old_rows), len(new_rows))
+        prefix = 0
+        while prefix < limit and old_rows[prefix][0] == new_rows[prefix][0]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old_rows[-1 - suffix][0] == new_rows[-1 - suffix][0]:
+            suffix += 1
+
+        old_middle_end = len(old_rows) - suffix
+        new_middle_end = len(new_rows) - suffix
+        if old_middle_end > prefix:
+            self.beginRemoveRows(QModelIndex(), prefix, old_middle_end - 1)
+            self._rows = old_rows[:prefix] + old_rows[old_middle_end:]
+            self.endRemoveRows()
+        if new_middle_end > prefix:
+            self.beginInsertRows(QModelIndex(), prefix, new_middle_end - 1)
+            self._rows = self._rows[:prefix] + new_rows[prefix:new_middle_end] + self._rows[prefix:]
+            self.endInsertRows()
+
+        # 键相同的行只替换内容，按连续区间发出 dataChanged
+        kept = list(range(prefix)) + list(range(new_middle_end, len(new_rows)))
+        changed = [row for row in kept if vars(self._rows[row][1]) != vars(new_rows[row][1])]
+        self._rows = new_rows
+        for first, last in _ranges(changed):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(META_HEADERS) - 1))
+
+
+def _ranges(rows: List[int]) -> List[Tuple[int, int]]:
+    ranges: List[Tuple[int, int]] = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1] = (ranges[-1][0], row)
+        else:
+            ranges.append((row, row))
+    return ranges
+
+
+def _entry_at(index: QModelIndex) -> Optional[MetaStruct]:
+    # 直接取模型中的对象；经 index.data() 往返 QVariant 在部分 PySide6 版本上会错误减少 None 的引用计数
+    model = index.model()
+    if isinstance(model, MetaTableModel):
+        return model.entry(index.row())
+    return None
+
+
+class MetaOperationDelegate(QStyledItemDelegate):
+    """
+    在"操作"列直接绘制按钮，代替每行一个 QPushButton 单元格控件：
+    行数再多也不会创建控件或信号连接，点击通过 operation_clicked 发出。
+    """
+
+    # 操作类型、操作数据
+    operation_clicked = Signal(str, object)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._pressed: Optional[QPersistentModelIndex] = None
+
+    def paint(self, painter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        entry = _entry_at(index)
+        if entry is None or not entry.op_type:
+            super().paint(painter, option, index)
+            return
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = entry.op_name or "操作"
+        button.state = QStyle.StateFlag.State_Enabled
+        if self._pressed is not None and self._pressed == index:
+            button.state |= QStyle.StateFlag.State_Sunken
+        else:
+            button.state |= QStyle.StateFlag.State_Raised
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            button.state |= QStyle.StateFlag.State_MouseOver
+        style = option.widget.style() if option.widget is not None else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        entry = _entry_at(index)
+        if entry is None or not entry.op_type:
+            return super().sizeHint(option, index)
+        width = option.fontMetrics.horizontalAdvance(entry.op_name or "操作") + 24
+        return QSize(width, option.fontMetrics.height() + 10)
+
+    def editorEvent(self, event: QEvent, model, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        entry = _entry_at(index)
+        if entry is None or not entry.op_type:
+            return False
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+        inside = option.rect.contains(event.position().toPoint())
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self._pressed = QPersistentModelIndex(index) if inside else None
+        else:
+            clicked = inside and self._pressed is not None and self._pressed == index
+            self._pressed = None
+            if clicked:
+                self.operation_clicked.emit(entry.op_type, entry.op_data)
+        if option.widget is not None:
+            option.widget.update(index)
+        return inside
@@ -0,0 +1,492 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from MuseLog.image_params import EMBEDDED_PARAMS_EXTENSIONS, ImageParams, read_image_params
+from MuseLog.image_scanner import IMAGE_EXTENSIONS
+from MuseLog.json_sidecar import read_first_sidecar
+
+# 常见的提示词 / 参数文件，按显示顺序排列
+PROMPT_FILE_NAMES = ("提示词.txt", "prompt.txt", "prompts.txt", "neg_prompt.txt", "caption.txt")
+# 常见 JSON 参数/元数据文件，按优先级排列，只读取第一个可解析的
+JSON_SIDECAR_NAMES = ("metadata.json", "params.json", "info.json")
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".avi", ".mkv", ".webm"}
+# 目录中作为图片列出的扩展名（生成器常输出 WebP）
+FOLDER_IMAGE_EXTENSIONS = IMAGE_EXTENSIONS | {".webp"}
+REF_DIR_NAME = "ref"
+# 参考图一栏最多列出的文件名数量
+REF_PREVIEW_LIMIT = 20
+# 视频 / 参考图列表每页加载的行数，其余行在滚动到底部时再加载
+MEDIA_PAGE_SIZE = 200
+# 媒体列表可用的排序方式
+MEDIA_SORT_KEYS = ("name", "size", "mtime")
+# 元数据缓存最多保留的目录数量
+METADATA_CACHE_SIZE = 256
+# 全文索引时每个提示词来源最多读取的字符数
+PROMPT_TEXT_LIMIT = 64 * 1024
+# 每个目录最多读取内嵌生成参数的图片数量（按文件名顺序）；同一批次的图片参数基本相同，前几张足以代表整个目录
+EMBEDDED_PARAMS_LIMIT = 20
+# 不读取内嵌参数的目录：序列帧目录有成百上千张帧图片，且不带生成参数
+EMBEDDED_PARAMS_SKIP_DIRS = ("序列帧",)
+
+
+class MetaStruct:
+    def __init__(self, name: str, file_path: str = "", op_type: str = "", op_name: str = "", op_data: Any = None):
+        self.name = name
+        self.file_path = file_path
+        self.op_type = op_type
+        self.op_name = op_name
+        self.op_data = op_data
+
+
+class FolderListing:
+    """单个目录一次 os.scandir 的分类结果。"""
+
+    def __init__(self, folder: str):
+        self.folder: str = folder
+        # 规范文件名 -> 路径
+        self.prompt_files: Dict[str, str] = {}
+        self.json_files: Dict[str, str] = {}
+        self.videos: List[str] = []
+        self.images: List[str] = []
+        self.ref_dir: Optional[str] = None
+        # 影响元数据内容的附属文件（提示词、JSON、ref/ 目录）-> mtime_ns，用于缓存校验
+        self.source_mtimes: Dict[str, int] = {}
+        # 子目录名（不含符号链接，避免索引时循环遍历）
+        self.subdirs: List[str] = []
+        # 视频与图片的 DirEntry，排序时直接使用其缓存的 stat 结果
+        self.entries: Dict[str, os.DirEntry] = {}
+
+
+class FolderMetadata:
+    """从目录中提取出的原始元数据，可序列化保存到索引，再还原为表格使用的 MetaStruct。"""
+
+    def __init__(
+        self,
+        folder: str,
+        prompt_files: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        videos: Optional[List[str]] = None,
+        refs: Optional[List[str]] = None,
+        entries: Optional[Dict[str, os.DirEntry]] = None,
+        params_path: Optional[str] = None,
+        params_truncated: bool = False,
+        image_params: Optional[Dict[str, ImageParams]] = None,
+    ):
+        self.folder: str = folder
+        # 规范文件名 -> 路径，按 PROMPT_FILE_NAMES 的顺序
+        self.prompt_files: Dict[str, str] = prompt_files or {}
+        # 第一个可解析的 JSON 参数文件内容；文件过大时只含常用键（params_truncated 为 True）
+        self.params: Optional[Dict[str, Any]] = params
+        self.params_path: Optional[str] = params_path
+        self.params_truncated: bool = params_truncated
+        self.videos: List[str] = videos or []
+        self.refs: List[str] = refs or []
+        # 扫描得到的 DirEntry（不写入索引，从索引还原时为空）
+        self.entries: Dict[str, os.DirEntry] = entries or {}
+        # 图片路径 -> 内嵌的生成参数（只含有参数的图片，按文件名顺序）
+        self.image_params: Dict[str, ImageParams] = image_params or {}
+
+    @property
+    def model(self) -> Optional[str]:
+        if not self.params:
+            return None
+        return self.params.get("model") or self.params.get("model_name") or self.params.get("ckpt")
+
+    @property
+    def prompt(self) -> Optional[str]:
+        if not self.params or "prompt" not in self.params:
+            return None
+        return str(self.params.get("prompt"))[:2000]
+
+    @property
+    def embedded(self) -> Optional[Tuple[str, ImageParams]]:
+        """第一张含内嵌参数的图片及其参数。"""
+        return next(iter(self.image_params.items()), None)
+
+
+def scan_folder(folder: str) -> FolderListing:
+    """
+    只遍历一次目录，利用 DirEntry 缓存的类型信息对每个条目分类，
+    不再对提示词、JSON 文件逐个 isfile，也不再对每个文件单独 stat。
+    文件名按 os.path.normcase 比较，与 isfile 在 Windows 上大小写不敏感的行为一致。
+    """
+    listing = FolderListing(folder)
+    prompt_keys = {os.path.normcase(name): name for name in PROMPT_FILE_NAMES}
+    json_keys = {os.path.normcase(name): name for name in JSON_SIDECAR_NAMES}
+    ref_key = os.path.normcase(REF_DIR_NAME)
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir():
+                        if os.path.normcase(entry.name) == ref_key:
+                            listing.ref_dir = entry.path
+                            listing.source_mtimes[entry.path] = entry.stat().st_mtime_ns
+                        if not entry.is_symlink():
+                            listing.subdirs.append(entry.name)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    key = os.path.normcase(entry.name)
+                    if key in prompt_keys or key in json_keys:
+                        # 只对少量附属文件取 mtime（Windows 上 DirEntry.stat 无需额外系统调用）
+                        listing.source_mtimes[entry.path] = entry.stat().st_mtime_ns
+                except OSError:
+                    continue
+                if key in prompt_keys:
+                    name = prompt_keys[key]
+                    listing.prompt_files[name] = os.path.join(folder, name)
+                elif key in json_keys:
+                    name = json_keys[key]
+                    listing.json_files[name] = os.path.join(folder, name)
+                ext = os.path.splitext(entry.name)[1].lower()
+                if ext in VIDEO_EXTENSIONS:
+                    listing.videos.append(entry.path)
+                    listing.entries[entry.path] = entry
+                elif ext in FOLDER_IMAGE_EXTENSIONS:
+                    listing.images.append(entry.path)
+                    listing.entries[entry.path] = entry
+    except OSError:
+        pass
+    return listing
+
+
+def collect_metadata(folder: str) -> Dict[str, MetaStruct]:
+    """收集目录的元数据（提示词、模型、视频文件、参考图等），用于资源管理器右侧表格。"""
+    return build_metadata(scan_folder(folder))
+
+
+def build_metadata(listing: FolderListing) -> Dict[str, MetaStruct]:
+    return metadata_to_structs(extract_metadata(listing))
+
+
+def collect_embedded_metadata(folder: str, images: Optional[List[str]] = None) -> Dict[str, MetaStruct]:
+    """
+    图片内嵌生成参数的表格行，在目录元数据显示之后按需读取。
+    images 为已知的图片列表（例如 MetadataCache 中记录的），未提供时重新遍历目录。
+    每张图片重新 stat，原地覆盖的图片不会使用过期的参数。
+    """
+    if images is None:
+        listing = scan_folder(folder)
+    else:
+        listing = FolderListing(folder)
+        listing.images = list(images)
+    refs = {p for p in listing.images if "ref" in os.path.basename(p).lower()}
+    meta: Dict[str, MetaStruct] = {}
+    add_embedded_structs(meta, extract_image_params(listing, refs, use_entries=False))
+    return meta
+
+
+def extract_metadata(listing: FolderListing, with_image_params: bool = False) -> FolderMetadata:
+    """
+    提取目录元数据。with_image_params 为 True 时同时读取图片内嵌的生成参数（需要打开图片文件），
+    只在后台建立索引时使用；界面上由 collect_embedded_metadata 在目录信息显示之后再读取。
+    """
+    # 常见 JSON 参数/元数据：大文件只流式提取常用键，解析结果按路径与 mtime 记忆
+    sidecar = read_first_sidecar(listing.json_files[name] for name in JSON_SIDECAR_NAMES if name in listing.json_files)
+    # 参考图（文件名包含 ref/reference，或在 ref/ 子目录）
+    refs = [p for p in listing.images if "ref" in os.path.basename(p).lower()]
+    entries = {p: listing.entries[p] for p in listing.videos + refs}
+    if listing.ref_dir:
+        ref_listing = scan_folder(listing.ref_dir)
+        refs.extend(ref_listing.images)
+        entries.update(ref_listing.entries)
+    prompt_files = {name: listing.prompt_files[name] for name in PROMPT_FILE_NAMES if name in listing.prompt_files}
+    # 顶层不是对象的 JSON（例如数组）不作为参数文件
+    params = sidecar.params if sidecar is not None else None
+    return FolderMetadata(
+        listing.folder,
+        prompt_files,
+        params or None,
+        list(listing.videos),
+        refs,
+        entries,
+        params_path=sidecar.path if params else None,
+        params_truncated=bool(params) and sidecar.truncated,
+        image_params=extract_image_params(listing, refs) if with_image_params else None,
+    )
+
+
+def extract_image_params(
+    listing: FolderListing, skip: Iterable[str] = (), use_entries: bool = True
+) -> Dict[str, ImageParams]:
+    """
+    读取目录中图片内嵌的生成参数（参考图除外），最多 EMBEDDED_PARAMS_LIMIT 张，跳过序列帧目录。
+    只读取文件头部的元数据块，不解码像素；未变化的图片直接命中 read_image_params 的缓存。
+    use_entries 为 True 时 mtime 与大小取自刚扫描得到的 DirEntry，否则重新 stat。
+    """
+    result: Dict[str, ImageParams] = {}
+    skip_dirs = {os.path.normcase(name) for name in EMBEDDED_PARAMS_SKIP_DIRS}
+    if os.path.normcase(os.path.basename(os.path.normpath(listing.folder))) in skip_dirs:
+        return result
+    skipped = set(skip)
+    suffixes = tuple(EMBEDDED_PARAMS_EXTENSIONS)
+    # 同一目录下按完整路径排序即按文件名排序
+    candidates = sorted((p for p in listing.images if p not in skipped and p.lower().endswith(suffixes)), key=str.lower)
+    for path in candidates[:EMBEDDED_PARAMS_LIMIT]:
+        entry = listing.entries.get(path) if use_entries else None
+        try:
+            st = entry.stat() if entry is not None else None
+        except OSError:
+            continue
+        params = read_image_params(path, st)
+        if params is not None:
+            result[path] = params
+    return result
+
+
+def prompt_texts(data: FolderMetadata) -> List[Tuple[str, str]]:
+    """
+    读取目录中全部提示词来源的文本，供全文索引使用，返回 (来源, 文本) 列表：
+    - 提示词文本文件；VideoDetailWidget 以 JSON 写入的 提示词.txt 按视频拆分，来源为视频文件名
+    - JSON 参数文件中的 prompt
+    - 图片内嵌的正向提示词，来源为图片文件名
+    """
+    texts: List[Tuple[str, str]] = []
+    for name, path in data.prompt_files.items():
+        try:
+            with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+                content = f.read(PROMPT_TEXT_LIMIT)
+        except OSError:
+            continue
+        per_video = _video_prompts(content)
+        if per_video is not None:
+            texts.extend(per_video)
+        elif content.strip():
+            texts.append((name, content.strip()))
+    if data.params and data.params.get("prompt"):
+        texts.append(("其他参数", str(data.params["prompt"])[:PROMPT_TEXT_LIMIT]))
+    for path, params in data.image_params.items():
+        if params.prompt:
+            texts.append((os.path.basename(path), params.prompt[:PROMPT_TEXT_LIMIT]))
+    return texts
+
+
+def _video_prompts(content: str) -> Optional[List[Tuple[str, str]]]:
+    # 不是 JSON 对象时按普通文本处理
+    if not content.lstrip().startswith("{"):
+        return None
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    texts: List[Tuple[str, str]] = []
+    for key, value in data.items():
+        # 跳过 __reference_history__ 等内部字段
+        if key.startswith("__"):
+            continue
+        prompt = value.get("prompt") if isinstance(value, dict) else value
+        if prompt:
+            texts.append((key, str(prompt)[:PROMPT_TEXT_LIMIT]))
+    return texts
+
+
+def metadata_to_structs(data: FolderMetadata) -> Dict[str, MetaStruct]:
+    folder = data.folder
+    meta: Dict[str, MetaStruct] = {"目录": MetaStruct(folder, op_type='打开文件夹', op_name='打开', op_data=folder)}
+    # 1) 常见的提示词 / 参数文件
+    for i, (name, path) in enumerate(data.prompt_files.items()):
+        meta[f'提示词_{i}'] = MetaStruct(name, op_type='打开文本文件', op_name='查看', op_data=path)
+
+    # 2) 常见 JSON 参数/元数据
+    if data.params:
+        # 直接解析常用键
+        if data.model:
+            meta["模型名称"] = MetaStruct("模型名称", data.model)
+        # 如果 JSON 本身就包含 prompt，也补上
+        if data.prompt is not None and "提示词" not in meta:
+            meta["提示词"] = MetaStruct("提示词", data.prompt)
+        if data.params_truncated:
+            # 大文件只读取了常用键，完整内容按需用外部程序查看
+            meta["其他参数"] = MetaStruct(
+                "其他参数（仅常用键）", data.params, op_type='打开文本文件', op_name='查看', op_data=data.params_path
+            )
+        else:
+            meta["其他参数"] = MetaStruct("其他参数", data.params)
+
+    # 3) 图片内嵌的生成参数（从索引还原时才有，实时浏览时由 collect_embedded_metadata 另行读取）
+    add_embedded_structs(meta, data.image_params)
+
+    # 4) 视频文件列表：只放一个汇总行，逐个文件的行由表格分页生成
+    if data.videos:
+        videos = MediaList("视频文件", data.videos, data.entries)
+        meta["视频文件"] = MetaStruct(f"共 {len(videos)} 个", op_data=videos)
+
+    # 5) 参考图
+    refs = data.refs
+    if refs:
+        preview = ", ".join(os.path.basename(r) for r in refs[:REF_PREVIEW_LIMIT])
+        meta["参考图"] = MetaStruct(
+            "参考图",
+            preview + (" ..." if len(refs) > REF_PREVIEW_LIMIT else ""),
+            op_data=MediaList("参考图", refs, data.entries),
+        )
+
+    return meta
+
+
+def add_embedded_structs(meta: Dict[str, MetaStruct], image_params: Dict[str, ImageParams]) -> None:
+    """展示第一张含内嵌参数的图片，meta 中没有模型名称时也用它补充。"""
+    embedded = next(iter(image_params.items()), None)
+    if embedded is None:
+        return
+    path, params = embedded
+    count = len(image_params)
+    meta["内嵌参数"] = MetaStruct(
+        os.path.basename(path) + (f" 等 {count} 张图片" if count > 1 else ""),
+        op_type='打开文件', op_name='打开', op_data=path,
+    )
+    if params.prompt:
+        meta["内嵌提示词"] = MetaStruct(params.prompt[:2000])
+    if params.negative_prompt:
+        meta["内嵌反向提示词"] = MetaStruct(params.negative_prompt[:2000])
+    if params.settings:
+        meta["内嵌生成参数"] = MetaStruct(params.settings)
+    if params.model and "模型名称" not in meta:
+        meta["模型名称"] = MetaStruct("模型名称", params.model)
+
+
+class MediaList:
+    """
+    目录中的一组媒体文件（视频或参考图），由表格按页取出行。
+    排序所需的大小与 mtime 优先取自扫描时的 DirEntry（Windows 上无需额外系统调用），
+    从索引还原的列表没有 DirEntry 时才单独 stat。
+    """
+
+    def __init__(self, kind: str, paths: List[str], entries: Optional[Dict[str, os.DirEntry]] = None):
+        self.kind: str = kind
+        self.paths: List[str] = list(paths)
+        self._entries: Dict[str, os.DirEntry] = entries or {}
+        self._stats: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, MediaList) and self.kind == other.kind and self.paths == other.paths
+
+    def sorted_paths(self, key: str = "name", descending: bool = False) -> List[str]:
+        """返回排序后的新列表，不修改自身（元数据可能与缓存共享）。"""
+        if key == "size":
+            sort_key = lambda p: self.stat(p)[0]
+        elif key == "mtime":
+            sort_key = lambda p: self.stat(p)[1]
+        else:
+            sort_key = lambda p: os.path.basename(p).lower()
+        return sorted(self.paths, key=sort_key, reverse=descending)
+
+    def stat(self, path: str) -> Tuple[int, int]:
+        """(大小, mtime_ns)，无法访问时为 (0, 0)。"""
+        cached = self._stats.get(path)
+        if cached is not None:
+            return cached
+        try:
+            entry = self._entries.get(path)
+            st = entry.stat() if entry is not None else os.stat(path)
+            result = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            result = (0, 0)
+        self._stats[path] = result
+        return result
+
+    def row(self, index: int, path: str) -> Tuple[str, MetaStruct]:
+        """第 index 行（按当前排序）的表格键与内容。"""
+        name = os.path.basename(path)
+        if self.kind == "视频文件":
+            return f"视频文件_{index}", MetaStruct(name, op_type='视频元数据', op_name='元数据', op_data=path)
+        return f"{self.kind}_{index}", MetaStruct(name, op_type='打开文件', op_name='打开', op_data=path)
+
+
+class _CacheEntry:
+    def __init__(
+        self, dir_mtime: int, source_mtimes: Dict[str, int], meta: Dict[str, MetaStruct], images: List[str]
+    ):
+        self.dir_mtime = dir_mtime
+        self.source_mtimes = source_mtimes
+        self.meta = meta
+        self.images = images
+
+
+class MetadataCache:
+    """
+    目录元数据的 LRU 缓存，可在多个线程中使用。
+    - 目录 mtime 覆盖文件的增删与重命名；提示词 / JSON 文件和 ref/ 目录的 mtime 覆盖原地修改
+    - 命中时只需 stat 目录本身和少量附属文件，不再重新遍历目录
+    - 不含图片内嵌参数：原地覆盖图片不会改变目录 mtime，内嵌参数由 read_image_params 按图片 mtime 缓存
+    - 返回的字典与缓存共享，调用方不应修改
+    """
+
+    def __init__(self, max_entries: int = METADATA_CACHE_SIZE):
+        self.max_entries: int = max(1, max_entries)
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_collect(self, folder: str) -> Dict[str, MetaStruct]:
+        key = os.path.normcase(os.path.normpath(folder))
+        with self._lock:
+            entry = self._entries.get(key)
+        dir_mtime = mtime_ns(folder)
+        if entry is not None and dir_mtime is not None and self._is_valid(entry, dir_mtime):
+            with self._lock:
+                self.hits += 1
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+            return entry.meta
+        # 先取目录 mtime 再遍历：遍历期间发生的变化会让下次校验失败，不会缓存过期结果
+        listing = scan_folder(folder)
+        meta = build_metadata(listing)
+        with self._lock:
+            self.misses += 1
+            if dir_mtime is not None:
+                self._entries[key] = _CacheEntry(dir_mtime, listing.source_mtimes, meta, listing.images)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return meta
+
+    def invalidate(self, folder: Optional[str] = None) -> None:
+        """作废指定目录的缓存；不指定目录时清空全部缓存。"""
+        with self._lock:
+            if folder is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.normcase(os.path.normpath(folder)), None)
+
+    def sources(self, folder: str) -> List[str]:
+        """缓存中记录的附属文件路径（提示词、JSON、ref/ 目录），目录未缓存时返回空列表。"""
+        with self._lock:
+            entry = self._entries.get(os.path.normcase(os.path.normpath(folder)))
+            return list(entry.source_mtimes) if entry is not None else []
+
+    def images(self, folder: str) -> Optional[List[str]]:
+        """缓存中记录的图片路径，目录未缓存时返回 None。"""
+        with self._lock:
+            entry = self._entries.get(os.path.normcase(os.path.normpath(folder)))
+            return list(entry.images) if entry is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    @staticmethod
+    def _is_valid(entry: _CacheEntry, dir_mtime: int) -> bool:
+        return entry.dir_mtime == dir_mtime and sources_unchanged(entry.source_mtimes)
+
+
+def sources_unchanged(source_mtimes: Dict[str, int]) -> bool:
+    """附属文件的 mtime 是否与记录一致（文件被删除也视为变化）。"""
+    return all(mtime_ns(path) == mtime for path, mtime in source_mtimes.items())
+
+
+def mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
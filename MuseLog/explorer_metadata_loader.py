@@ -0,0 +1,95 @@
+import logging
+import threading
+import traceback
+from typing import Callable, Dict, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from MuseLog.explorer_metadata import MetaStruct, collect_metadata
+
+# 元数据收集以 IO 为主，两个线程足以让慢盘上的请求不互相排队
+LOADER_MAX_THREADS = 2
+
+MetadataCollector = Callable[[str], Dict[str, MetaStruct]]
+
+
+class _LoaderSignals(QObject):
+    # 请求代号、目录、元数据字典
+    loaded = Signal(int, str, object)
+    # 请求代号、目录、错误信息
+    failed = Signal(int, str, str)
+
+
+class _MetadataTask(QRunnable):
+    def __init__(self, loader: "MetadataLoader", generation: int, folder: str):
+        super().__init__()
+        self._loader = loader
+        self._generation = generation
+        self._folder = folder
+
+    def run(self) -> None:
+        # 开始执行前已被更新的请求取代（例如方向键快速划过的目录），直接放弃
+        if not self._loader.is_current(self._generation):
+            return
+        try:
+            meta = self._loader.collector(self._folder)
+        except Exception:
+            self._loader.signals.failed.emit(self._generation, self._folder, traceback.format_exc())
+            return
+        self._loader.signals.loaded.emit(self._generation, self._folder, meta)
+
+
+class MetadataLoader(QObject):
+    """
+    在线程池中异步收集目录元数据：
+    - 每次请求分配递增的代号，只有最新请求的结果会通过 metadata_loaded 发出，过期结果直接丢弃
+    - 新请求会清除尚未开始的旧任务，已在执行的旧任务完成后结果被忽略
+    """
+
+    metadata_loaded = Signal(str, object)
+    metadata_failed = Signal(str, str)
+
+    def __init__(self, parent: Optional[QObject] = None, collector: MetadataCollector = collect_metadata):
+        super().__init__(parent)
+        self.collector: MetadataCollector = collector
+        self.signals = _LoaderSignals(self)
+        self.signals.loaded.connect(self._on_loaded)
+        self.signals.failed.connect(self._on_failed)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(LOADER_MAX_THREADS)
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def request(self, folder: str) -> int:
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._pool.clear()
+        self._pool.start(_MetadataTask(self, generation, folder))
+        return generation
+
+    def cancel(self) -> None:
+        """作废所有进行中的请求。"""
+        with self._lock:
+            self._generation += 1
+        self._pool.clear()
+
+    def is_current(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+    def stop(self) -> None:
+        self.cancel()
+        self._pool.waitForDone()
+
+    def _on_loaded(self, generation: int, folder: str, meta: Dict[str, MetaStruct]) -> None:
+        if not self.is_current(generation):
+            logging.debug("丢弃过期的元数据结果: %s", folder)
+            return
+        self.metadata_loaded.emit(folder, meta)
+
+    def _on_failed(self, generation: int, folder: str, error: str) -> None:
+        if not self.is_current(generation):
+            return
+        logging.error("收集目录元数据失败: %s\n%s", folder, error)
+        self.metadata_failed.emit(folder, error)
@@ -6,6 +6,8 @@ class ExplorerSignalManager(QObject):
     delete_selected_animation_sequence = Signal()
     # 定义重命名文件夹信号
     rename_folder = Signal(str, str)
+    # 将 FileOperation 加入后台文件操作队列
+    enqueue_file_operation = Signal(object)
 
 # 创建全局的 signal_manager 实例
 
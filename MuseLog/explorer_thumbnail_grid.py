@@ -0,0 +1,166 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, QPoint, QRect, QSize, Qt, Signal
+from PySide6.QtGui import QColor, QPalette
+from PySide6.QtWidgets import QListView, QStyle, QStyledItemDelegate, QStyleOptionViewItem, QWidget
+
+from MuseLog.thumbnail_loader import ThumbnailItem, ThumbnailLoader
+from MuseLog.video_probe import format_duration
+from MuseLog.video_probe_service import is_video
+
+# 缩略图四周的留白与文件名一行的高度
+GRID_PADDING = 6
+GRID_TEXT_LINES = 1
+
+
+class ThumbnailListModel(QAbstractListModel):
+    """缩略图网格的数据模型，每行是 (路径, 大小, mtime_ns)；缩略图由委托直接向 ThumbnailLoader 取。"""
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._items: List[ThumbnailItem] = []
+        # 每行的缓存键（设置列表时算好，绘制时不再计算）与缓存键 -> 行号，缩略图就绪时只重绘对应的行
+        self._keys: List[str] = []
+        self._rows_by_key: Dict[str, int] = {}
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self._items):
+            return None
+        path = self._items[index.row()][0]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return path
+        return None
+
+    def item(self, row: int) -> Optional[ThumbnailItem]:
+        if 0 <= row < len(self._items):
+            return self._items[row]
+        return None
+
+    def key(self, row: int) -> str:
+        return self._keys[row]
+
+    def set_items(self, items: Sequence[ThumbnailItem], loader: ThumbnailLoader) -> None:
+        self.beginResetModel()
+        self._items = list(items)
+        self._keys = [loader.key_for(item) for item in self._items]
+        self._rows_by_key = {key: row for row, key in enumerate(self._keys)}
+        self.endResetModel()
+
+    def row_of_key(self, key: str) -> int:
+        return self._rows_by_key.get(key, -1)
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """
+    绘制缩略图与文件名：内存缓存命中时直接绘制 QPixmap，未命中时绘制占位框并发出异步请求，
+    绘制过程不做任何 IO 或解码，滚动时每帧只有少量 drawPixmap。
+    """
+
+    def __init__(self, loader: ThumbnailLoader, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._loader = loader
+
+    def cell_size(self, option_height: int) -> QSize:
+        edge = self._loader.edge
+        return QSize(edge + GRID_PADDING * 2, edge + GRID_PADDING * 3 + option_height * GRID_TEXT_LINES)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return self.cell_size(option.fontMetrics.height())
+
+    def paint(self, painter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        model = index.model()
+        item = model.item(index.row()) if isinstance(model, ThumbnailListModel) else None
+        if item is None:
+            return
+        palette = option.palette
+        rect = option.rect
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(rect, palette.color(QPalette.ColorRole.Highlight))
+        elif option.state & QStyle.StateFlag.State_MouseOver:
+            painter.fillRect(rect, palette.color(QPalette.ColorRole.Midlight))
+
+        edge = self._loader.edge
+        image_rect = QRect(rect.x() + GRID_PADDING, rect.y() + GRID_PADDING, edge, edge)
+        pixmap = self._loader.pixmap(item, model.key(index.row()))
+        if pixmap is not None:
+            # 按原比例居中
+            size = pixmap.size().scaled(edge, edge, Qt.AspectRatioMode.KeepAspectRatio)
+            target = QRect(0, 0, size.width(), size.height())
+            target.moveCenter(image_rect.center())
+            painter.drawPixmap(target, pixmap)
+        else:
+            painter.fillRect(image_rect, QColor(128, 128, 128, 40))
+        if is_video(item[0]):
+            self._paint_video_badge(painter, option, image_rect, item)
+
+        text_rect = QRect(
+            rect.x() + GRID_PADDING, image_rect.bottom() + GRID_PADDING, edge, option.fontMetrics.height()
+        )
+        name = option.fontMetrics.elidedText(os.path.basename(item[0]), Qt.TextElideMode.ElideMiddle, edge)
+        role = QPalette.ColorRole.HighlightedText if option.state & QStyle.StateFlag.State_Selected else QPalette.ColorRole.Text
+        painter.setPen(palette.color(role))
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignVCenter, name)
+
+    def _paint_video_badge(self, painter, option: QStyleOptionViewItem, image_rect: QRect, item: ThumbnailItem) -> None:
+        # 右下角显示时长（尚未探测完成时显示"视频"）
+        info = self._loader.video_info(item)
+        text = format_duration(info.duration) if info is not None and not info.error else "视频"
+        metrics = option.fontMetrics
+        badge = QRect(0, 0, metrics.horizontalAdvance(text) + 8, metrics.height() + 2)
+        badge.moveBottomRight(image_rect.bottomRight() - QPoint(2, 2))
+        painter.fillRect(badge, QColor(0, 0, 0, 160))
+        painter.setPen(QColor(255, 255, 255))
+        painter.drawText(badge, Qt.AlignmentFlag.AlignCenter, text)
+
+
+class ThumbnailGridView(QListView):
+    """
+    资源管理器中的缩略图网格：
+    - 固定大小的格子（uniformItemSizes），上千张图片时布局计算不随行数增长
+    - 只有进入可见区域的格子才会被绘制，也就只为这些图片请求缩略图
+    双击图片或视频时发出 image_activated。
+    """
+
+    image_activated = Signal(str)
+
+    def __init__(self, loader: ThumbnailLoader, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self._loader = loader
+        self.grid_model = ThumbnailListModel(self)
+        self.grid_delegate = ThumbnailDelegate(loader, self)
+        self.setModel(self.grid_model)
+        self.setItemDelegate(self.grid_delegate)
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        self.setMouseTracking(True)
+        self.setGridSize(self.grid_delegate.cell_size(self.fontMetrics().height()))
+        # 按像素滚动，避免按行跳动
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(self.gridSize().height() // 4)
+        loader.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self.doubleClicked.connect(self._on_double_clicked)
+
+    def set_items(self, items: Sequence[ThumbnailItem], keep_position: bool = False) -> None:
+        """替换图片列表；keep_position 为 True 时（同一目录刷新）保留滚动位置。"""
+        position = self.verticalScrollBar().value() if keep_position else 0
+        self.grid_model.set_items(items, self._loader)
+        self.verticalScrollBar().setValue(position)
+
+    def _on_thumbnail_ready(self, key: str) -> None:
+        row = self.grid_model.row_of_key(key)
+        if row >= 0:
+            self.update(self.grid_model.index(row, 0))
+
+    def _on_double_clicked(self, index: QModelIndex) -> None:
+        item = self.grid_model.item(index.row())
+        if item is not None:
+            self.image_activated.emit(item[0])
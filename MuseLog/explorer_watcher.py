@@ -0,0 +1,108 @@
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+
+from MuseLog.explorer_metadata import mtime_ns
+
+# 事件合并窗口：生成器连续写出多张图片时只触发一次刷新
+WATCH_DEBOUNCE_MS = 300
+# 无法使用系统通知的路径（网络共享等）的轮询间隔
+WATCH_POLL_INTERVAL_MS = 2000
+
+
+def prefers_polling(path: str) -> bool:
+    """UNC 网络路径上系统文件通知不可靠，直接轮询。"""
+    return path.startswith("\\\\") or path.startswith("//")
+
+
+class FolderWatcher(QObject):
+    """
+    监视资源管理器当前展示的目录及其附属文件（提示词、JSON、ref/ 目录），
+    变化经过去抖合并后以目录为单位通过 folders_changed 发出：
+    - 目录本身的变化覆盖文件的增删与重命名，附属文件的变化覆盖原地修改
+    - QFileSystemWatcher 无法监视的路径改为按 mtime 轮询
+    """
+
+    # 发生变化的目录列表（每个目录只出现一次）
+    folders_changed = Signal(list)
+
+    def __init__(
+        self,
+        parent: Optional[QObject] = None,
+        debounce_ms: int = WATCH_DEBOUNCE_MS,
+        poll_interval_ms: int = WATCH_POLL_INTERVAL_MS,
+    ):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_path_changed)
+        self._watcher.fileChanged.connect(self._on_path_changed)
+        # 被监视的路径 -> 所属目录
+        self._owners: Dict[str, str] = {}
+        # 轮询的路径 -> 上次的 mtime
+        self._polled: Dict[str, Optional[int]] = {}
+        self._pending: Set[str] = set()
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._flush)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_interval_ms)
+        self._poll_timer.timeout.connect(self._poll)
+
+    def watch(self, folder: str, sources: Iterable[str] = ()) -> None:
+        """只监视一个目录及其附属文件，替换之前的监视对象。"""
+        # 重新监视同一目录时保留尚未发出的变化，刷新期间的新事件不会丢失
+        pending = set(self._pending) if self.watched_folder() == folder else set()
+        self.clear()
+        if pending:
+            self._pending = pending
+            self._debounce.start()
+        paths = [folder] + [p for p in sources if p != folder]
+        for path in paths:
+            self._owners[path] = folder
+            if prefers_polling(path) or not self._watcher.addPath(path):
+                self._polled[path] = mtime_ns(path)
+        if self._polled:
+            logging.debug("轮询监视 %d 个路径: %s", len(self._polled), folder)
+            self._poll_timer.start()
+
+    def clear(self) -> None:
+        watched: List[str] = self._watcher.files() + self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+        self._owners.clear()
+        self._polled.clear()
+        self._pending.clear()
+        self._debounce.stop()
+        self._poll_timer.stop()
+
+    def watched_folder(self) -> Optional[str]:
+        return next(iter(self._owners.values()), None)
+
+    def _on_path_changed(self, path: str) -> None:
+        folder = self._owners.get(path)
+        if folder is None:
+            return
+        # 以"写临时文件再替换"方式保存的文件会从监视列表中移除，需要重新加入
+        if path not in self._watcher.files() and path not in self._watcher.directories() and os.path.exists(path):
+            self._watcher.addPath(path)
+        self._pending.add(folder)
+        self._debounce.start()
+
+    def _poll(self) -> None:
+        for path, last in list(self._polled.items()):
+            current = mtime_ns(path)
+            if current != last:
+                self._polled[path] = current
+                self._pending.add(self._owners[path])
+        if self._pending and not self._debounce.isActive():
+            self._debounce.start()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        folders = sorted(self._pending)
+        self._pending.clear()
+        self.folders_changed.emit(folders)
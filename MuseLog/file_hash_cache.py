@@ -0,0 +1,80 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from MuseLog.batch_resize_manifest import file_sha1
+
+FILE_HASH_CACHE_NAME = "file_hashes.sqlite3"
+FILE_HASH_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    hashed_at REAL NOT NULL
+);
+"""
+
+
+def default_hash_cache_path() -> str:
+    return os.path.join(os.path.expanduser("~"), ".muselog", FILE_HASH_CACHE_NAME)
+
+
+class FileHashCache:
+    """
+    文件内容哈希（SHA-1）的持久化缓存（SQLite，位于 ~/.muselog），按路径存放，
+    大小与 mtime 与记录一致时直接返回记录的哈希，不再读取文件。连接可在多个线程间共享（内部加锁）。
+    新记录在 flush() / close() 时统一提交，同步上千个文件时不会每个文件提交一次事务。
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path: str = db_path or default_hash_cache_path()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, FILE_HASH_SCHEMA_VERSION):
+                self._conn.execute("DROP TABLE IF EXISTS hashes")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {FILE_HASH_SCHEMA_VERSION}")
+            self._conn.commit()
+
+    def sha1(self, path: str, st: Optional[os.stat_result] = None) -> str:
+        """文件当前内容的哈希；文件在上次记录后未变化时不读取文件。"""
+        st = st or os.stat(path)
+        key = _cache_key(path)
+        with self._lock:
+            row = self._conn.execute("SELECT size, mtime_ns, sha1 FROM hashes WHERE path = ?", (key,)).fetchone()
+        if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+        digest = file_sha1(path)
+        self.record(path, st, digest)
+        return digest
+
+    def record(self, path: str, st: os.stat_result, digest: str) -> None:
+        """记录已知内容的哈希（例如刚写入的文件，内容即源文件的内容）。"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hashes (path, size, mtime_ns, sha1, hashed_at) VALUES (?, ?, ?, ?, ?)",
+                (_cache_key(path), st.st_size, st.st_mtime_ns, digest, time.time()),
+            )
+
+    def flush(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+def _cache_key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from MuseLog.file_operations import FileOperation, OperationResult, run_operation
+
+# 进度信号的最短发送间隔（秒），大量小文件时不会刷屏阻塞界面事件循环
+PROGRESS_EMIT_INTERVAL = 0.1
+
+
+class FileOperationJob(QThread):
+    """在后台线程中执行一个 FileOperation，节流发送字节级进度与传输速率，可随时取消。"""
+
+    # 当前文件、已完成字节数、总字节数、速率（字节/秒）、预计剩余秒数（未知时为 -1）
+    # 字节数可能超过 32 位整数，使用 object 传递
+    progress_changed = Signal(str, object, object, float, float)
+    # OperationResult
+    job_finished = Signal(object)
+
+    def __init__(self, operation: FileOperation, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.operation: FileOperation = operation
+        self.result = OperationResult()
+        self._cancel_event = threading.Event()
+        self._started_at = 0.0
+        self._last_emit = 0.0
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def stop(self) -> None:
+        if self.isRunning():
+            self.cancel()
+            self.wait()
+
+    def run(self) -> None:
+        self._started_at = time.monotonic()
+        try:
+            run_operation(self.operation, self._on_progress, self._cancel_event.is_set, self.result)
+        except Exception as e:
+            logging.exception(f"文件操作失败: {self.operation.title}")
+            self.result.errors.append((self.operation.title, str(e)))
+        self.result.cancelled = self.result.cancelled or self._cancel_event.is_set()
+        self._emit_progress("", force=True)
+        self.job_finished.emit(self.result)
+
+    def _on_progress(self, _count: int, path: str) -> None:
+        self._emit_progress(path)
+
+    def _emit_progress(self, path: str, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_emit < PROGRESS_EMIT_INTERVAL:
+            return
+        self._last_emit = now
+        done, total = self.result.done_bytes, self.result.total_bytes
+        rate = done / max(now - self._started_at, 1e-6)
+        eta = (total - done) / rate if total and rate > 0 else -1.0
+        self.progress_changed.emit(path, done, total, rate, eta)
+
+
+class FileOperationQueue(QObject):
+    """
+    文件操作队列：同一时间只执行一个操作（同一块磁盘上并行复制只会互相拖慢），其余依次排队。
+    界面线程中使用；操作结束后调用其 on_finished 并发出 operation_finished。
+    stop() 之后不再接受新的操作。
+    """
+
+    # 操作标题、当前文件、已完成字节数、总字节数、速率（字节/秒）、预计剩余秒数
+    progress_changed = Signal(str, str, object, object, float, float)
+    # FileOperation、OperationResult
+    operation_finished = Signal(object, object)
+    # 排队中（含正在执行）的操作数
+    queue_changed = Signal(int)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._pending: List[FileOperation] = []
+        self._job: Optional[FileOperationJob] = None
+        self._stopped: bool = False
+
+    @property
+    def busy(self) -> bool:
+        return self._job is not None
+
+    def enqueue(self, operation: FileOperation) -> None:
+        if self._stopped:
+            logging.warning("文件操作队列已停止，忽略: %s", operation.title)
+            return
+        self._pending.append(operation)
+        self.queue_changed.emit(self.pending_count())
+        self._start_next()
+
+    def pending_count(self) -> int:
+        return len(self._pending) + (1 if self._job is not None else 0)
+
+    def cancel(self) -> None:
+        """取消正在执行的操作并清空队列。已复制完成的文件保留，重新执行时会被跳过。"""
+        self._pending.clear()
+        if self._job is not None:
+            self._job.cancel()
+        self.queue_changed.emit(self.pending_count())
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._pending.clear()
+        if self._job is not None:
+            self._job.job_finished.disconnect(self._on_job_finished)
+            self._job.stop()
+            self._job = None
+
+    def _start_next(self) -> None:
+        if self._job is not None or not self._pending:
+            return
+        operation = self._pending.pop(0)
+        job = FileOperationJob(operation, self)
+        job.progress_changed.connect(
+            lambda path, done, total, rate, eta, title=operation.title: self.progress_changed.emit(
+                title, path, done, total, rate, eta
+            )
+        )
+        job.job_finished.connect(self._on_job_finished)
+        # 线程真正退出后再释放对象
+        job.finished.connect(job.deleteLater)
+        self._job = job
+        job.start()
+
+    def _on_job_finished(self, result: OperationResult) -> None:
+        job, self._job = self._job, None
+        operation = job.operation if job is not None else None
+        if operation is not None:
+            logging.info("文件操作结束: %s（%s）", operation.title, result.summary())
+            if operation.on_finished is not None:
+                try:
+                    operation.on_finished(result)
+                except Exception:
+                    logging.exception(f"文件操作收尾失败: {operation.title}")
+            self.operation_finished.emit(operation, result)
+        self.queue_changed.emit(self.pending_count())
+        self._start_next()
@@ -0,0 +1,360 @@
+import logging
+import os
+import shutil
+from typing import Callable, Dict, List, Optional, Tuple
+
+from MuseLog.file_hash_cache import FileHashCache
+
+# 与批量缩放相同的半成品后缀，中断后留在目标目录中的只会是 *.part 及其来源记录
+PARTIAL_SUFFIX = ".part"
+# 记录 .part 写入时源文件的大小与 mtime_ns，两者完全一致才续传
+PARTIAL_SOURCE_SUFFIX = ".part.src"
+COPY_CHUNK_SIZE = 1024 * 1024
+# FAT32 / exFAT 与部分网络共享只保存到 2 秒精度的 mtime
+MTIME_TOLERANCE_NS = 2_000_000_000
+
+# 已完成的字节数增量、当前文件
+ProgressCallback = Callable[[int, str], None]
+StopCallback = Callable[[], bool]
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+class FileTask:
+    """操作中的一步：复制一个文件、删除一个文件或删除一个（已清空的）目录。"""
+
+    COPY = "copy"
+    DELETE = "delete"
+    RMDIR = "rmdir"
+
+    def __init__(self, kind: str, source: str, destination: str = "", size: int = 0):
+        self.kind: str = kind
+        self.source: str = source
+        self.destination: str = destination
+        self.size: int = size
+
+
+class OperationResult:
+    def __init__(self):
+        self.total_bytes: int = 0
+        self.done_bytes: int = 0
+        self.copied: int = 0
+        self.skipped: int = 0
+        self.deleted: int = 0
+        # 本次写入的目标文件
+        self.changed: List[str] = []
+        self.errors: List[Tuple[str, str]] = []
+        self.cancelled: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.cancelled
+
+    def summary(self) -> str:
+        parts = []
+        if self.copied or self.skipped:
+            parts.append(f"复制 {self.copied} 个，跳过未变化的 {self.skipped} 个")
+        if self.deleted:
+            parts.append(f"删除 {self.deleted} 项")
+        if self.errors:
+            parts.append(f"失败 {len(self.errors)} 个")
+        if self.cancelled:
+            parts.append("已取消")
+        return "，".join(parts) or "没有需要处理的文件"
+
+
+class FileOperation:
+    """
+    一个排队执行的文件操作。plan() 与 after() 在后台线程中调用，
+    on_finished（可选）在操作结束后于界面线程中以 OperationResult 调用。
+    """
+
+    # 取消时是否保留 .part 以便下次续传
+    keep_partial: bool = True
+
+    def __init__(self, title: str, on_finished: Optional[Callable[[OperationResult], None]] = None):
+        self.title: str = title
+        self.on_finished: Optional[Callable[[OperationResult], None]] = on_finished
+
+    def plan(self, result: OperationResult) -> List[FileTask]:
+        raise NotImplementedError
+
+    def after(self, result: OperationResult) -> None:
+        """所有步骤成功完成后的收尾（后台线程）。"""
+
+    def finish(self, result: OperationResult) -> None:
+        """操作结束时调用（后台线程，无论成功、出错还是取消），释放 plan() 中打开的资源。"""
+
+
+class CopyTreeOperation(FileOperation):
+    """
+    相当于 shutil.copytree(source, destination, dirs_exist_ok=True)，
+    但目标中大小与 mtime 都一致的文件直接跳过，重复同步时只复制变化的文件。
+    """
+
+    def __init__(
+        self,
+        source: str,
+        destination: str,
+        title: Optional[str] = None,
+        on_finished: Optional[Callable[[OperationResult], None]] = None,
+    ):
+        super().__init__(title or f"复制 {os.path.basename(source)}", on_finished)
+        self.source: str = source
+        self.destination: str = destination
+
+    def plan(self, result: OperationResult) -> List[FileTask]:
+        if not os.path.isdir(self.source):
+            raise FileNotFoundError(f"{self.source} 不存在")
+        tasks: List[FileTask] = []
+        self._plan_dir(self.source, self.destination, tasks, result)
+        return tasks
+
+    def _plan_dir(self, source: str, destination: str, tasks: List[FileTask], result: OperationResult) -> None:
+        with os.scandir(source) as entries:
+            for entry in entries:
+                target = os.path.join(destination, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    self._plan_dir(entry.path, target, tasks, result)
+                    continue
+                st = entry.stat()
+                if is_up_to_date(st, target):
+                    result.skipped += 1
+                    continue
+                tasks.append(FileTask(FileTask.COPY, entry.path, target, st.st_size))
+
+
+class DeltaSyncOperation(FileOperation):
+    """
+    按内容同步目录：目标中内容（SHA-1）与源文件相同的文件不写入，即使 mtime 不同
+    （例如重新导出后只有部分贴图真正变化）。哈希由 FileHashCache 按路径、大小与 mtime 缓存，
+    未变化的源文件与目标文件都不会被重新读取。变化的文件经 .part 写入后替换，目标中不会出现写了一半的文件。
+    子类可覆盖 target_name() 在目标中使用不同的文件名。
+    目标通常是会自动导入资源的游戏项目，取消时不保留 .part。
+    """
+
+    keep_partial = False
+
+    def __init__(
+        self,
+        source: str,
+        destination: str,
+        title: Optional[str] = None,
+        on_finished: Optional[Callable[[OperationResult], None]] = None,
+        hash_cache_path: Optional[str] = None,
+    ):
+        super().__init__(title or f"同步 {os.path.basename(source)}", on_finished)
+        self.source: str = source
+        self.destination: str = destination
+        self.hash_cache_path: Optional[str] = hash_cache_path
+        self._hash_cache: Optional[FileHashCache] = None
+        # 目标路径 -> 将写入的内容的哈希，写入后记入缓存，下次同步时无需重新读取目标
+        self._digests: Dict[str, str] = {}
+
+    def target_name(self, relative: str) -> str:
+        return relative
+
+    def plan(self, result: OperationResult) -> List[FileTask]:
+        if not os.path.isdir(self.source):
+            raise FileNotFoundError(f"{self.source} 不存在")
+        self._hash_cache = FileHashCache(self.hash_cache_path)
+        tasks: List[FileTask] = []
+        self._plan_dir(self.source, "", tasks, result)
+        # 复制期间不占用写事务
+        self._hash_cache.flush()
+        return tasks
+
+    def _plan_dir(self, folder: str, prefix: str, tasks: List[FileTask], result: OperationResult) -> None:
+        cache = self._hash_cache
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                relative = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    self._plan_dir(entry.path, relative + os.sep, tasks, result)
+                    continue
+                src_stat = entry.stat()
+                target = os.path.join(self.destination, self.target_name(relative))
+                digest = cache.sha1(entry.path, src_stat)
+                try:
+                    dst_stat = os.stat(target)
+                except OSError:
+                    dst_stat = None
+                # 大小不同时无需读取目标文件
+                if dst_stat is not None and dst_stat.st_size == src_stat.st_size and cache.sha1(target, dst_stat) == digest:
+                    result.skipped += 1
+                    continue
+                self._digests[target] = digest
+                tasks.append(FileTask(FileTask.COPY, entry.path, target, src_stat.st_size))
+
+    def finish(self, result: OperationResult) -> None:
+        cache, self._hash_cache = self._hash_cache, None
+        if cache is None:
+            return
+        try:
+            for target in result.changed:
+                cache.record(target, os.stat(target), self._digests[target])
+        except OSError:
+            logging.debug("记录目标文件哈希失败", exc_info=True)
+        finally:
+            cache.close()
+
+
+class DeleteOperation(FileOperation):
+    """删除一组文件或目录（目录连同其中内容），按文件逐个删除，可在任意两个文件之间取消。"""
+
+    def __init__(
+        self,
+        paths: List[str],
+        title: Optional[str] = None,
+        on_finished: Optional[Callable[[OperationResult], None]] = None,
+    ):
+        super().__init__(title or f"删除 {len(paths)} 项", on_finished)
+        self.paths: List[str] = list(paths)
+
+    def plan(self, result: OperationResult) -> List[FileTask]:
+        tasks: List[FileTask] = []
+        for path in self.paths:
+            if os.path.isdir(path) and not os.path.islink(path):
+                self._plan_dir(path, tasks)
+            elif os.path.lexists(path):
+                tasks.append(FileTask(FileTask.DELETE, path, size=_file_size(path)))
+        return tasks
+
+    def _plan_dir(self, folder: str, tasks: List[FileTask]) -> None:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    self._plan_dir(entry.path, tasks)
+                else:
+                    tasks.append(FileTask(FileTask.DELETE, entry.path, size=entry.stat(follow_symlinks=False).st_size))
+        # 目录在其中的文件之后删除
+        tasks.append(FileTask(FileTask.RMDIR, folder))
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.lstat(path).st_size
+    except OSError:
+        return 0
+
+
+def is_up_to_date(source_stat: os.stat_result, destination: str) -> bool:
+    """目标文件与源文件大小相同且 mtime 相差在容差以内（copy2 会保留 mtime）。"""
+    try:
+        st = os.stat(destination)
+    except OSError:
+        return False
+    return st.st_size == source_stat.st_size and abs(st.st_mtime_ns - source_stat.st_mtime_ns) <= MTIME_TOLERANCE_NS
+
+
+def copy_file(
+    source: str, destination: str, progress: ProgressCallback, should_stop: StopCallback, keep_partial: bool = True
+) -> None:
+    """
+    分块复制单个文件并逐块报告进度，完成后保留 mtime 等属性。
+    先写入 destination.part 再替换；取消时（keep_partial 为 True）保留 .part，下次复制同一文件时从已写入的位置继续。
+    .part 开始写入时在 destination.part.src 中记录源文件的大小与 mtime_ns，只有源文件与记录完全一致才续传；
+    源文件被换成内容不同的文件时（即使 mtime 更早，例如从备份恢复）重新复制。
+    """
+    partial = destination + PARTIAL_SUFFIX
+    partial_source = destination + PARTIAL_SOURCE_SUFFIX
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    src_stat = os.stat(source)
+    signature = f"{src_stat.st_size} {src_stat.st_mtime_ns}"
+    offset = 0
+    try:
+        with open(partial_source, "r", encoding="ascii") as f:
+            recorded = f.read().strip()
+        part_size = os.stat(partial).st_size
+        if recorded == signature and part_size <= src_stat.st_size:
+            offset = part_size
+    except (OSError, ValueError):
+        pass
+    try:
+        if not offset:
+            with open(partial_source, "w", encoding="ascii") as f:
+                f.write(signature)
+        with open(source, "rb") as src, open(partial, "ab" if offset else "wb") as dst:
+            if offset:
+                src.seek(offset)
+                progress(offset, source)
+            while True:
+                if should_stop():
+                    raise OperationCancelled()
+                chunk = src.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                progress(len(chunk), source)
+        shutil.copystat(source, partial)
+        os.replace(partial, destination)
+        _remove_if_exists(partial_source)
+    except OperationCancelled:
+        if not keep_partial:
+            _remove_if_exists(partial)
+            _remove_if_exists(partial_source)
+        raise
+    except BaseException:
+        # 出错时丢弃半成品，避免下次从错误的内容续传
+        _remove_if_exists(partial)
+        _remove_if_exists(partial_source)
+        raise
+
+
+def _remove_if_exists(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def run_operation(
+    operation: FileOperation,
+    progress: ProgressCallback,
+    should_stop: StopCallback,
+    result: Optional[OperationResult] = None,
+) -> OperationResult:
+    """依次执行操作的各个步骤；单个文件出错时记录后继续，取消时在当前文件之后停止。"""
+    result = result or OperationResult()
+    try:
+        return _run_tasks(operation, progress, should_stop, result)
+    finally:
+        operation.finish(result)
+
+
+def _run_tasks(
+    operation: FileOperation, progress: ProgressCallback, should_stop: StopCallback, result: OperationResult
+) -> OperationResult:
+    tasks = operation.plan(result)
+    result.total_bytes = sum(task.size for task in tasks)
+
+    def on_bytes(count: int, path: str) -> None:
+        result.done_bytes += count
+        progress(count, path)
+
+    try:
+        for task in tasks:
+            if should_stop():
+                raise OperationCancelled()
+            try:
+                if task.kind == FileTask.COPY:
+                    copy_file(task.source, task.destination, on_bytes, should_stop, operation.keep_partial)
+                    result.copied += 1
+                    result.changed.append(task.destination)
+                    continue
+                if task.kind == FileTask.DELETE:
+                    os.remove(task.source)
+                else:
+                    os.rmdir(task.source)
+                result.deleted += 1
+                logging.info("Removed path: %s", task.source)
+                on_bytes(task.size, task.source)
+            except OSError as e:
+                logging.warning("文件操作失败: %s (%s)", task.source, e)
+                result.errors.append((task.source, str(e)))
+    except OperationCancelled:
+        result.cancelled = True
+        return result
+    if not result.errors:
+        operation.after(result)
+    return result
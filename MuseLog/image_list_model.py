@@ -0,0 +1,152 @@
+import os
+from typing import Dict, Iterable, List, Optional
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, Qt
+
+# 每次向视图暴露的行数，超过的部分在滚动到底部时再加载
+FETCH_BATCH_SIZE = 2000
+# 删除时连续区间不超过此数量才逐段发出 rowsRemoved，更零散的选择一次压缩后重置模型
+REMOVE_RANGES_LIMIT = 16
+
+
+class ImagePathListModel(QAbstractListModel):
+    """
+    图片路径列表模型：
+    - 路径数组 + 路径到行号的索引，去重为 O(1)；删除后行号延迟到下次按路径查找时才重建
+    - 批量插入只触发一次模型信号
+    - 删除选中项时按连续区间批量删除，区间零散时一次压缩数组，而不是逐项 list.remove
+    - 通过 canFetchMore / fetchMore 分批暴露行，配合 QListView 只绘制可见项
+    """
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._paths: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # _rows 中从此行起的行号已过期（路径集合仍然准确），None 表示索引完整
+        self._stale_from: Optional[int] = None
+        self._loaded: int = 0
+
+    # ---------------------- Qt 模型接口 ----------------------
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self._loaded
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self._paths[index.row()]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid():
+            return False
+        return self._loaded < len(self._paths)
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent.isValid():
+            return
+        remaining = len(self._paths) - self._loaded
+        if remaining <= 0:
+            return
+        count = min(FETCH_BATCH_SIZE, remaining)
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    # ---------------------- 数据操作 ----------------------
+    def paths(self) -> List[str]:
+        return list(self._paths)
+
+    def path_count(self) -> int:
+        """全部路径数量（包括尚未暴露给视图的部分）。"""
+        return len(self._paths)
+
+    def row_of(self, path: str) -> int:
+        self._sync_rows()
+        return self._rows.get(os.path.normcase(path), -1)
+
+    def set_paths(self, paths: Iterable[str]) -> None:
+        self.beginResetModel()
+        self._paths = []
+        self._rows = {}
+        self._stale_from = None
+        self._append(paths)
+        self._loaded = min(FETCH_BATCH_SIZE, len(self._paths))
+        self.endResetModel()
+
+    def add_paths(self, paths: Iterable[str]) -> int:
+        """追加路径（已存在的会被忽略），新行在视图滚动到底部时再分批暴露。"""
+        before = len(self._paths)
+        self._append(paths)
+        added = len(self._paths) - before
+        if added and before < FETCH_BATCH_SIZE:
+            self.fetchMore()
+        return added
+
+    def clear(self) -> None:
+        self.set_paths([])
+
+    def remove_rows(self, rows: Iterable[int]) -> int:
+        """
+        删除指定行：排序后合并为连续区间。区间较少时从后往前逐段删除；
+        区间较多（例如隔行多选）时在一次模型重置内一遍压缩路径数组，避免每段都移动其后的全部元素。
+        索引只删除被移除的路径（O(k)），其后各行的行号标记为过期，
+        连续多次删除合并到下次 row_of 时一次重建，而不是每次删除都重写尾部索引。
+        路径数组本身的 del / 压缩仍需移动其后的元素，这是 Python 列表的固有开销。
+        """
+        unique_rows = sorted({r for r in rows if 0 <= r < self._loaded}, reverse=True)
+        if not unique_rows:
+            return 0
+        ranges = []
+        end = start = unique_rows[0]
+        for row in unique_rows[1:]:
+            if row == start - 1:
+                start = row
+                continue
+            ranges.append((start, end))
+            end = start = row
+        ranges.append((start, end))
+        if len(ranges) > REMOVE_RANGES_LIMIT:
+            removed = set(unique_rows)
+            self.beginResetModel()
+            for row in unique_rows:
+                self._rows.pop(os.path.normcase(self._paths[row]), None)
+            self._paths = [path for row, path in enumerate(self._paths) if row not in removed]
+            self._loaded -= len(unique_rows)
+            self.endResetModel()
+        else:
+            for start, end in ranges:
+                self.beginRemoveRows(QModelIndex(), start, end)
+                for path in self._paths[start:end + 1]:
+                    self._rows.pop(os.path.normcase(path), None)
+                del self._paths[start:end + 1]
+                self._loaded -= end - start + 1
+                self.endRemoveRows()
+        first = unique_rows[-1]
+        if self._stale_from is None or first < self._stale_from:
+            self._stale_from = first
+        return len(unique_rows)
+
+    def remove_indexes(self, indexes: Iterable[QModelIndex]) -> int:
+        return self.remove_rows(index.row() for index in indexes if index.isValid())
+
+    def _sync_rows(self) -> None:
+        if self._stale_from is None:
+            return
+        rows = self._rows
+        paths = self._paths
+        for row in range(self._stale_from, len(paths)):
+            rows[os.path.normcase(paths[row])] = row
+        self._stale_from = None
+
+    def _append(self, paths: Iterable[str]) -> None:
+        rows = self._rows
+        store = self._paths
+        for path in paths:
+            key = os.path.normcase(path)
+            if key in rows:
+                continue
+            rows[key] = len(store)
+            store.append(path)
@@ -0,0 +1,488 @@
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+# 支持读取内嵌生成参数的图片格式
+EMBEDDED_PARAMS_EXTENSIONS = {".png", ".webp", ".jpg", ".jpeg"}
+_SUFFIXES = tuple(EMBEDDED_PARAMS_EXTENSIONS)
+# 单个文本块 / EXIF 段的最大字节数，超过时跳过（ComfyUI 的 workflow 可达数 MB，且无需读取）
+IMAGE_TEXT_LIMIT = 4 * 1024 * 1024
+# 解析结果缓存的条目数
+IMAGE_PARAMS_CACHE_ENTRIES = 4096
+
+# 需要读取的 PNG 文本块关键字：A1111 的 parameters、ComfyUI 的 prompt（API 格式节点图）、NovelAI 的 Description / Comment
+_PNG_KEYS = {"parameters", "prompt", "Description", "Comment"}
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# PNG 关键字最长 79 字节，加上结尾的 \0
+_PNG_KEYWORD_MAX = 80
+
+_EXIF_IFD_POINTER = 0x8769
+_EXIF_IMAGE_DESCRIPTION = 0x010E
+_EXIF_USER_COMMENT = 0x9286
+
+# A1111 参数文本的最后一行形如 "Steps: 20, Sampler: Euler a, CFG scale: 7, Seed: 1, Model: xxx"
+_A1111_SETTING = re.compile(r'\s*([\w ./-]+):\s*("(?:\\.|[^\\"])*"|[^,]*)(?:,|$)')
+_NEGATIVE_PREFIX = "Negative prompt:"
+
+
+class ImageParams:
+    """
+    图片内嵌的生成参数。只保存提示词、模型等摘要，不保留原始文本块（workflow 等可能很大）。
+    generator 为 "a1111"、"comfyui"、"novelai" 或 "text"（无法识别格式的 UserComment 等）。
+    """
+
+    def __init__(
+        self,
+        generator: str,
+        prompt: str = "",
+        negative_prompt: str = "",
+        model: str = "",
+        settings: str = "",
+    ):
+        self.generator: str = generator
+        self.prompt: str = prompt
+        self.negative_prompt: str = negative_prompt
+        self.model: str = model
+        self.settings: str = settings
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ImageParams) and vars(self) == vars(other)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {k: v for k, v in vars(self).items() if v}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> "ImageParams":
+        return cls(
+            data.get("generator", "text"),
+            data.get("prompt", ""),
+            data.get("negative_prompt", ""),
+            data.get("model", ""),
+            data.get("settings", ""),
+        )
+
+
+class _ImageParamsCache:
+    """按 (路径, mtime, 大小) 记忆解析结果（包括"没有内嵌参数"），文件被修改后自然失效。"""
+
+    def __init__(self, max_entries: int = IMAGE_PARAMS_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], Optional[ImageParams]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, signature: Tuple[int, int]) -> Tuple[bool, Optional[ImageParams]]:
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is None or cached[0] != signature:
+                return False, None
+            self._entries.move_to_end(path)
+            return True, cached[1]
+
+    def put(self, path: str, signature: Tuple[int, int], result: Optional[ImageParams]) -> None:
+        with self._lock:
+            self._entries[path] = (signature, result)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = _ImageParamsCache()
+
+
+def read_image_params(path: str, st: Optional[os.stat_result] = None) -> Optional[ImageParams]:
+    """
+    读取图片内嵌的生成参数，没有参数或格式不支持时返回 None。
+    只读取文件头部的元数据块，不解码像素；st 可传入 DirEntry.stat() 的结果以省去一次 stat。
+    """
+    if not path.lower().endswith(_SUFFIXES):
+        return None
+    try:
+        st = st or os.stat(path)
+    except OSError:
+        return None
+    signature = (st.st_mtime_ns, st.st_size)
+    hit, result = _cache.get(path, signature)
+    if hit:
+        return result
+    try:
+        result = parse_texts(read_image_texts(path))
+    except (OSError, ValueError, IndexError, KeyError, TypeError, struct.error, zlib.error) as e:
+        # 截断或损坏的元数据块视为没有参数，不影响目录中其他文件的元数据收集
+        logging.debug("读取图片内嵌参数失败: %s (%s)", path, e)
+        result = None
+    _cache.put(path, signature, result)
+    return result
+
+
+def clear_image_params_cache() -> None:
+    _cache.clear()
+
+
+# ---------------------- 元数据块读取 ----------------------
+def read_image_texts(path: str) -> Dict[str, str]:
+    """
+    按文件签名识别格式，返回元数据中的文本（关键字 -> 文本）：
+    - PNG：tEXt / zTXt / iTXt 中 _PNG_KEYS 的块，以及 eXIf；读到 IDAT 即停止
+    - WebP：EXIF 块（扩展格式中位于图像数据之后，按块大小直接跳过图像数据）
+    - JPEG：APP1 中的 EXIF 与 COM 注释；读到 SOS 即停止
+    EXIF 只取 UserComment 与 ImageDescription。
+    """
+    with open(path, "rb") as f:
+        head = f.read(12)
+        if head[:8] == _PNG_SIGNATURE:
+            f.seek(8)
+            return _read_png(f)
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return _read_webp(f)
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            return _read_jpeg(f)
+    return {}
+
+
+def _read_png(f: BinaryIO) -> Dict[str, str]:
+    texts: Dict[str, str] = {}
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type in (b"IDAT", b"IEND"):
+            # 文本块按惯例写在像素数据之前，不再继续读取
+            break
+        if chunk_type in (b"tEXt", b"zTXt", b"iTXt") and length <= IMAGE_TEXT_LIMIT:
+            # 先读关键字，不需要的块（例如 workflow）直接跳过
+            prefix = f.read(min(length, _PNG_KEYWORD_MAX))
+            keyword, sep, _ = prefix.partition(b"\0")
+            key = keyword.decode("latin-1")
+            if sep and key in _PNG_KEYS and key not in texts:
+                data = prefix + f.read(length - len(prefix))
+                if len(data) < length:
+                    # 文件在块中间截断
+                    break
+                texts[key] = _png_text(chunk_type, data[len(keyword) + 1:])
+            else:
+                f.seek(length - len(prefix), os.SEEK_CUR)
+        elif chunk_type == b"eXIf" and length <= IMAGE_TEXT_LIMIT:
+            texts.update((k, v) for k, v in _parse_exif(f.read(length)).items() if k not in texts)
+        else:
+            f.seek(length, os.SEEK_CUR)
+        # CRC
+        f.seek(4, os.SEEK_CUR)
+    return texts
+
+
+def _png_text(chunk_type: bytes, body: bytes) -> str:
+    if chunk_type == b"tEXt":
+        return _decode_latin(body)
+    if chunk_type == b"zTXt":
+        # 压缩方式 1 字节（只有 0 = zlib）
+        return _decode_latin(_inflate(body[1:]))
+    # iTXt：压缩标志、压缩方式、语言标签 \0、翻译关键字 \0、UTF-8 文本
+    if len(body) < 2:
+        # 关键字之后即结束的截断块
+        return ""
+    compressed = body[0]
+    _, _, rest = body[2:].partition(b"\0")
+    _, _, text = rest.partition(b"\0")
+    if compressed:
+        text = _inflate(text)
+    return text.decode("utf-8", errors="replace")
+
+
+def _decode_latin(data: bytes) -> str:
+    # 规范要求 tEXt / zTXt 使用 Latin-1，但不少工具直接写入 UTF-8
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def _inflate(data: bytes) -> bytes:
+    # 限制解压后的大小，防止压缩炸弹
+    inflater = zlib.decompressobj()
+    result = inflater.decompress(data, IMAGE_TEXT_LIMIT)
+    if inflater.unconsumed_tail:
+        raise ValueError("PNG 文本块解压后过大")
+    return result
+
+
+def _read_webp(f: BinaryIO) -> Dict[str, str]:
+    texts: Dict[str, str] = {}
+    first = True
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        fourcc, size = struct.unpack("<4sI", header)
+        if first and fourcc != b"VP8X":
+            # 简单格式（VP8 / VP8L）不含元数据块
+            break
+        first = False
+        if fourcc == b"EXIF" and size <= IMAGE_TEXT_LIMIT:
+            texts.update(_parse_exif(f.read(size)))
+            break
+        # 块数据按偶数字节对齐
+        f.seek(size + (size & 1), os.SEEK_CUR)
+    return texts
+
+
+def _read_jpeg(f: BinaryIO) -> Dict[str, str]:
+    texts: Dict[str, str] = {}
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            break
+        code = marker[1]
+        if code == 0xFF:
+            # 填充字节
+            f.seek(-1, os.SEEK_CUR)
+            continue
+        if code in (0xD9, 0xDA):
+            # EOI / SOS（之后是压缩数据）
+            break
+        if 0xD0 <= code <= 0xD7 or code == 0x01:
+            # 无长度字段的标记
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            break
+        length = struct.unpack(">H", length_bytes)[0] - 2
+        if length < 0:
+            # 长度字段小于 2 的损坏段，继续读取会回退到同一位置
+            break
+        if code == 0xE1 and length >= 6:
+            data = f.read(length)
+            if data.startswith(b"Exif\0\0"):
+                texts.update((k, v) for k, v in _parse_exif(data[6:]).items() if k not in texts)
+        elif code == 0xFE and "Comment" not in texts:
+            texts["Comment"] = f.read(length).decode("utf-8", errors="replace")
+        else:
+            f.seek(length, os.SEEK_CUR)
+    return texts
+
+
+def _parse_exif(data: bytes) -> Dict[str, str]:
+    """从 TIFF 结构的 EXIF 数据中取出 ImageDescription 与 UserComment。"""
+    if data.startswith(b"Exif\0\0"):
+        data = data[6:]
+    if data[:2] == b"II":
+        endian = "<"
+    elif data[:2] == b"MM":
+        endian = ">"
+    else:
+        return {}
+    texts: Dict[str, str] = {}
+    ifd0 = _read_ifd(data, endian, struct.unpack(endian + "I", data[4:8])[0])
+    if _EXIF_IMAGE_DESCRIPTION in ifd0:
+        value = _ifd_value(data, endian, ifd0[_EXIF_IMAGE_DESCRIPTION])
+        text = value.rstrip(b"\0").decode("utf-8", errors="replace").strip()
+        if text:
+            texts["ImageDescription"] = text
+    if _EXIF_IFD_POINTER in ifd0:
+        offset = struct.unpack(endian + "I", ifd0[_EXIF_IFD_POINTER][2])[0]
+        exif_ifd = _read_ifd(data, endian, offset)
+        if _EXIF_USER_COMMENT in exif_ifd:
+            text = _user_comment(_ifd_value(data, endian, exif_ifd[_EXIF_USER_COMMENT]), endian)
+            if text:
+                texts["UserComment"] = text
+    return texts
+
+
+_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 7: 1, 9: 4, 10: 8}
+
+
+def _read_ifd(data: bytes, endian: str, offset: int) -> Dict[int, Tuple[int, int, bytes]]:
+    """IFD 中的条目：标签 -> (类型, 数量, 值或偏移的 4 字节)。"""
+    entries: Dict[int, Tuple[int, int, bytes]] = {}
+    if offset <= 0 or offset + 2 > len(data):
+        return entries
+    count = struct.unpack(endian + "H", data[offset:offset + 2])[0]
+    for i in range(count):
+        start = offset + 2 + i * 12
+        if start + 12 > len(data):
+            break
+        tag, value_type, value_count = struct.unpack(endian + "HHI", data[start:start + 8])
+        entries[tag] = (value_type, value_count, data[start + 8:start + 12])
+    return entries
+
+
+def _ifd_value(data: bytes, endian: str, entry: Tuple[int, int, bytes]) -> bytes:
+    value_type, value_count, raw = entry
+    size = _TYPE_SIZES.get(value_type, 1) * value_count
+    if size <= 4:
+        return raw[:size]
+    offset = struct.unpack(endian + "I", raw)[0]
+    return data[offset:offset + size]
+
+
+def _user_comment(value: bytes, endian: str) -> str:
+    # 前 8 字节为字符编码标识
+    prefix, body = value[:8], value[8:]
+    if prefix == b"UNICODE\0":
+        # 多数生成器（piexif）固定写入 UTF-16BE，少数按 TIFF 字节序；按首个 ASCII 字符所在位置判断
+        if len(body) >= 2 and body[0] == 0 and body[1] != 0:
+            encoding = "utf-16-be"
+        elif len(body) >= 2 and body[1] == 0 and body[0] != 0:
+            encoding = "utf-16-le"
+        else:
+            encoding = "utf-16-le" if endian == "<" else "utf-16-be"
+        text = body.decode(encoding, errors="replace")
+    else:
+        text = body.decode("utf-8", errors="replace")
+    return text.rstrip("\0").strip()
+
+
+# ---------------------- 参数文本解析 ----------------------
+def parse_texts(texts: Dict[str, str]) -> Optional[ImageParams]:
+    """按常见生成器的写入格式解析元数据文本，无法识别任何参数时返回 None。"""
+    if texts.get("parameters"):
+        return parse_a1111(texts["parameters"])
+    if texts.get("prompt"):
+        params = _parse_comfyui(texts["prompt"])
+        if params is not None:
+            return params
+    if texts.get("Description") and texts.get("Comment", "").lstrip().startswith("{"):
+        return _parse_novelai(texts["Description"], texts["Comment"])
+    for key in ("UserComment", "Comment", "ImageDescription"):
+        text = texts.get(key)
+        if not text:
+            continue
+        if "Steps: " in text:
+            # A1111 保存 JPEG / WebP 时把同样的参数文本写入 UserComment
+            return parse_a1111(text)
+        if text.lstrip().startswith("{"):
+            params = _parse_comfyui(text)
+            if params is not None:
+                return params
+        return ImageParams("text", prompt=text)
+    return None
+
+
+def parse_a1111(text: str) -> ImageParams:
+    """
+    解析 A1111 / Forge 格式的参数文本：
+        正向提示词（可多行）
+        Negative prompt: 反向提示词（可多行）
+        Steps: 20, Sampler: Euler a, ..., Model: xxx, ...
+    """
+    lines = text.strip().split("\n")
+    settings = ""
+    if lines and "Steps: " in lines[-1]:
+        settings = lines.pop().strip()
+    prompt_lines: List[str] = []
+    negative_lines: List[str] = []
+    target = prompt_lines
+    for line in lines:
+        if line.startswith(_NEGATIVE_PREFIX):
+            target = negative_lines
+            line = line[len(_NEGATIVE_PREFIX):]
+        target.append(line)
+    model = ""
+    for key, value in _A1111_SETTING.findall(settings):
+        if key.strip() == "Model":
+            model = value.strip().strip('"')
+            break
+    return ImageParams(
+        "a1111",
+        prompt="\n".join(prompt_lines).strip(),
+        negative_prompt="\n".join(negative_lines).strip(),
+        model=model,
+        settings=settings,
+    )
+
+
+def _parse_comfyui(text: str) -> Optional[ImageParams]:
+    """
+    解析 ComfyUI 写入的 prompt（API 格式节点图：节点 id -> {class_type, inputs}）。
+    沿采样节点的 positive / negative 输入找到文本编码节点；找不到时合并全部文本编码节点的文本。
+    """
+    try:
+        graph = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(graph, dict) or not graph:
+        return None
+    nodes = {k: v for k, v in graph.items() if isinstance(v, dict) and isinstance(v.get("inputs"), dict)}
+    if not nodes:
+        return None
+    positive: List[str] = []
+    negative: List[str] = []
+    model = ""
+    for node in nodes.values():
+        inputs = node["inputs"]
+        for name, target in (("positive", positive), ("negative", negative)):
+            text_value = _linked_text(nodes, inputs.get(name))
+            if text_value and text_value not in target:
+                target.append(text_value)
+        if not model:
+            for name in ("ckpt_name", "unet_name", "model_name"):
+                if isinstance(inputs.get(name), str):
+                    model = inputs[name]
+                    break
+    if not positive and not negative:
+        positive = [
+            n["inputs"]["text"] for n in nodes.values()
+            if isinstance(n["inputs"].get("text"), str) and "TextEncode" in str(n.get("class_type", ""))
+        ]
+    if not positive and not negative and not model:
+        return None
+    return ImageParams("comfyui", "\n".join(positive), "\n".join(negative), model)
+
+
+def _linked_text(nodes: Dict[str, Any], link: Any, depth: int = 0) -> str:
+    # 连接形如 [节点 id, 输出序号]；中间可能隔着 ConditioningCombine 等节点，最多向上追溯几层
+    if not isinstance(link, list) or not link or depth > 4:
+        return ""
+    node = nodes.get(str(link[0]))
+    if node is None:
+        return ""
+    inputs = node["inputs"]
+    for name in ("text", "text_g", "prompt"):
+        if isinstance(inputs.get(name), str):
+            return inputs[name]
+        # 文本本身也可能来自其他节点（例如字符串拼接）
+        if isinstance(inputs.get(name), list):
+            linked = _linked_value(nodes, inputs[name])
+            if linked:
+                return linked
+    for name in ("conditioning", "conditioning_1", "conditioning_to"):
+        text = _linked_text(nodes, inputs.get(name), depth + 1)
+        if text:
+            return text
+    return ""
+
+
+def _linked_value(nodes: Dict[str, Any], link: Any) -> str:
+    node = nodes.get(str(link[0])) if isinstance(link, list) and link else None
+    if node is None:
+        return ""
+    for value in node["inputs"].values():
+        if isinstance(value, str) and value.strip():
+            return value
+    return ""
+
+
+def _parse_novelai(description: str, comment: str) -> ImageParams:
+    try:
+        info = json.loads(comment)
+    except ValueError:
+        info = {}
+    if not isinstance(info, dict):
+        info = {}
+    return ImageParams(
+        "novelai",
+        prompt=str(info.get("prompt") or description),
+        negative_prompt=str(info.get("uc") or ""),
+        settings=", ".join(f"{k}: {info[k]}" for k in ("steps", "sampler", "scale", "seed") if k in info),
+    )
@@ -0,0 +1,84 @@
+import fnmatch
+import logging
+import os
+from typing import Iterable, Iterator, List, Optional, Sequence, Set
+
+IMAGE_EXTENSIONS: Set[str] = {".png", ".jpg", ".jpeg", ".bmp", ".gif"}
+
+
+def _normalize_patterns(patterns: Optional[Iterable[str]]) -> List[str]:
+    if not patterns:
+        return []
+    return [p.strip().replace("\\", "/").lower() for p in patterns if p and p.strip()]
+
+
+def _matches(rel_path: str, name: str, patterns: Sequence[str]) -> bool:
+    # 模式既可匹配相对路径（如 "序列帧/*"），也可只匹配文件名（如 "*_mask.png"）
+    return any(fnmatch.fnmatchcase(rel_path, p) or fnmatch.fnmatchcase(name, p) for p in patterns)
+
+
+def _iter_entries(folder: str, sort: bool) -> Iterator[os.DirEntry]:
+    # 不排序时边读边产出，不必等整个目录列完；排序则需要先把目录读完
+    try:
+        with os.scandir(folder) as it:
+            if not sort:
+                yield from it
+                return
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        logging.warning(f"无法读取目录: {folder}", exc_info=True)
+        return
+    yield from entries
+
+
+def iter_image_files(
+    root: str,
+    recursive: bool = False,
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    extensions: Optional[Iterable[str]] = None,
+    skip_dirs: Optional[Iterable[str]] = None,
+    sort: bool = True,
+) -> Iterator[str]:
+    """
+    基于 os.scandir 的流式图片扫描器，逐个产出图片的绝对路径。
+    - 先产出目录内的文件再深入子目录，调用方可以在扫描过程中开始处理
+    - sort=True 时每个目录内按名称排序，输出顺序确定，但要先列完整个目录才会产出；
+      sort=False 时按 scandir 返回的顺序边读边产出，顺序由调用方自行处理
+    - 子目录始终按名称顺序遍历
+    - include / exclude 为 glob 模式，大小写不敏感，exclude 同样会剪除匹配的子目录
+    - skip_dirs 中的目录不会被遍历（例如位于输入目录内部的输出目录）
+    """
+    exts = {e.lower() for e in extensions} if extensions else IMAGE_EXTENSIONS
+    include_patterns = _normalize_patterns(include)
+    exclude_patterns = _normalize_patterns(exclude)
+    skipped = {os.path.normcase(os.path.abspath(d)) for d in (skip_dirs or []) if d}
+    root = os.path.abspath(root)
+
+    stack: List[str] = [root]
+    while stack:
+        folder = stack.pop()
+        sub_dirs: List[str] = []
+        for entry in _iter_entries(folder, sort):
+            rel_path = os.path.relpath(entry.path, root).replace(os.sep, "/").lower()
+            name = entry.name.lower()
+            try:
+                # DirEntry 缓存了 scandir 返回的类型信息，无需额外 stat
+                if entry.is_dir():
+                    if recursive and not _matches(rel_path, name, exclude_patterns) \
+                            and os.path.normcase(entry.path) not in skipped:
+                        sub_dirs.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if os.path.splitext(name)[1] not in exts:
+                continue
+            if include_patterns and not _matches(rel_path, name, include_patterns):
+                continue
+            if exclude_patterns and _matches(rel_path, name, exclude_patterns):
+                continue
+            yield entry.path
+        # 逆序入栈，保证子目录按名称顺序遍历
+        stack.extend(sorted(sub_dirs, reverse=True))
@@ -0,0 +1,270 @@
+import json
+import logging
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# 超过该大小的 JSON 附属文件不再整体解析，只流式提取常用键
+SIDECAR_FULL_PARSE_LIMIT = 2 * 1024 * 1024
+# 流式提取时需要的顶层键
+SIDECAR_KEYS = ("model", "model_name", "ckpt", "prompt")
+# 这些键都找到后即停止扫描：model 优先于 model_name / ckpt，其后的常用键不再影响展示
+SIDECAR_STOP_KEYS = ("model", "prompt")
+# 单个提取值的最大字节数（例如 ComfyUI API 格式里整张节点图形式的 prompt），超过时跳过
+SIDECAR_VALUE_LIMIT = 256 * 1024
+# 解析结果缓存：条目数与按文件大小累计的上限
+SIDECAR_CACHE_ENTRIES = 512
+SIDECAR_CACHE_BYTES = 64 * 1024 * 1024
+
+# 跳过不需要的容器时每次处理的字节数；包含闭括号的最后一块需要逐个匹配，不宜过大
+SIDECAR_SKIP_CHUNK = 64 * 1024
+
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+_NESTED_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|([{\[])|([}\]])')
+_SCALAR = re.compile(rb'[^,}\]\s]+')
+_WHITESPACE = re.compile(rb"\s*")
+_DECODER = json.JSONDecoder()
+
+# 只保留括号，方括号统一为花括号：跳过时只关心嵌套深度
+_BRACKET_TABLE = bytes.maketrans(b"[]", b"{}")
+_NON_BRACKETS = bytes(c for c in range(256) if c not in b"{}[]")
+
+_OPEN = frozenset(b"{[")
+_QUOTE = ord('"')
+_COLON = ord(":")
+_COMMA = ord(",")
+_CLOSE_BRACE = ord("}")
+
+
+class SidecarParams:
+    """
+    JSON 附属文件的解析结果：
+    - 小文件：params 为完整内容
+    - 大文件：params 只含 SIDECAR_KEYS 中存在的键，truncated 为 True，完整内容需调用 load_sidecar(path, full=True)
+    """
+
+    def __init__(self, path: str, params: Dict[str, Any], truncated: bool = False, size: int = 0):
+        self.path: str = path
+        self.params: Dict[str, Any] = params
+        self.truncated: bool = truncated
+        self.size: int = size
+
+
+class _SidecarCache:
+    """按 (路径, mtime, 大小) 记忆解析结果，文件被修改后自然失效。"""
+
+    def __init__(self, max_entries: int = SIDECAR_CACHE_ENTRIES, max_bytes: int = SIDECAR_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int, bool], Optional[SidecarParams]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str, signature: Tuple[int, int, bool]) -> Tuple[bool, Optional[SidecarParams]]:
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is None or cached[0] != signature:
+                return False, None
+            self._entries.move_to_end(path)
+            return True, cached[1]
+
+    def put(self, path: str, signature: Tuple[int, int, bool], result: Optional[SidecarParams]) -> None:
+        # 截断结果只占少量内存，完整结果按文件大小计入上限
+        cost = self._cost((signature, result))
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= self._cost(old)
+            self._entries[path] = (signature, result)
+            self._bytes += cost
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._cost(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @staticmethod
+    def _cost(entry: Tuple[Tuple[int, int, bool], Optional[SidecarParams]]) -> int:
+        signature, result = entry
+        return signature[1] if result is not None and not result.truncated else 0
+
+
+_cache = _SidecarCache()
+
+
+def load_sidecar(path: str, full: bool = False) -> Optional[SidecarParams]:
+    """
+    读取 JSON 附属文件，顶层不是对象或无法解析时返回 None。
+    不超过 SIDECAR_FULL_PARSE_LIMIT 或 full=True 时整体解析，否则只流式提取常用键。
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    full = full or st.st_size <= SIDECAR_FULL_PARSE_LIMIT
+    signature = (st.st_mtime_ns, st.st_size, full)
+    hit, result = _cache.get(path, signature)
+    if hit:
+        return result
+    try:
+        if full:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            result = SidecarParams(path, data, False, st.st_size) if isinstance(data, dict) else None
+        else:
+            data = extract_top_level_keys(path, SIDECAR_KEYS, stop_keys=SIDECAR_STOP_KEYS)
+            result = SidecarParams(path, data, True, st.st_size) if data is not None else None
+    except (OSError, ValueError):
+        result = None
+    _cache.put(path, signature, result)
+    return result
+
+
+def read_first_sidecar(paths: Iterable[str]) -> Optional[SidecarParams]:
+    """按顺序返回第一个可解析的 JSON 附属文件。"""
+    for path in paths:
+        result = load_sidecar(path)
+        if result is not None:
+            return result
+    return None
+
+
+def clear_sidecar_cache() -> None:
+    _cache.clear()
+
+
+def extract_top_level_keys(
+    path: str,
+    keys: Iterable[str],
+    value_limit: int = SIDECAR_VALUE_LIMIT,
+    stop_keys: Optional[Iterable[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    通过内存映射扫描 JSON 文件，只用 JSONDecoder.raw_decode 解码顶层对象中指定键的值，
+    其余值按块统计括号与字符串边界后跳过，不会构建整棵对象树。stop_keys（默认为 keys）都找到后立即返回，不再扫描剩余内容。
+    顶层不是对象时返回 None，格式错误时抛出 ValueError。
+    """
+    wanted = set(keys)
+    stop = set(stop_keys) if stop_keys is not None else wanted
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("空文件")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return _scan_object(buf, wanted, stop, value_limit)
+
+
+def _scan_object(buf, wanted: set, stop: set, value_limit: int) -> Optional[Dict[str, Any]]:
+    pos = _WHITESPACE.match(buf, 3 if buf[:3] == b"\xef\xbb\xbf" else 0).end()
+    if pos >= len(buf) or buf[pos] != ord("{"):
+        return None
+    found: Dict[str, Any] = {}
+    pos = _WHITESPACE.match(buf, pos + 1).end()
+    if pos < len(buf) and buf[pos] == _CLOSE_BRACE:
+        return found
+    while True:
+        m = _STRING.match(buf, pos)
+        if m is None:
+            raise ValueError(f"JSON 顶层结构异常（偏移 {pos}）")
+        key = json.loads(m.group())
+        pos = _WHITESPACE.match(buf, m.end()).end()
+        if pos >= len(buf) or buf[pos] != _COLON:
+            raise ValueError(f"JSON 顶层结构异常（偏移 {pos}）")
+        pos = _WHITESPACE.match(buf, pos + 1).end()
+        end = _decode_value(found, key, buf, pos, value_limit) if key in wanted else -1
+        if end < 0:
+            end = _skip_value(buf, pos)
+        pos = _WHITESPACE.match(buf, end).end()
+        if pos >= len(buf):
+            raise ValueError("JSON 对象未闭合")
+        c = buf[pos]
+        if c == _CLOSE_BRACE:
+            return found
+        if c != _COMMA:
+            raise ValueError(f"JSON 顶层结构异常（偏移 {pos}）")
+        if stop.issubset(found):
+            # 需要的键都已找到，不再扫描剩余内容
+            return found
+        pos = _WHITESPACE.match(buf, pos + 1).end()
+
+
+def _decode_value(found: Dict[str, Any], key: str, buf, pos: int, value_limit: int) -> int:
+    """
+    用 JSONDecoder.raw_decode 直接解码从 pos 开始的值，只读取 value_limit 字节以内的内容。
+    返回值之后的位置；值超过 value_limit 时返回 -1，由调用方跳过。
+    """
+    head = buf[pos:pos + value_limit + 1]
+    # 末尾可能截断多字节字符，忽略即可：能完整解码的值不会包含它
+    text = head.decode("utf-8", "ignore")
+    try:
+        value, end = _DECODER.raw_decode(text)
+    except ValueError:
+        if len(head) <= value_limit:
+            raise
+        end = -1
+    consumed = len(text[:end].encode("utf-8")) if end >= 0 else len(head)
+    if consumed > value_limit:
+        logging.debug("JSON 附属文件中的 %s 过大（超过 %d 字节），跳过", key, value_limit)
+        return -1
+    found[key] = value
+    return pos + consumed
+
+
+def _skip_value(buf, pos: int) -> int:
+    """跳过从 pos 开始的任意值，返回其后的位置。"""
+    if pos >= len(buf):
+        raise ValueError("JSON 对象未闭合")
+    c = buf[pos]
+    if c in _OPEN:
+        return _skip_container(buf, pos + 1)
+    m = _STRING.match(buf, pos) if c == _QUOTE else _SCALAR.match(buf, pos)
+    if m is None:
+        raise ValueError(f"JSON 值格式错误（偏移 {pos}）")
+    return m.end()
+
+
+def _skip_container(buf, pos: int) -> int:
+    """
+    跳过从 pos 开始（开括号之后）的数组或对象，返回其闭括号之后的位置。
+    按块处理，全部使用 C 层的 bytes 操作：先把转义的反斜杠与引号替换为等长的占位符，
+    再按引号切分，偶数段即字符串之外的内容；其中的括号反复消去相邻的成对括号后只剩 "}}…{{" 的形式，
+    开头的闭括号数即块内深度的最低点。深度不会在块内归零时整块跳过，只有容器结束的那一块逐个匹配括号。
+    """
+    depth = 1
+    size = len(buf)
+    while pos < size:
+        chunk = buf[pos:pos + SIDECAR_SKIP_CHUNK]
+        # 块从字符串之外开始，转义序列从左到右成对出现，替换后长度不变
+        parts = chunk.replace(b"\\\\", b"__").replace(b'\\"', b"__").split(b'"')
+        # 引号为奇数个时最后一段属于块末尾未闭合的字符串，留到下一块
+        safe = len(chunk) - len(parts[-1]) - 1 if len(parts) % 2 == 0 else len(chunk)
+        if safe == 0:
+            # 块从一个比块还长的字符串开始
+            m = _STRING.match(buf, pos)
+            if m is None:
+                break
+            pos = m.end()
+            continue
+        brackets = b"".join(parts[0::2]).translate(_BRACKET_TABLE, _NON_BRACKETS)
+        while b"{}" in brackets:
+            brackets = brackets.replace(b"{}", b"")
+        closes = brackets.count(b"}")
+        if closes < depth:
+            depth += len(brackets) - 2 * closes
+            pos += safe
+            continue
+        for m in _NESTED_TOKEN.finditer(buf, pos, pos + safe):
+            group = m.lastindex
+            if group == 1:
+                depth += 1
+            elif group == 2:
+                depth -= 1
+                if depth == 0:
+                    return m.end()
+        pos += safe
+    raise ValueError("JSON 数组或对象未闭合")
@@ -7,6 +7,7 @@
 
 
 import logging
+import multiprocessing
 import sys
 from PySide6.QtWidgets import QApplication
 from qt_material import list_themes, apply_stylesheet
@@ -29,4 +30,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包后的可执行文件中，进程池子进程需要由此入口接管
+    multiprocessing.freeze_support()
     main()
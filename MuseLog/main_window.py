@@ -1,5 +1,7 @@
 from PySide6.QtWidgets import QMainWindow, QApplication
 
+from MuseLog.explorer_signals import signal_manager
+from MuseLog.file_operation_job import FileOperationQueue
 from MuseLog.tab_explorer_widget import TabExplorerWidget
 from MuseLog.tab_home_widget import TabHomeWidget
 from MuseLog.tab_settings_widget import TabSettingsWidget
@@ -19,6 +21,9 @@ class MuseLogMainWindow(QMainWindow, Ui_MainWindow):
         self.btnSettings.clicked.connect(self.open_settings_tab)
         # 用于记录已打开的tab页
         self.opened_tabs = {}
+        # 全局唯一的文件操作队列，资源浏览页只负责显示进度，关闭标签页不影响正在执行的操作
+        self.file_operations = FileOperationQueue(self)
+        signal_manager.enqueue_file_operation.connect(self.file_operations.enqueue)
         # 默认打开首页和资源浏览tab
         self.open_home_tab()
         self.open_explorer_tab()
@@ -53,18 +58,34 @@ class MuseLogMainWindow(QMainWindow, Ui_MainWindow):
         if tab_key in self.opened_tabs:
             self.tabWidget.setCurrentIndex(self.opened_tabs[tab_key])
             return
-        explorer_widget = TabExplorerWidget()
+        explorer_widget = TabExplorerWidget(file_operations=self.file_operations)
         index = self.tabWidget.addTab(explorer_widget, "资源浏览")
         self.opened_tabs[tab_key] = index
         self.tabWidget.setCurrentIndex(index)
 
     def on_tab_close(self, index):
+        # 停止该标签页的后台任务
+        self._stop_tab_jobs(self.tabWidget.widget(index))
         # 移除 opened_tabs 中的记录
         for key, idx in list(self.opened_tabs.items()):
             if idx == index:
                 del self.opened_tabs[key]
                 break
+        widget = self.tabWidget.widget(index)
         self.tabWidget.removeTab(index)
+        # removeTab 不会删除页面，关闭的页面不再复用
+        widget.deleteLater()
+
+    def closeEvent(self, event):
+        for i in range(self.tabWidget.count()):
+            self._stop_tab_jobs(self.tabWidget.widget(i))
+        self.file_operations.stop()
+        super().closeEvent(event)
+
+    def _stop_tab_jobs(self, widget):
+        stop = getattr(widget, "stop_background_jobs", None)
+        if callable(stop):
+            stop()
 
     def apply_theme(self, theme_name):
         from qt_material import apply_stylesheet
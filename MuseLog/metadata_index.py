@@ -0,0 +1,480 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from MuseLog.explorer_metadata import (
+    FolderMetadata,
+    ImageParams,
+    extract_metadata,
+    mtime_ns,
+    prompt_texts,
+    scan_folder,
+    sources_unchanged,
+)
+
+INDEX_FILE_NAME = "metadata_index.sqlite3"
+INDEX_SCHEMA_VERSION = 4
+# 提示词搜索默认返回的最大结果数
+SEARCH_RESULT_LIMIT = 200
+# trigram 分词器无法匹配短于 3 个字符的词，这些词改用 LIKE 过滤
+TRIGRAM_MIN_CHARS = 3
+# 短词展开成包含它的 trigram 时最多使用的数量；超过时说明该词很常见，LIKE 扫描很快就能凑满结果
+SHORT_TERM_GRAM_LIMIT = 64
+# 搜索结果中摘要的前后字符数
+SNIPPET_CONTEXT = 30
+# 爬取时每处理多少个目录提交一次事务
+CRAWL_COMMIT_INTERVAL = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    path TEXT PRIMARY KEY,
+    display_path TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    crawled_at REAL
+);
+CREATE TABLE IF NOT EXISTS folders (
+    path TEXT PRIMARY KEY,
+    display_path TEXT NOT NULL,
+    root TEXT NOT NULL,
+    dir_mtime_ns INTEGER NOT NULL,
+    sources TEXT NOT NULL,
+    subdirs TEXT NOT NULL,
+    model TEXT,
+    prompt TEXT,
+    prompt_files TEXT NOT NULL,
+    params TEXT,
+    params_path TEXT,
+    params_truncated INTEGER NOT NULL DEFAULT 0,
+    image_params TEXT,
+    videos TEXT NOT NULL,
+    refs TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_folders_root ON folders(root);
+CREATE TABLE IF NOT EXISTS prompts (
+    id INTEGER PRIMARY KEY,
+    folder TEXT NOT NULL,
+    source TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_prompts_folder ON prompts(folder);
+-- 短于 3 个字符的提示词没有 trigram，不在全文索引中，搜索时经此部分索引单独用 LIKE 匹配
+CREATE INDEX IF NOT EXISTS idx_prompts_short ON prompts(id) WHERE length(text) < 3;
+-- trigram 分词按 3 字符切分，中日韩文本无需分词词典也能做子串匹配
+CREATE VIRTUAL TABLE IF NOT EXISTS prompt_fts USING fts5(
+    text, content='prompts', content_rowid='id', tokenize='trigram'
+);
+-- 出现过的全部 trigram（小写），用于把 1~2 个字符的短词展开为索引查询；只增不删，多余的 trigram 不影响结果
+CREATE TABLE IF NOT EXISTS prompt_grams (gram TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS prompts_ai AFTER INSERT ON prompts BEGIN
+    INSERT INTO prompt_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS prompts_ad AFTER DELETE ON prompts BEGIN
+    INSERT INTO prompt_fts (prompt_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def default_index_path() -> str:
+    # 与 tab_explorer.json 同在 ~/.muselog 下
+    return os.path.join(os.path.expanduser("~"), ".muselog", INDEX_FILE_NAME)
+
+
+def index_key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+class FolderSignature:
+    """判断目录是否需要重新提取的依据。"""
+
+    def __init__(self, dir_mtime: int, sources: Dict[str, int], subdirs: List[str]):
+        self.dir_mtime: int = dir_mtime
+        self.sources: Dict[str, int] = sources
+        self.subdirs: List[str] = subdirs
+
+
+class CrawlStats:
+    def __init__(self, root: str):
+        self.root: str = root
+        self.visited: int = 0
+        self.updated: int = 0
+        self.unchanged: int = 0
+        self.removed: int = 0
+        # 读取或提取元数据时出错的目录数，这些目录保留索引中原有的记录
+        self.failed: int = 0
+        self.cancelled: bool = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+class PromptHit:
+    """一条提示词搜索结果。"""
+
+    def __init__(self, folder: str, source: str, snippet: str):
+        self.folder: str = folder
+        self.source: str = source
+        self.snippet: str = snippet
+
+
+class MetadataIndex:
+    """
+    整个素材库的持久化元数据索引（SQLite，位于 ~/.muselog）。
+    保存 collect_metadata 提取的提示词、模型名、JSON 参数、视频与参考图列表，
+    以及目录与附属文件的 mtime，供后台爬取增量更新。
+    连接可在多个线程间共享（内部加锁）；写入量大的爬取任务应使用独立实例。
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path: str = db_path or default_index_path()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        # WAL 模式下界面读取不会被后台爬取的写事务阻塞
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, INDEX_SCHEMA_VERSION):
+                # 索引可随时重建，结构变化时直接丢弃旧表
+                logging.info("元数据索引结构已变化，重建索引: %s", self.db_path)
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS prompt_fts; DROP TABLE IF EXISTS prompt_grams; DROP TABLE IF EXISTS prompts;"
+                    " DROP TABLE IF EXISTS folders; DROP TABLE IF EXISTS roots;"
+                )
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {INDEX_SCHEMA_VERSION}")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+
+    # ---------------------- 根目录 ----------------------
+    def add_root(self, path: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO roots (path, display_path, added_at) VALUES (?, ?, ?)",
+                (index_key(path), os.path.normpath(os.path.abspath(path)), time.time()),
+            )
+            self._conn.commit()
+
+    def remove_root(self, path: str) -> None:
+        key = index_key(path)
+        with self._lock:
+            self._conn.execute("DELETE FROM prompts WHERE folder IN (SELECT path FROM folders WHERE root = ?)", (key,))
+            self._conn.execute("DELETE FROM folders WHERE root = ?", (key,))
+            self._conn.execute("DELETE FROM roots WHERE path = ?", (key,))
+            self._conn.commit()
+
+    def roots(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT display_path FROM roots ORDER BY added_at").fetchall()
+        return [row[0] for row in rows]
+
+    def root_for(self, folder: str) -> Optional[str]:
+        """目录所属的已登记根目录（取最深的一个），不在任何根目录下时返回 None。"""
+        key = index_key(folder)
+        with self._lock:
+            rows = self._conn.execute("SELECT path, display_path FROM roots").fetchall()
+        matches = [
+            (len(path), display_path) for path, display_path in rows
+            if key == path or key.startswith(path.rstrip(os.sep) + os.sep)
+        ]
+        return max(matches)[1] if matches else None
+
+    def mark_crawled(self, root: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE roots SET crawled_at = ? WHERE path = ?", (time.time(), index_key(root)))
+            self._conn.commit()
+
+    # ---------------------- 目录记录 ----------------------
+    def get(self, folder: str) -> Optional[FolderMetadata]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT display_path, prompt_files, params, params_path, params_truncated, image_params, videos, refs"
+                " FROM folders WHERE path = ?",
+                (index_key(folder),),
+            ).fetchone()
+        if row is None:
+            return None
+        display_path, prompt_files, params, params_path, params_truncated, image_params, videos, refs = row
+        return FolderMetadata(
+            display_path,
+            prompt_files=json.loads(prompt_files),
+            params=json.loads(params) if params else None,
+            videos=json.loads(videos),
+            refs=json.loads(refs),
+            params_path=params_path,
+            params_truncated=bool(params_truncated),
+            image_params={p: ImageParams.from_dict(v) for p, v in json.loads(image_params).items()} if image_params else None,
+        )
+
+    def get_signature(self, folder: str) -> Optional[FolderSignature]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT dir_mtime_ns, sources, subdirs FROM folders WHERE path = ?", (index_key(folder),)
+            ).fetchone()
+        if row is None:
+            return None
+        return FolderSignature(row[0], json.loads(row[1]), json.loads(row[2]))
+
+    def upsert(
+        self,
+        root: str,
+        data: FolderMetadata,
+        dir_mtime: int,
+        sources: Dict[str, int],
+        subdirs: List[str],
+        prompts: Sequence[Tuple[str, str]] = (),
+    ) -> None:
+        """写入或更新一个目录的记录及其提示词全文，不自动提交。"""
+        key = index_key(data.folder)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO folders (path, display_path, root, dir_mtime_ns, sources, subdirs, model, prompt,"
+                " prompt_files, params, params_path, params_truncated, image_params, videos, refs, indexed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    os.path.normpath(data.folder),
+                    index_key(root),
+                    dir_mtime,
+                    json.dumps(sources),
+                    json.dumps(subdirs, ensure_ascii=False),
+                    _model_name(data),
+                    data.prompt,
+                    json.dumps(data.prompt_files, ensure_ascii=False),
+                    json.dumps(data.params, ensure_ascii=False) if data.params else None,
+                    data.params_path,
+                    int(data.params_truncated),
+                    json.dumps(
+                        {p: v.to_dict() for p, v in data.image_params.items()}, ensure_ascii=False
+                    ) if data.image_params else None,
+                    json.dumps(data.videos, ensure_ascii=False),
+                    json.dumps(data.refs, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            self._conn.execute("DELETE FROM prompts WHERE folder = ?", (key,))
+            self._conn.executemany(
+                "INSERT INTO prompts (folder, source, text) VALUES (?, ?, ?)",
+                ((key, source, text) for source, text in prompts),
+            )
+            grams = {text.lower()[i:i + 3] for _, text in prompts for i in range(len(text) - 2)}
+            self._conn.executemany("INSERT OR IGNORE INTO prompt_grams (gram) VALUES (?)", ((g,) for g in grams))
+
+    def folder_keys(self, root: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM folders WHERE root = ?", (index_key(root),)).fetchall()
+        return {row[0] for row in rows}
+
+    def delete_folders(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        with self._lock:
+            self._conn.executemany("DELETE FROM prompts WHERE folder = ?", ((k,) for k in keys))
+            self._conn.executemany("DELETE FROM folders WHERE path = ?", ((k,) for k in keys))
+        return len(keys)
+
+    def count(self, root: Optional[str] = None) -> int:
+        with self._lock:
+            if root is None:
+                return self._conn.execute("SELECT COUNT(*) FROM folders").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM folders WHERE root = ?", (index_key(root),)).fetchone()[0]
+
+    # ---------------------- 提示词搜索 ----------------------
+    def search_prompts(self, query: str, limit: int = SEARCH_RESULT_LIMIT) -> List[PromptHit]:
+        """
+        在全部提示词中搜索，空白分隔的多个词需同时出现（不区分大小写的子串匹配）。
+        不少于 3 个字符的词直接走 FTS5 trigram 索引；1~2 个字符的短词展开为包含它的 trigram 后走索引，
+        很常见的短词改用 LIKE 过滤（结果多，扫描很快就能凑满）。
+        全部词都是短词时，不在全文索引中的短提示词（例如 "夜景"）另外用 LIKE 匹配。
+        结果按最近索引的目录优先排列。
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        # 每个词作为短语加引号，避免 FTS5 查询语法（AND、*、- 等）被解释
+        match_groups = ['"' + t.replace('"', '""') + '"' for t in terms if len(t) >= TRIGRAM_MIN_CHARS]
+        like_terms: List[str] = []
+        # 不少于 3 个字符的提示词中是否可能有结果
+        indexed = True
+        for term in terms:
+            if len(term) >= TRIGRAM_MIN_CHARS:
+                continue
+            grams = self._grams_containing(term)
+            if grams is None:
+                like_terms.append(term)
+            elif not grams:
+                # 没有任何已索引的提示词包含该词
+                indexed = False
+            else:
+                match_groups.append("(" + " OR ".join('"' + g.replace('"', '""') + '"' for g in grams) + ")")
+        rows = self._search_indexed(match_groups, like_terms, limit) if indexed else []
+        # 只有 LIKE 条件时扫描的是全部提示词，已包含短提示词
+        if all(len(t) < TRIGRAM_MIN_CHARS for t in terms) and (match_groups or not indexed):
+            rows = sorted(rows + self._search_short(terms, limit), reverse=True)[:limit]
+        return [PromptHit(folder, source, _snippet(text, terms)) for _, folder, source, text in rows]
+
+    def _search_indexed(self, match_groups: List[str], like_terms: List[str], limit: int) -> List[Tuple]:
+        conditions: List[str] = []
+        args: List[Any] = []
+        if match_groups:
+            # 由 FTS5 按 rowid 倒序产出结果，凑满 limit 即可停止，不必取出全部命中行
+            source = "prompt_fts JOIN prompts p ON p.id = prompt_fts.rowid"
+            order = "prompt_fts.rowid"
+            conditions.append("prompt_fts MATCH ?")
+            args.append(" AND ".join(match_groups))
+        else:
+            source = "prompts p"
+            order = "p.id"
+        for term in like_terms:
+            conditions.append("p.text LIKE ? ESCAPE '\\'")
+            args.append("%" + _escape_like(term) + "%")
+        sql = (
+            f"SELECT p.id, f.display_path, p.source, p.text FROM {source} JOIN folders f ON f.path = p.folder"
+            f" WHERE {' AND '.join(conditions)} ORDER BY {order} DESC LIMIT ?"
+        )
+        args.append(limit)
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def _search_short(self, terms: List[str], limit: int) -> List[Tuple]:
+        """在短于 3 个字符的提示词中匹配（条件与 idx_prompts_short 的一致，只扫描这些行）。"""
+        conditions = ["length(p.text) < 3"] + ["p.text LIKE ? ESCAPE '\\'"] * len(terms)
+        sql = (
+            "SELECT p.id, f.display_path, p.source, p.text FROM prompts p JOIN folders f ON f.path = p.folder"
+            f" WHERE {' AND '.join(conditions)} ORDER BY p.id DESC LIMIT ?"
+        )
+        args: List[Any] = ["%" + _escape_like(term) + "%" for term in terms]
+        args.append(limit)
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def _grams_containing(self, term: str) -> Optional[List[str]]:
+        """包含短词的全部 trigram；数量超过 SHORT_TERM_GRAM_LIMIT 时返回 None。"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT gram FROM prompt_grams WHERE instr(gram, ?) > 0 LIMIT ?",
+                (term.lower(), SHORT_TERM_GRAM_LIMIT + 1),
+            ).fetchall()
+        if len(rows) > SHORT_TERM_GRAM_LIMIT:
+            return None
+        return [row[0] for row in rows]
+
+
+def _model_name(data: FolderMetadata) -> Optional[str]:
+    # JSON 参数中的模型优先，其次是图片内嵌参数中的模型
+    if data.model:
+        return str(data.model)
+    embedded = data.embedded
+    return embedded[1].model if embedded is not None and embedded[1].model else None
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _snippet(text: str, terms: List[str]) -> str:
+    # 以第一个命中的词为中心截取摘要，并压缩换行
+    lowered = text.lower()
+    positions = [lowered.find(t.lower()) for t in terms]
+    start = min((p for p in positions if p >= 0), default=0)
+    begin = max(0, start - SNIPPET_CONTEXT)
+    end = min(len(text), start + SNIPPET_CONTEXT * 2)
+    snippet = " ".join(text[begin:end].split())
+    return ("…" if begin > 0 else "") + snippet + ("…" if end < len(text) else "")
+
+
+def refresh_folder(index: MetadataIndex, folder: str) -> bool:
+    """
+    单独更新一个目录的索引记录（例如文件监视发现变化时），不遍历子目录。
+    目录不在已登记的根目录下或没有变化时不写入，返回是否更新。
+    """
+    root = index.root_for(folder)
+    dir_mtime = mtime_ns(folder)
+    if root is None or dir_mtime is None:
+        return False
+    signature = index.get_signature(folder)
+    if signature is not None and signature.dir_mtime == dir_mtime and sources_unchanged(signature.sources):
+        return False
+    listing = scan_folder(folder)
+    data = extract_metadata(listing, with_image_params=True)
+    index.upsert(root, data, dir_mtime, listing.source_mtimes, listing.subdirs, prompt_texts(data))
+    index.commit()
+    return True
+
+
+def crawl_root(
+    index: MetadataIndex,
+    root: str,
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress: Optional[Callable[[CrawlStats], None]] = None,
+) -> CrawlStats:
+    """
+    遍历根目录下的全部子目录并增量更新索引：
+    - 目录 mtime 与附属文件 mtime 都未变化时，沿用索引中记录的子目录列表，不再遍历该目录
+    - 有变化的目录重新提取元数据与提示词全文（提示词文件与 JSON 的 mtime 记录在附属文件中）
+    - 完整遍历结束后删除索引中已不存在的目录；中途取消时不删除
+    以 "." 开头的隐藏目录与符号链接目录不会被遍历。
+    """
+    root = os.path.normpath(os.path.abspath(root))
+    stats = CrawlStats(root)
+    index.add_root(root)
+    known = index.folder_keys(root)
+    seen: Set[str] = set()
+    stack: List[str] = [root]
+    while stack:
+        if should_stop is not None and should_stop():
+            stats.cancelled = True
+            break
+        folder = stack.pop()
+        dir_mtime = mtime_ns(folder)
+        if dir_mtime is None:
+            continue
+        seen.add(index_key(folder))
+        stats.visited += 1
+        signature = index.get_signature(folder)
+        if signature is not None and signature.dir_mtime == dir_mtime and sources_unchanged(signature.sources):
+            stats.unchanged += 1
+            subdirs = signature.subdirs
+        else:
+            # 读取失败时沿用索引中记录的子目录，子目录仍会被遍历，也不会被当作已删除
+            subdirs = signature.subdirs if signature is not None else []
+            try:
+                listing = scan_folder(folder)
+                subdirs = listing.subdirs
+                data = extract_metadata(listing, with_image_params=True)
+                index.upsert(root, data, dir_mtime, listing.source_mtimes, listing.subdirs, prompt_texts(data))
+                stats.updated += 1
+            except sqlite3.Error:
+                raise
+            except Exception:
+                # 单个无法读取的目录或损坏的文件不应中断整个素材库的爬取
+                logging.exception("索引目录失败，跳过: %s", folder)
+                stats.failed += 1
+        # 逆序入栈，保证按名称顺序遍历
+        stack.extend(os.path.join(folder, name) for name in sorted(subdirs, reverse=True) if not name.startswith("."))
+        if stats.visited % CRAWL_COMMIT_INTERVAL == 0:
+            index.commit()
+            if progress is not None:
+                progress(stats)
+    if not stats.cancelled:
+        stats.removed = index.delete_folders(known - seen)
+        index.mark_crawled(root)
+    index.commit()
+    if progress is not None:
+        progress(stats)
+    logging.info("元数据索引爬取%s: %s", "已取消" if stats.cancelled else "完成", stats.as_dict())
+    return stats
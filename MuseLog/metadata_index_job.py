@@ -0,0 +1,58 @@
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from MuseLog.metadata_index import CrawlStats, MetadataIndex, crawl_root
+
+
+class MetadataIndexJob(QThread):
+    """
+    在后台线程中爬取素材库根目录并增量更新元数据索引。
+    使用独立的数据库连接，界面线程的查询不受影响。
+    """
+
+    # 根目录、已遍历目录数、已更新目录数
+    progress_changed = Signal(str, int, int)
+    # 各根目录的统计、是否被取消
+    job_finished = Signal(object, bool)
+
+    def __init__(self, roots: List[str], db_path: Optional[str] = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._roots = list(roots)
+        self._db_path = db_path
+        self._cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def stop(self) -> None:
+        self.cancel()
+        self.wait()
+
+    def run(self) -> None:
+        results: List[Dict[str, Any]] = []
+        index: Optional[MetadataIndex] = None
+        try:
+            index = MetadataIndex(self._db_path)
+            for root in self._roots:
+                if self._cancel_event.is_set():
+                    break
+                if not os.path.isdir(root):
+                    # 网络盘离线时保留已有索引，供离线浏览
+                    logging.warning("索引根目录不可访问，跳过: %s", root)
+                    continue
+                stats = crawl_root(index, root, should_stop=self._cancel_event.is_set, progress=self._on_progress)
+                results.append(stats.as_dict())
+        except Exception:
+            # 任何异常都要发出 job_finished，否则界面一直认为索引任务仍在运行
+            logging.exception("更新元数据索引失败")
+        finally:
+            if index is not None:
+                index.close()
+            self.job_finished.emit(results, self._cancel_event.is_set())
+
+    def _on_progress(self, stats: CrawlStats) -> None:
+        self.progress_changed.emit(stats.root, stats.visited, stats.updated)
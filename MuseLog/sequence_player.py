@@ -0,0 +1,483 @@
+import logging
+import os
+import re
+import threading
+from typing import List, Optional, Set, Tuple
+
+from PySide6.QtCore import QElapsedTimer, QObject, QRect, QSize, Qt, QThread, QTimer, Signal
+from PySide6.QtGui import QColor, QImage, QImageReader, QPainter
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QDialog,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSlider,
+    QSpinBox,
+    QVBoxLayout,
+    QWidget,
+)
+
+from MuseLog.explorer_metadata import scan_folder
+
+# 环形缓冲区占用的内存上限：按显示尺寸解码后每帧 w×h×4 字节，帧数由此推算
+SEQUENCE_BUFFER_BUDGET = 192 * 1024 * 1024
+SEQUENCE_BUFFER_MIN_FRAMES = 8
+SEQUENCE_BUFFER_MAX_FRAMES = 240
+# PNG 解码以 CPU 为主，两个线程即可在 30 fps 下领先播放位置
+SEQUENCE_DECODE_THREADS = 2
+# 窗口大小变化后等待这么久再按新尺寸重新解码，拖动窗口边缘时不会反复清空缓冲区
+SEQUENCE_RESIZE_DELAY_MS = 150
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def _natural_key(path: str) -> Tuple:
+    # frame_2.png 排在 frame_10.png 之前
+    name = os.path.basename(path).lower()
+    return tuple(int(part) if part.isdigit() else part for part in _DIGITS.split(name))
+
+
+def list_sequence_frames(folder: str) -> List[str]:
+    """目录中的序列帧图片，按文件名中的数字自然排序。"""
+    return sorted(scan_folder(folder).images, key=_natural_key)
+
+
+def decode_frame(path: str, size: QSize) -> Optional[QImage]:
+    """按显示尺寸（保持比例）解码一帧，转换为绘制最快的预乘 ARGB32 格式。"""
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    source = reader.size()
+    if source.isValid() and size.isValid() and (source.width() > size.width() or source.height() > size.height()):
+        reader.setScaledSize(source.scaled(size, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        logging.debug("解码序列帧失败: %s (%s)", path, reader.errorString())
+        return None
+    return image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+
+
+class _DecoderThread(QThread):
+    def __init__(self, source: "SequenceFrameSource"):
+        super().__init__(source)
+        self._source = source
+
+    def run(self) -> None:
+        self._source._decode_loop()
+
+
+class SequenceFrameSource(QObject):
+    """
+    序列帧的预解码环形缓冲区：
+    - 播放位置 position 是不回绕的计数（循环播放时持续增长），对应第 position % 帧数 帧，
+      存放在第 position % 容量 个槽位中，新位置直接覆盖已播放过的槽位
+    - 解码线程始终填充 [播放位置, 播放位置 + 容量) 这一窗口，离播放位置越近越先解码
+    - 帧数不超过容量时整段常驻内存，循环播放不再解码
+    帧就绪时（解码线程中）发出 frame_ready(position)，跨线程连接自动排队到界面线程。
+    """
+
+    frame_ready = Signal(int)
+
+    def __init__(self, parent: Optional[QObject] = None, threads: int = SEQUENCE_DECODE_THREADS):
+        super().__init__(parent)
+        self._cond = threading.Condition()
+        self._paths: List[str] = []
+        self._size = QSize()
+        self._loop = True
+        self._head = 0
+        self._capacity = 0
+        self._slots: List[Optional[Tuple[int, QImage]]] = []
+        self._inflight: Set[int] = set()
+        # 帧列表或解码尺寸变化时递增，丢弃按旧参数解码的结果
+        self._generation = 0
+        self._stopped = False
+        self._threads = [_DecoderThread(self) for _ in range(max(1, threads))]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def frame_count(self) -> int:
+        return len(self._paths)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def set_frames(self, paths: List[str]) -> None:
+        with self._cond:
+            self._paths = list(paths)
+            self._head = 0
+            self._reset_slots()
+
+    def set_target_size(self, size: QSize) -> None:
+        """按新的显示尺寸重新解码（尺寸不变时不做任何事）。"""
+        with self._cond:
+            if size == self._size:
+                return
+            self._size = QSize(size)
+            self._reset_slots()
+
+    def set_loop(self, loop: bool) -> None:
+        with self._cond:
+            self._loop = loop
+            self._cond.notify_all()
+
+    def seek(self, position: int) -> None:
+        """移动播放位置，缓冲窗口随之前移；拖动进度条时跳到任意位置。"""
+        with self._cond:
+            if position != self._head:
+                self._head = position
+                self._cond.notify_all()
+
+    def frame(self, position: int) -> Optional[QImage]:
+        with self._cond:
+            if not self._capacity:
+                return None
+            if self._holds(position):
+                return self._slots[position % self._capacity][1]
+        return None
+
+    def buffered(self) -> int:
+        """从播放位置起连续可用的帧数。"""
+        with self._cond:
+            count = 0
+            while count < self._capacity:
+                if not self._holds(self._head + count):
+                    break
+                count += 1
+            return count
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.wait()
+
+    def _reset_slots(self) -> None:
+        # 调用方持有锁
+        count = len(self._paths)
+        if count and self._size.isValid():
+            frame_bytes = max(1, self._size.width() * self._size.height() * 4)
+            capacity = SEQUENCE_BUFFER_BUDGET // frame_bytes
+            capacity = max(SEQUENCE_BUFFER_MIN_FRAMES, min(SEQUENCE_BUFFER_MAX_FRAMES, capacity))
+            self._capacity = min(count, capacity)
+        else:
+            self._capacity = 0
+        self._slots = [None] * self._capacity
+        self._inflight.clear()
+        self._generation += 1
+        self._cond.notify_all()
+
+    def _holds(self, position: int) -> bool:
+        # 调用方持有锁。槽位中的位置与 position 对应同一帧即可使用：
+        # 整段常驻时循环到下一圈无需重新解码
+        slot = self._slots[position % self._capacity]
+        return slot is not None and (slot[0] - position) % len(self._paths) == 0
+
+    def _next_job(self) -> Optional[Tuple[int, int, str, QSize]]:
+        # 调用方持有锁；返回窗口中离播放位置最近、尚未解码的位置
+        count = len(self._paths)
+        for offset in range(self._capacity):
+            position = self._head + offset
+            if not self._loop and position >= count:
+                break
+            if position in self._inflight or self._holds(position):
+                continue
+            self._inflight.add(position)
+            return self._generation, position, self._paths[position % count], QSize(self._size)
+        return None
+
+    def _decode_loop(self) -> None:
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopped:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._cond.wait()
+                if self._stopped:
+                    return
+            generation, position, path, size = job
+            image = decode_frame(path, size)
+            with self._cond:
+                self._inflight.discard(position)
+                current = generation == self._generation
+                in_window = self._head <= position < self._head + self._capacity
+                if current and in_window:
+                    # 解码失败的帧放入空图占位，播放不会停在这一帧
+                    self._slots[position % self._capacity] = (position, image if image is not None else QImage())
+            if current and in_window:
+                self.frame_ready.emit(position)
+
+
+class _SequenceCanvas(QWidget):
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self._image: Optional[QImage] = None
+        self.setMinimumSize(160, 160)
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+
+    def set_image(self, image: Optional[QImage]) -> None:
+        self._image = image
+        self.update()
+
+    def target_size(self) -> QSize:
+        # 按物理像素解码，高分屏上不会发虚
+        ratio = self.devicePixelRatioF()
+        return QSize(max(1, round(self.width() * ratio)), max(1, round(self.height() * ratio)))
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(48, 48, 48))
+        image = self._image
+        if image is not None and not image.isNull():
+            ratio = self.devicePixelRatioF()
+            size = QSize(round(image.width() / ratio), round(image.height() / ratio))
+            size = size.scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio) if (
+                size.width() > self.width() or size.height() > self.height()
+            ) else size
+            target = QRect(0, 0, size.width(), size.height())
+            target.moveCenter(self.rect().center())
+            painter.drawImage(target, image)
+        painter.end()
+
+
+class SequencePlayerWidget(QWidget):
+    """
+    序列帧动画预览：按帧率播放、拖动进度条定位、循环播放。
+    播放位置由经过的时间计算（而不是每次计时器触发加一帧），帧率不受计时器抖动影响；
+    下一帧尚未解码时停在当前帧等待（计为一次卡顿），解码完成后从该帧重新计时。
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None, threads: int = SEQUENCE_DECODE_THREADS):
+        super().__init__(parent)
+        self.source = SequenceFrameSource(self, threads)
+        self.source.frame_ready.connect(self._on_frame_ready)
+        self._position = 0
+        self._shown = -1
+        self._playing = False
+        self.stalls = 0
+        self._stalled = False
+        # 播放计时的起点：起点位置与此时的计时器读数
+        self._clock = QElapsedTimer()
+        self._anchor_position = 0
+        self._anchor_ms = 0
+
+        self.canvas = _SequenceCanvas(self)
+        self.btnPlay = QPushButton("播放", self)
+        self.btnPlay.clicked.connect(self.toggle_playback)
+        self.sliderFrame = QSlider(Qt.Orientation.Horizontal, self)
+        self.sliderFrame.setMinimum(0)
+        self.sliderFrame.valueChanged.connect(self._on_slider_changed)
+        self.spinFps = QSpinBox(self)
+        self.spinFps.setRange(1, 240)
+        self.spinFps.setSuffix(" fps")
+        self.spinFps.valueChanged.connect(self._on_fps_changed)
+        self.checkLoop = QCheckBox("循环", self)
+        self.checkLoop.setChecked(True)
+        self.checkLoop.toggled.connect(self._on_loop_toggled)
+        self.labelFrame = QLabel(self)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.btnPlay)
+        controls.addWidget(self.sliderFrame, 1)
+        controls.addWidget(self.labelFrame)
+        controls.addWidget(self.spinFps)
+        controls.addWidget(self.checkLoop)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.canvas, 1)
+        layout.addLayout(controls)
+
+        self._tick = QTimer(self)
+        self._tick.setTimerType(Qt.TimerType.PreciseTimer)
+        self._tick.timeout.connect(self._on_tick)
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(SEQUENCE_RESIZE_DELAY_MS)
+        self._resize_timer.timeout.connect(self._apply_target_size)
+
+    # ---------------------- 对外接口 ----------------------
+    def set_sequence(self, paths: List[str], fps: int) -> None:
+        self.pause()
+        self.source.set_frames(paths)
+        if self.isVisible():
+            self.source.set_target_size(self.canvas.target_size())
+        self.sliderFrame.blockSignals(True)
+        self.sliderFrame.setMaximum(max(0, len(paths) - 1))
+        self.sliderFrame.setValue(0)
+        self.sliderFrame.blockSignals(False)
+        self.spinFps.setValue(fps)
+        self._position = 0
+        self._shown = -1
+        self.stalls = 0
+        self._show_position()
+
+    @property
+    def fps(self) -> int:
+        return self.spinFps.value()
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    def play(self) -> None:
+        count = self.source.frame_count
+        if self._playing or not count:
+            return
+        if not self.checkLoop.isChecked() and self._position % count == count - 1:
+            # 非循环播放到结尾后再次播放时从头开始
+            self._seek(0)
+        self._playing = True
+        self.btnPlay.setText("暂停")
+        self._reanchor(self._position)
+        # 计时器比帧间隔更密，实际切换时刻由经过的时间决定
+        self._tick.start(max(1, int(1000 / self.fps / 2)))
+
+    def pause(self) -> None:
+        self._playing = False
+        self._stalled = False
+        self._tick.stop()
+        self.btnPlay.setText("播放")
+
+    def toggle_playback(self) -> None:
+        if self._playing:
+            self.pause()
+        else:
+            self.play()
+
+    def stop(self) -> None:
+        self.pause()
+        self.source.stop()
+
+    # ---------------------- 播放 ----------------------
+    def _reanchor(self, position: int) -> None:
+        if not self._clock.isValid():
+            self._clock.start()
+        self._anchor_position = position
+        self._anchor_ms = self._clock.elapsed()
+
+    def _on_tick(self) -> None:
+        if self._shown != self._position:
+            # 当前位置的帧还没解码（刚开始播放、定位或改变尺寸后），就绪后再开始计时
+            self._reanchor(self._position)
+            return
+        count = self.source.frame_count
+        elapsed = self._clock.elapsed() - self._anchor_ms
+        target = self._anchor_position + int(elapsed * self.fps / 1000)
+        if not self.checkLoop.isChecked() and target >= count - 1:
+            target = count - 1
+        if target == self._shown:
+            if not self.checkLoop.isChecked() and target == count - 1:
+                # 在最后一帧上关闭循环
+                self.pause()
+            return
+        # 依次前进到 target；中间某帧尚未解码时停在它之前等待
+        position = self._shown
+        while position < target and self.source.frame(position + 1) is not None:
+            position += 1
+        if position != target:
+            if not self._stalled:
+                self._stalled = True
+                self.stalls += 1
+                logging.debug("序列帧播放等待解码: 第 %d 帧", (position + 1) % count)
+            self._set_position(position)
+            return
+        self._stalled = False
+        self._set_position(target)
+        if not self.checkLoop.isChecked() and target == count - 1:
+            self.pause()
+
+    def _on_frame_ready(self, position: int) -> None:
+        if position == self._position and self._shown != position:
+            self._show_position()
+            if self._playing:
+                self._reanchor(position)
+        elif self._stalled and position == self._shown + 1:
+            # 卡顿结束，从这一帧重新计时，避免随后连续跳帧追赶
+            self._stalled = False
+            self._reanchor(position)
+            self._set_position(position)
+
+    def _set_position(self, position: int) -> None:
+        self._position = position
+        self.source.seek(position)
+        self._show_position()
+        count = self.source.frame_count
+        if count:
+            self.sliderFrame.blockSignals(True)
+            self.sliderFrame.setValue(position % count)
+            self.sliderFrame.blockSignals(False)
+
+    def _show_position(self) -> None:
+        count = self.source.frame_count
+        image = self.source.frame(self._position)
+        if image is not None:
+            self.canvas.set_image(image)
+            self._shown = self._position
+        frame = self._position % count + 1 if count else 0
+        self.labelFrame.setText(f"{frame} / {count}")
+
+    def _seek(self, frame: int) -> None:
+        self._position = frame
+        self._shown = -1
+        self.source.seek(frame)
+        self._show_position()
+        if self._playing:
+            self._reanchor(frame)
+
+    def _on_slider_changed(self, value: int) -> None:
+        self._seek(value)
+
+    def _on_loop_toggled(self, loop: bool) -> None:
+        self.source.set_loop(loop)
+        count = self.source.frame_count
+        if not loop and count and self._position >= count:
+            # 循环播放时位置会越过 count 持续增长，关闭循环后换算回第一圈，
+            # 否则非循环的解码窗口在 count 处截止，播放会一直等待解码
+            self._seek(self._position % count)
+
+    def _on_fps_changed(self, _value: int) -> None:
+        if self._playing:
+            self._reanchor(self._position)
+            self._tick.setInterval(max(1, int(1000 / self.fps / 2)))
+
+    def _apply_target_size(self) -> None:
+        self.source.set_target_size(self.canvas.target_size())
+        # 旧尺寸的帧已丢弃，重新计时以免新尺寸解码期间被记为卡顿
+        self._shown = -1
+        self._show_position()
+        if self._playing:
+            self._reanchor(self._position)
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        if self.source.capacity:
+            self._resize_timer.start()
+        else:
+            # 首次显示时立即按画布尺寸开始解码
+            self._apply_target_size()
+
+
+class SequencePlayerDialog(QDialog):
+    """非模态的序列帧预览窗口，关闭时停止解码线程。"""
+
+    def __init__(self, folder: str, fps: int, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.setWindowTitle(f"动画预览 - {os.path.basename(os.path.normpath(folder))}")
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.resize(640, 640)
+        self.player = SequencePlayerWidget(self)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.addWidget(self.player)
+        self.player.set_sequence(list_sequence_frames(folder), fps)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.player.play()
+
+    def closeEvent(self, event) -> None:
+        self.player.stop()
+        super().closeEvent(event)
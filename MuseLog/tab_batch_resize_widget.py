@@ -1,9 +1,19 @@
 ﻿import json
 import os
+from typing import List, Optional
 
-from PySide6.QtWidgets import QWidget, QFileDialog, QMessageBox
+from PySide6.QtWidgets import (
+    QCheckBox, QComboBox, QWidget, QFileDialog, QHBoxLayout, QLabel, QLineEdit, QMessageBox, QPushButton, QSpinBox
+)
 
-from MuseLog.batch_resize_utils import BatchResizer
+from MuseLog.batch_resize_encoders import KEEP_FORMAT, OUTPUT_FORMATS, OutputOptions, available_output_formats
+from MuseLog.batch_resize_job import BatchResizeJob
+from MuseLog.batch_resize_utils import (
+    RESIZE_POLICY_QUALITY, RESIZE_POLICY_SPEED, VARIANT_LAYOUT_FOLDER, VARIANT_LAYOUT_SUFFIX, BatchResizer,
+    default_worker_count
+)
+from MuseLog.image_list_model import ImagePathListModel
+from MuseLog.image_scanner import iter_image_files
 from MuseLog.ui.ui_tab_batch_resize import Ui_TabBatchResize
 
 
@@ -12,6 +22,11 @@ class TabBatchResizeWidget(QWidget):
         super().__init__(parent)
         self.ui = Ui_TabBatchResize()
         self.ui.setupUi(self)
+        # 图片列表使用模型/视图，大量序列帧也能快速加载与删除
+        self.image_model = ImagePathListModel(self)
+        self.ui.listImages.setModel(self.image_model)
+        self._loaded_folder: Optional[str] = None
+        self._loaded_recursive = False
         # 绑定事件
         self.ui.btnSelectInputFolder.clicked.connect(self.select_input_folder)
         self.ui.btnSelectOutputFolder.clicked.connect(self.select_output_folder)
@@ -23,9 +38,65 @@ class TabBatchResizeWidget(QWidget):
         self.ui.btnReloadImage.clicked.connect(lambda: self.load_images(self.ui.lineInputFolder.text().strip()))
         self.ui.btnClearList.clicked.connect(self.clear_list)
         self.ui.btnRemoveImages.clicked.connect(self.remove_images)  # 删除选中的图片
+        # 任务控制按钮：暂停/继续、取消
+        self.checkIncremental = QCheckBox("增量处理（跳过未变化的图片）", self)
+        self.checkFastDownscale = QCheckBox("快速缩小（优先速度）", self)
+        self.checkRecursive = QCheckBox("包含子文件夹", self)
+        self.btnPauseResize = QPushButton("暂停", self)
+        self.btnCancelResize = QPushButton("取消", self)
+        job_layout = QHBoxLayout()
+        job_layout.addWidget(self.checkIncremental)
+        job_layout.addWidget(self.checkFastDownscale)
+        job_layout.addWidget(self.checkRecursive)
+        job_layout.addWidget(self.btnPauseResize)
+        job_layout.addWidget(self.btnCancelResize)
+        self.ui.verticalLayout.insertLayout(self.ui.verticalLayout.indexOf(self.ui.btnBatchResize) + 1, job_layout)
+        # 输出格式与编码参数
+        self.comboOutputFormat = QComboBox(self)
+        self.comboOutputFormat.addItem("保持原格式", KEEP_FORMAT)
+        for fmt in available_output_formats():
+            self.comboOutputFormat.addItem(OUTPUT_FORMATS[fmt][2], fmt)
+        self.spinQuality = QSpinBox(self)
+        self.spinQuality.setRange(0, 100)
+        self.spinQuality.setSpecialValueText("默认")
+        self.spinQuality.setValue(0)
+        self.checkOptimize = QCheckBox("优化压缩（PNG 优化 / JPEG 渐进式）", self)
+        self.checkStripMetadata = QCheckBox("去除元数据", self)
+        output_layout = QHBoxLayout()
+        output_layout.addWidget(QLabel("输出格式", self))
+        output_layout.addWidget(self.comboOutputFormat)
+        output_layout.addWidget(QLabel("质量", self))
+        output_layout.addWidget(self.spinQuality)
+        output_layout.addWidget(self.checkOptimize)
+        output_layout.addWidget(self.checkStripMetadata)
+        output_layout.addStretch(1)
+        self.ui.verticalLayout.insertLayout(self.ui.verticalLayout.indexOf(self.ui.btnBatchResize), output_layout)
+        # 多尺寸输出：一次解码生成多个尺寸，数值含义与当前缩放模式相同
+        self.lineVariants = QLineEdit(self)
+        self.lineVariants.setPlaceholderText("多尺寸（如 100,50,25），留空则只输出一个尺寸")
+        self.comboVariantLayout = QComboBox(self)
+        self.comboVariantLayout.addItem("按尺寸分文件夹", VARIANT_LAYOUT_FOLDER)
+        self.comboVariantLayout.addItem("文件名加尺寸后缀", VARIANT_LAYOUT_SUFFIX)
+        variant_layout = QHBoxLayout()
+        variant_layout.addWidget(QLabel("多尺寸", self))
+        variant_layout.addWidget(self.lineVariants, 1)
+        variant_layout.addWidget(self.comboVariantLayout)
+        # 内存预算：超大图片较多时限制同时解码的数量，0 表示不限制
+        self.spinMemoryBudget = QSpinBox(self)
+        self.spinMemoryBudget.setRange(0, 1024 * 1024)
+        self.spinMemoryBudget.setSingleStep(512)
+        self.spinMemoryBudget.setSuffix(" MB")
+        self.spinMemoryBudget.setSpecialValueText("不限制")
+        variant_layout.addWidget(QLabel("内存预算", self))
+        variant_layout.addWidget(self.spinMemoryBudget)
+        self.ui.verticalLayout.insertLayout(self.ui.verticalLayout.indexOf(self.ui.btnBatchResize), variant_layout)
+        self.btnPauseResize.clicked.connect(self.toggle_pause)
+        self.btnCancelResize.clicked.connect(self.cancel_resize)
+        self._job: Optional[BatchResizeJob] = None
+        self._job_desc = ""
+        self._update_job_buttons()
         self.update_mode()
         # 状态
-        self.image_paths = []
         self.ui.labelStatus.setText("状态：等待操作")
         # 加载��认路径
         self.load_default_paths()
@@ -45,15 +116,22 @@ class TabBatchResizeWidget(QWidget):
         else:
             self.ui.labelStatus.setText("未选择输出文件夹")
 
+    @property
+    def image_paths(self):
+        return self.image_model.paths()
+
     def load_images(self, folder):
-        self.image_paths = []
-        self.ui.listImages.clear()
-        for fname in os.listdir(folder):
-            if fname.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
-                path = os.path.join(folder, fname)
-                self.image_paths.append(path)
-                self.ui.listImages.addItem(path)
-        self.ui.labelStatus.setText(f"已加载 {len(self.image_paths)} 张图片")
+        self.image_model.clear()
+        self._loaded_folder = None
+        if not folder or not os.path.isdir(folder):
+            self.ui.labelStatus.setText("请先选择或输入有效的输入文件夹")
+            return
+        recursive = self.checkRecursive.isChecked()
+        # 一次性批量插入模型
+        self.image_model.set_paths(iter_image_files(folder, recursive=recursive))
+        self._loaded_folder = os.path.normcase(os.path.abspath(folder))
+        self._loaded_recursive = recursive
+        self.ui.labelStatus.setText(f"已加载 {self.image_model.path_count()} 张图片")
 
     def update_mode(self):
         # Enable inputs according to selected mode
@@ -74,6 +152,8 @@ class TabBatchResizeWidget(QWidget):
         self.ui.labelStatus.setText(msg)
 
     def batch_resize(self):
+        if self._job is not None:
+            return
         in_folder = self.ui.lineInputFolder.text().strip()
         out_folder = self.ui.lineOutputFolder.text().strip()
         # 判断模式和参数
@@ -89,27 +169,150 @@ class TabBatchResizeWidget(QWidget):
             mode = "height"
             value = self.ui.spinHeight.value()
             desc = f"固定高度 {value}"
-        resizer = BatchResizer(in_folder=in_folder, out_folder=out_folder, mode=mode, value=value, status_callback=self.status_callback)
+        variants = self._parse_variants()
+        if variants is None:
+            self.ui.labelStatus.setText("多尺寸格式错误，请输入以逗号分隔的正整数")
+            return
+        if variants:
+            desc = f"{desc.split(' ')[0]} 多尺寸 {', '.join(str(v) for v in variants)}"
+        resizer = BatchResizer(in_folder=in_folder, out_folder=out_folder, mode=mode, value=value,
+                               workers=default_worker_count(), incremental=self.checkIncremental.isChecked(),
+                               policy=RESIZE_POLICY_SPEED if self.checkFastDownscale.isChecked() else RESIZE_POLICY_QUALITY,
+                               recursive=self.checkRecursive.isChecked(),
+                               output_options=self._build_output_options(),
+                               variants=variants, variant_layout=self.comboVariantLayout.currentData(),
+                               memory_budget_mb=self.spinMemoryBudget.value())
         # 校验文件夹
         valid, msg = resizer.validate_folders()
         if not valid:
             self.ui.labelStatus.setText(msg)
             return
-        # 加载图片路径
-        self.image_paths = resizer.load_image_paths()
-        if not self.image_paths:
+        if self._uses_loaded_list(in_folder, resizer.recursive):
+            # 列表已加载（可能删除过部分图片）：按列表处理
+            resizer.image_paths = self.image_model.paths()
+            if not resizer.image_paths:
+                self.ui.labelStatus.setText("图片列表为空")
+                return
+            self.ui.labelStatus.setText(f"开始批量缩放 ({desc}) 共 {len(resizer.image_paths)} 张图片...")
+        else:
+            # 未加载列表时在后台线程中边扫描边处理，深层序列帧目录不会阻塞界面
+            self.ui.labelStatus.setText(f"开始批量缩放 ({desc})...")
+        # 在后台线程执行，界面保持响应
+        self._job_desc = desc
+        self._job = BatchResizeJob(resizer, self)
+        self._job.progress_changed.connect(self.on_resize_progress)
+        self._job.job_finished.connect(self.on_resize_finished)
+        # 线程真正退出后再释放对象
+        self._job.finished.connect(self._job.deleteLater)
+        self._job.start()
+        self._update_job_buttons()
+
+    def on_resize_progress(self, done: int, total: int, path: str, throughput: float, eta: float):
+        eta_text = f"，剩余约 {int(eta)} 秒" if eta >= 0 else ""
+        paused_text = "（已暂停）" if self._job is not None and self._job.is_paused else ""
+        progress = f"{done}/{total}" if total else str(done)
+        self.ui.labelStatus.setText(
+            f"处理 {progress}: {os.path.basename(path)}  {throughput:.1f} 张/秒{eta_text}{paused_text}"
+        )
+
+    def on_resize_finished(self, succeeded: int, failed: int, cancelled: bool):
+        job = self._job
+        self._job = None
+        self._update_job_buttons()
+        if job is None:
+            return
+        out_folder = job.resizer.out_folder
+        if cancelled:
+            self.ui.labelStatus.setText(f"已取消: 已处理 {succeeded} 张图片")
+            return
+        if not job.resizer.image_paths:
             self.ui.labelStatus.setText("输入文件夹中没有图片文件")
             return
-        total = len(self.image_paths)
-        self.ui.labelStatus.setText(f"开始批量缩放 ({desc}) 共 {total} 张图片...")
-        resizer.process_images()
-        self.ui.labelStatus.setText(f"完成: 共 {total} 张图片处理完毕，保存至 {out_folder}")
+        failed_text = f"，失败 {failed} 张" if failed else ""
+        if job.resizer.skipped_count:
+            failed_text += f"，跳过 {job.resizer.skipped_count} 张未变化图片"
+        if succeeded:
+            failed_text += f"，{job.resizer.describe_bytes_saved()}，{job.resizer.describe_peak_memory()}"
+        self.ui.labelStatus.setText(f"完成: 共 {succeeded} 张图片处理完毕{failed_text}，保存至 {out_folder}")
         # 弹出 消息框
-        QMessageBox.information(self, "批量缩放完成", f"已处理 {total} 张图片，保存至 {out_folder}")
+        QMessageBox.information(self, "批量缩放完成", f"已处理 {succeeded} 张图片{failed_text}，保存至 {out_folder}")
         # 然后打开输出文件夹
         if os.path.exists(out_folder):
             os.startfile(out_folder)
 
+    def _build_output_options(self) -> OutputOptions:
+        quality = self.spinQuality.value()
+        optimize = self.checkOptimize.isChecked()
+        return OutputOptions(
+            output_format=self.comboOutputFormat.currentData() or KEEP_FORMAT,
+            quality=quality or None,
+            optimize=optimize,
+            progressive=optimize,
+            strip_metadata=self.checkStripMetadata.isChecked(),
+        )
+
+    def _parse_variants(self) -> Optional[List[int]]:
+        """解析多尺寸输入，格式错误时返回 None。"""
+        text = self.lineVariants.text().replace("，", ",").strip()
+        if not text:
+            return []
+        variants: List[int] = []
+        for part in text.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if not part.isdigit() or int(part) <= 0:
+                return None
+            if int(part) not in variants:
+                variants.append(int(part))
+        return variants
+
+    def toggle_pause(self):
+        if self._job is None:
+            return
+        if self._job.is_paused:
+            self._job.resume()
+            self.ui.labelStatus.setText(f"继续批量缩放 ({self._job_desc})...")
+        else:
+            self._job.pause()
+            self.ui.labelStatus.setText(f"已暂停批量缩放 ({self._job_desc})")
+        self._update_job_buttons()
+
+    def cancel_resize(self):
+        if self._job is None:
+            return
+        self._job.cancel()
+        self.ui.labelStatus.setText("正在取消，等待当前图片写入完成...")
+        self.btnCancelResize.setEnabled(False)
+        self.btnPauseResize.setEnabled(False)
+
+    def stop_background_jobs(self):
+        """关闭标签页/窗口时调用：取消任务并等待后台线程退出。"""
+        job = self._job
+        if job is None:
+            return
+        job.job_finished.disconnect(self.on_resize_finished)
+        job.progress_changed.disconnect(self.on_resize_progress)
+        job.stop()
+        self._job = None
+
+    def closeEvent(self, event):
+        self.stop_background_jobs()
+        super().closeEvent(event)
+
+    def _update_job_buttons(self):
+        running = self._job is not None
+        self.ui.btnBatchResize.setEnabled(not running)
+        self.checkIncremental.setEnabled(not running)
+        self.checkFastDownscale.setEnabled(not running)
+        self.checkRecursive.setEnabled(not running)
+        self.lineVariants.setEnabled(not running)
+        self.comboVariantLayout.setEnabled(not running)
+        self.spinMemoryBudget.setEnabled(not running)
+        self.btnPauseResize.setEnabled(running)
+        self.btnCancelResize.setEnabled(running)
+        self.btnPauseResize.setText("继续" if running and self._job.is_paused else "暂停")
+
 
     def save_default_paths(self):
         in_folder = self.ui.lineInputFolder.text().strip()
@@ -135,19 +338,22 @@ class TabBatchResizeWidget(QWidget):
                 pass
 
     def clear_list(self):
-        self.image_paths = []
-        self.ui.listImages.clear()
+        self.image_model.clear()
+        self._loaded_folder = None
         self.ui.labelStatus.setText("已清空图片列表")
         self.update_mode()
 
     def remove_images(self):
-        selected_items = self.ui.listImages.selectedItems()
-        if not selected_items:
+        selected_rows = self.ui.listImages.selectionModel().selectedRows()
+        if not selected_rows:
             self.ui.labelStatus.setText("请先选择要删除的图片")
             return
-        for item in selected_items:
-            self.ui.listImages.takeItem(self.ui.listImages.row(item))
-            self.image_paths.remove(item.text())
-        self.ui.labelStatus.setText(f"已删除 {len(selected_items)} 张图片")
-        if not self.image_paths:
+        removed = self.image_model.remove_indexes(selected_rows)
+        self.ui.labelStatus.setText(f"已删除 {removed} 张图片")
+        if not self.image_model.path_count():
             self.update_mode()
+
+    def _uses_loaded_list(self, in_folder: str, recursive: bool) -> bool:
+        if not self._loaded_folder or not in_folder:
+            return False
+        return self._loaded_folder == os.path.normcase(os.path.abspath(in_folder)) and self._loaded_recursive == recursive
@@ -1,28 +1,56 @@
 import logging
 import os
 import json
+import sqlite3
+import threading
 from typing import Dict, Any, List, Optional, Sequence, Set
 
-from PySide6.QtCore import QDir, QModelIndex, Qt
+from PySide6.QtCore import QDir, QModelIndex, Qt, QTimer
+from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import (
-    QWidget, QFileSystemModel, QMessageBox, QTableWidgetItem
+    QWidget, QFileSystemModel, QMessageBox
 )
 
 from MuseLog.ui.ui_tab_explorer import Ui_TabExplorer
-from PySide6.QtWidgets import QHBoxLayout, QHeaderView, QMenu, QPushButton, QVBoxLayout
+from PySide6.QtWidgets import (
+    QComboBox, QHBoxLayout, QHeaderView, QLineEdit, QListWidget, QListWidgetItem, QMenu, QProgressBar, QPushButton,
+    QTabWidget, QVBoxLayout
+)
 
+from MuseLog.batch_resize_encoders import format_bytes
 from MuseLog.explorer_custom_widgets import resolve_custom_widget_builder
+from MuseLog.explorer_meta_model import META_OP_COLUMN, MetaOperationDelegate, MetaTableModel
+from MuseLog.explorer_metadata import (
+    MediaList,
+    MetadataCache,
+    MetaStruct,
+    collect_embedded_metadata,
+    metadata_to_structs,
+)
+from MuseLog.explorer_metadata_loader import MetadataLoader
 from MuseLog.explorer_signals import signal_manager
+from MuseLog.explorer_thumbnail_grid import ThumbnailGridView
+from MuseLog.explorer_watcher import FolderWatcher
+from MuseLog.file_operation_job import FileOperationQueue
+from MuseLog.file_operations import FileOperation, OperationResult
+from MuseLog.metadata_index import MetadataIndex, PromptHit, refresh_folder
+from MuseLog.metadata_index_job import MetadataIndexJob
+from MuseLog.thumbnail_loader import ThumbnailItem, ThumbnailLoader
+from MuseLog.video_probe import VideoInfo
+from MuseLog.video_probe_service import VideoProbeService, is_video
 from MuseLog.widget_video_detail import VideoDetailWidget
 
 
-class MetaStruct:
-    def __init__(self, name: str, file_path: str = "", op_type: str = "", op_name: str = "", op_data: Any = None):
-        self.name = name
-        self.file_path = file_path
-        self.op_type = op_type
-        self.op_name = op_name
-        self.op_data = op_data
+# 媒体列表排序选项：显示文字、排序键、是否倒序
+MEDIA_SORT_OPTIONS = (
+    ("按名称排序", "name", False),
+    ("按大小排序（大→小）", "size", True),
+    ("按修改时间排序（新→旧）", "mtime", True),
+)
+
+
+def _meta_snapshot(meta: Dict[str, MetaStruct]) -> Dict[str, Dict[str, Any]]:
+    return {k: vars(v) for k, v in meta.items()}
 
 
 class TabExplorerWidget(QWidget):
@@ -34,7 +62,12 @@ class TabExplorerWidget(QWidget):
     - 支持历史路径导航和刷新功能
     """
 
-    def __init__(self, parent=None, default_path: Optional[str] = None):
+    def __init__(
+        self,
+        parent=None,
+        default_path: Optional[str] = None,
+        file_operations: Optional[FileOperationQueue] = None,
+    ):
         super().__init__(parent)
         self.ui = Ui_TabExplorer()
         self.ui.setupUi(self)
@@ -49,11 +82,20 @@ class TabExplorerWidget(QWidget):
         for col in range(1, 4):
             self.ui.treeView.setColumnHidden(col, True)
 
-        # 初始化 表格 TableWidget
+        # 初始化 元数据表格：模型 + 委托绘制操作按钮，行数多时不创建单元格控件
+        self.meta_model = MetaTableModel(self)
+        self.meta_delegate = MetaOperationDelegate(self.ui.tableMeta)
+        self.meta_delegate.operation_clicked.connect(self.on_metadata_operation_clicked)
+        self.ui.tableMeta.setModel(self.meta_model)
+        self.ui.tableMeta.setItemDelegateForColumn(META_OP_COLUMN, self.meta_delegate)
+        self.ui.tableMeta.setMouseTracking(True)
         hh = self.ui.tableMeta.horizontalHeader()
         hh.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        # 按内容调整列宽时只采样有限行数，上千个视频的目录切换耗时不随行数增长
+        hh.setResizeContentsPrecision(100)
         hh.setSectionResizeMode(1, QHeaderView.Fixed)
         self.ui.tableMeta.setColumnWidth(1, 400)
+        self.ui.tableMeta.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
         # 绑定事件
         self.ui.btnEnter.clicked.connect(self.on_enter_clicked)
@@ -67,7 +109,7 @@ class TabExplorerWidget(QWidget):
         self.ui.btnBack.clicked.connect(self.on_back_clicked)
         self.ui.btnGoUp.clicked.connect(self.on_go_up_clicked)
         self.ui.btnRefresh.clicked.connect(self.on_refresh_clicked)
-        self.ui.tableMeta.cellClicked.connect(self.on_table_cell_activated)
+        self.ui.tableMeta.clicked.connect(lambda index: self.on_table_cell_activated(index.row(), index.column()))
         
         # 绑定 树 右键事件，弹出菜单
         self.ui.treeView.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
@@ -84,9 +126,59 @@ class TabExplorerWidget(QWidget):
         self._suppress_history: bool = False
         self._current_detail_widget: Optional[QWidget] = None
         self._video_detail_widget: Optional[VideoDetailWidget] = None
-        self._table_row_meta: List[MetaStruct] = []
+        # 当前展示的目录及其最近一次加载完成的元数据（用于监视刷新时比较差异）
+        self._shown_folder: Optional[str] = None
+        self._loaded_meta: Optional[Dict[str, MetaStruct]] = None
+        # 当前目录图片内嵌参数的表格行，目录元数据显示之后再读取
+        self._embedded_meta: Dict[str, MetaStruct] = {}
         self._auto_trigger_ops: Set[str] = {"视频元数据"}
 
+        # 来回切换目录时直接复用缓存，按目录与附属文件的 mtime 校验
+        self._metadata_cache = MetadataCache()
+        # 元数据在线程池中收集，树选择与方向键浏览不会被慢盘阻塞
+        self._metadata_loader = MetadataLoader(self, collector=self.collect_metadata)
+        self._metadata_loader.metadata_loaded.connect(self.on_metadata_loaded)
+        self._metadata_loader.metadata_failed.connect(self.on_metadata_failed)
+        # 图片内嵌参数需要打开图片文件，单独在后台读取，不拖慢目录信息的显示
+        self._embedded_loader = MetadataLoader(self, collector=self.collect_embedded_metadata)
+        self._embedded_loader.metadata_loaded.connect(self.on_embedded_metadata_loaded)
+        # 素材库持久化索引：启动时先显示索引中的记录，网络盘离线时也能查看元数据
+        self._metadata_index = self._open_metadata_index()
+        self._index_job: Optional[MetadataIndexJob] = None
+        self.btnIndexLibrary = QPushButton("建立索引", self.ui.topControlWidget)
+        self.btnIndexLibrary.setToolTip("将当前目录加入素材库索引，并在后台增量更新")
+        self.btnIndexLibrary.setEnabled(self._metadata_index is not None)
+        self.btnIndexLibrary.clicked.connect(self.on_index_library_clicked)
+        self.ui.horizontalLayout2.addWidget(self.btnIndexLibrary)
+        self._setup_prompt_search()
+        # 拷贝序列帧、同步 json42 等文件操作在后台排队执行。队列通常由主窗口持有，
+        # 标签页关闭后重新打开时不会出现第二个队列同时写入同一目标
+        self._owns_file_operations: bool = file_operations is None
+        self._file_operations = file_operations or FileOperationQueue(self)
+        if self._owns_file_operations:
+            signal_manager.enqueue_file_operation.connect(self.on_enqueue_file_operation)
+        self._file_operations.progress_changed.connect(self.on_file_operation_progress)
+        self._file_operations.operation_finished.connect(self.on_file_operation_finished)
+        self._file_operations.queue_changed.connect(self.on_file_operation_queue_changed)
+        self._setup_file_operation_bar()
+        # 重新打开标签页时队列中可能仍有操作在执行
+        self.on_file_operation_queue_changed(self._file_operations.pending_count())
+        # 缩略图网格：内存 + 磁盘两级缓存，缩略图在线程池中按缩小的尺寸解码
+        # 视频的时长与封面帧在后台探测，结果持久化缓存，封面帧写入缩略图磁盘缓存
+        self._video_probe = VideoProbeService(self)
+        self._video_probe.video_probed.connect(self.on_video_probed)
+        self._thumbnail_loader = ThumbnailLoader(self, video_probe=self._video_probe)
+        self._thumbnail_loader.folder_listed.connect(self.on_thumbnails_listed)
+        # 缩略图网格当前列出的目录；切换到网格标签页时才列出图片
+        self._grid_folder: Optional[str] = None
+        self._setup_thumbnail_grid()
+        # 监视当前目录，生成器写出的新文件无需手动刷新即可显示
+        self._folder_watcher = FolderWatcher(self)
+        self._folder_watcher.folders_changed.connect(self.on_watched_folders_changed)
+        # 有变化、需要在下次收集时同步更新索引记录的目录
+        self._stale_index_folders: Set[str] = set()
+        self._stale_index_lock = threading.Lock()
+
         # Detail 区域布局
         detail_layout = self.ui.DetailWidget.layout()
         if detail_layout is None:
@@ -111,6 +203,10 @@ class TabExplorerWidget(QWidget):
             chosen_path = QDir.homePath()
         self.navigate_to_path(chosen_path)
 
+        # 后台增量更新已登记的素材库根目录
+        if self._metadata_index is not None:
+            self._start_index_job(self._metadata_index.roots())
+
     # ---------------------- 导航与选择 ----------------------
     def on_enter_clicked(self):
         path = self.ui.lineAddress.text().strip()
@@ -203,6 +299,9 @@ class TabExplorerWidget(QWidget):
                     self.model.refresh()
         except Exception:
             pass
+        # 刷新时强制重新收集，不依赖 mtime（部分网络盘的 mtime 精度不足）
+        self._metadata_cache.invalidate(current_path)
+        self._mark_index_stale(current_path)
         self.navigate_to_path(current_path, add_history=False, update_tree=True)
 
     def on_tree_context_menu(self, point):
@@ -266,14 +365,86 @@ class TabExplorerWidget(QWidget):
 
     # ---------------------- 元数据收集与显示 ----------------------
     def show_directory_metadata(self, folder: str):
-        meta: Dict[str, MetaStruct] = self.collect_metadata(folder)
         self._clear_detail_widget()
-        self._update_custom_widget(folder, meta)
-        self.populate_table(meta)
+        self._folder_watcher.clear()
+        self._shown_folder = folder
+        self._loaded_meta = None
+        self._embedded_meta = {}
+        self._embedded_loader.cancel()
+        # 上一个目录尚未解码的缩略图不再需要
+        self._thumbnail_loader.cancel()
+        self._grid_folder = None
+        self.gridThumbnails.set_items([])
+        if self._thumbnail_grid_visible():
+            self._thumbnail_loader.list_folder(folder)
+        # 结果返回前先显示加载状态，并隐藏属于上一个目录的自定义控件
+        self._apply_custom_widgets([])
+        indexed = self._indexed_metadata(folder)
+        if indexed is not None:
+            # 索引中的记录可立即显示，实时结果返回后再替换
+            self.populate_table(indexed)
+        else:
+            self._show_table_message(folder, "加载中…")
+        self._metadata_loader.request(folder)
+
+    def on_metadata_loaded(self, folder: str, meta: Dict[str, MetaStruct]):
+        previous = self._loaded_meta
+        self._loaded_meta = meta
+        self._watch_folder(folder)
+        # 图片可能被原地覆盖，每次加载后都重新读取内嵌参数（未变化的图片命中缓存）
+        if os.path.isdir(folder):
+            self._embedded_loader.request(folder)
+        if previous is None:
+            self._update_custom_widget(folder, meta)
+        elif _meta_snapshot(previous) == _meta_snapshot(meta):
+            # 监视触发的刷新没有带来元数据变化（例如只多了一张序列帧）
+            return
+        # 同一目录的刷新不重建自定义控件，保留用户正在编辑的输入
+        self.populate_table(self._with_embedded(meta), keep_loaded=previous is not None)
+
+    def on_embedded_metadata_loaded(self, folder: str, embedded: Dict[str, MetaStruct]):
+        if folder != self._shown_folder or self._loaded_meta is None:
+            return
+        if _meta_snapshot(embedded) == _meta_snapshot(self._embedded_meta):
+            return
+        self._embedded_meta = embedded
+        self.populate_table(self._with_embedded(self._loaded_meta), keep_loaded=True)
+
+    def _with_embedded(self, meta: Dict[str, MetaStruct]) -> Dict[str, MetaStruct]:
+        # meta 与元数据缓存共享，合并到副本中；JSON 参数中的模型名称优先
+        if not self._embedded_meta:
+            return meta
+        merged = dict(meta)
+        for key, value in self._embedded_meta.items():
+            if key not in merged or key != "模型名称":
+                merged[key] = value
+        return merged
+
+    def on_watched_folders_changed(self, folders: List[str]):
+        current = self._normalize_path(self._shown_folder)
+        for folder in folders:
+            self._metadata_cache.invalidate(folder)
+            self._mark_index_stale(folder)
+        if current and any(self._normalize_path(f) == current for f in folders):
+            logging.debug("[TabExplorer] 目录有变化，重新加载元数据: %s", self._shown_folder)
+            # 不清空表格与详情区，结果返回后只更新有变化的行
+            self._metadata_loader.request(self._shown_folder)
+            if self._thumbnail_grid_visible():
+                self._thumbnail_loader.list_folder(self._shown_folder)
+
+    def _watch_folder(self, folder: str) -> None:
+        if os.path.isdir(folder):
+            self._folder_watcher.watch(folder, self._metadata_cache.sources(folder))
+        else:
+            self._folder_watcher.clear()
+
+    def on_metadata_failed(self, folder: str, _error: str):
+        self._show_table_message(folder, "读取元数据失败")
+
+    def _show_table_message(self, folder: str, message: str) -> None:
+        self.meta_model.set_rows([("目录", MetaStruct(f"{folder}（{message}）"))])
 
-    def populate_table(self, meta: Dict[str, MetaStruct]):
-        self.ui.tableMeta.clearContents()
-        self._table_row_meta = []
+    def populate_table(self, meta: Dict[str, MetaStruct], keep_loaded: bool = False):
         rows = []
         # 友好排序
         key_order = [
@@ -288,78 +459,318 @@ class TabExplorerWidget(QWidget):
             if k not in existing:
                 rows.append((k, v))
 
-        self.ui.tableMeta.setRowCount(len(rows))
-        k: str
-        v: MetaStruct
-        for i, (k, v) in enumerate(rows):
-            self._table_row_meta.append(v)
-            v_str = v.name
-            v_op = v.op_type
-            self.ui.tableMeta.setItem(i, 0, QTableWidgetItem(str(k)))
-            self.ui.tableMeta.setItem(i, 1, QTableWidgetItem(v_str))
-            if v_op:                
-                button = QPushButton(v.op_name or "操作", self.ui.tableMeta)
-                op_data = v.op_data
-                button.clicked.connect(
-                    lambda _, opt=v_op, data=op_data: self.on_metadata_operation_clicked(opt, data)
-                )
-                # 直接把 button 设置到 table 的指定位置
-                self.ui.tableMeta.setCellWidget(i, 2, button)
-        self.ui.tableMeta.resizeColumnToContents(0)
+        # 视频 / 参考图逐个文件的行由模型分页生成，滚动到底部时再加载
+        media = [v.op_data for _, v in rows if isinstance(v.op_data, MediaList)]
+        # 按键比较差异，只通知有变化的行
+        self.meta_model.set_rows(rows, media, keep_loaded=keep_loaded)
 
     def collect_metadata(self, folder: str) -> Dict[str, MetaStruct]:
-        meta: Dict[str, MetaStruct]={"目录": MetaStruct(folder, op_type='打开文件夹', op_name='打开', op_data=folder)}
-        # 1) 常见的提示词 / 参数文件
-        prompt_text_count = 0
-        for name in ("提示词.txt", "prompt.txt", "prompts.txt", "neg_prompt.txt", "caption.txt"):
-            if self._check_file_exists(os.path.join(folder, name)):
-                meta[f'提示词_{prompt_text_count}']=MetaStruct(name,op_type='打开文本文件',op_name='查看',op_data=os.path.join(folder, name))                
-                prompt_text_count += 1
-
-        # 2) 常见 JSON 参数/元数据
-        json_data=self._read_first_json([
-            os.path.join(folder, name) for name in (
-                "metadata.json", "params.json", "info.json"
-            )
-        ])
-        if json_data:
-            # 直接解析常用键
-            model=json_data.get("model") or json_data.get("model_name") or json_data.get("ckpt")
-            if model:
-                meta["模型名称"]=MetaStruct("模型名称", model)
-            # 如果 JSON 本身就包含 prompt，也补上
-            if "prompt" in json_data and "提示词" not in meta:
-                meta["提示词"]=MetaStruct("提示词", str(json_data.get("prompt"))[:2000])
-            meta["其他参数"]=MetaStruct("其他参数", json_data)
-
-        # 3) 视频文件列表
-        videos=self._list_files(folder, exts={".mp4", ".mov", ".avi", ".mkv", ".webm"})
-        if videos:
-            for i, video in enumerate(videos):
-                meta[f'视频文件_{i}']=MetaStruct(os.path.basename(video), op_type='视频元数据', op_name='元数据', op_data=video)
-
-        # 4) 参考图（文件名包含 ref/reference，或在 ref/ 子目录）
-        refs=[]
-        images=self._list_files(folder, exts={".png", ".jpg", ".jpeg", ".bmp", ".gif"})
-        for p in images:
-            name=os.path.basename(p).lower()
-            if ("ref" in name) or ("reference" in name):
-                refs.append(p)
-        ref_dir=os.path.join(folder, "ref")
-        if os.path.isdir(ref_dir):
-            refs.extend(self._list_files(ref_dir, exts={".png", ".jpg", ".jpeg", ".bmp", ".gif"}))
-        if refs:
-            meta["参考图"]=MetaStruct("参考图", ", ".join(os.path.basename(r) for r in refs[:20]) + (" ..." if len(refs) > 20 else ""))
-
+        if not os.path.isdir(folder):
+            # 目录不可访问（例如网络盘离线）时使用索引中的记录
+            indexed = self._indexed_metadata(folder)
+            if indexed is not None:
+                return indexed
+        if self._take_index_stale(folder):
+            self._refresh_index_entry(folder)
+        # 一次 os.scandir 完成分类，网络共享上点击目录不再有大量往返；未变化的目录直接命中缓存
+        meta = self._metadata_cache.get_or_collect(folder)
+        logging.debug("[TabExplorer] 元数据缓存: %s", self._metadata_cache.stats())
         return meta
 
-    def on_table_cell_activated(self, row: int, column: int) -> None:
-        if column != 1:
+    def collect_embedded_metadata(self, folder: str) -> Dict[str, MetaStruct]:
+        # 使用元数据缓存中记录的图片列表，不再遍历一次目录
+        return collect_embedded_metadata(folder, self._metadata_cache.images(folder))
+
+    def stop_background_jobs(self):
+        self._folder_watcher.clear()
+        self._metadata_loader.stop()
+        self._embedded_loader.stop()
+        self._thumbnail_loader.stop()
+        # 全局信号的连接不会随标签页移除而断开，需要手动断开
+        signal_manager.delete_selected_animation_sequence.disconnect(self.on_delete_selected_animation_sequence)
+        signal_manager.rename_folder.disconnect(self.on_update_animation_sequence)
+        if self._owns_file_operations:
+            signal_manager.enqueue_file_operation.disconnect(self.on_enqueue_file_operation)
+            self._file_operations.stop()
+        else:
+            # 共享的队列继续执行已排队的操作，只断开本标签页的进度显示
+            self._file_operations.progress_changed.disconnect(self.on_file_operation_progress)
+            self._file_operations.operation_finished.disconnect(self.on_file_operation_finished)
+            self._file_operations.queue_changed.disconnect(self.on_file_operation_queue_changed)
+        if self._index_job is not None:
+            self._index_job.job_finished.disconnect(self.on_index_finished)
+            self._index_job.progress_changed.disconnect(self.on_index_progress)
+            self._index_job.stop()
+            self._index_job = None
+            self._update_index_button()
+
+    # ---------------------- 素材库索引 ----------------------
+    def on_index_library_clicked(self):
+        folder = self._current_path or self.ui.lineAddress.text().strip()
+        if self._metadata_index is None or not folder or not os.path.isdir(folder):
+            return
+        if self._index_job is not None:
+            QMessageBox.information(self, "正在建立索引", "已有索引任务在后台运行，请稍后再试。", QMessageBox.Ok)
+            return
+        self._metadata_index.add_root(folder)
+        self._start_index_job([folder])
+
+    def on_index_progress(self, root: str, visited: int, updated: int):
+        self.btnIndexLibrary.setText(f"索引中 {visited}")
+        self.btnIndexLibrary.setToolTip(f"正在索引: {root}\n已遍历 {visited} 个目录，更新 {updated} 个")
+
+    def on_index_finished(self, results: List[Dict[str, Any]], cancelled: bool):
+        self._index_job = None
+        self._update_index_button()
+        summary = "\n".join(
+            f"{r['root']}: {r['visited']} 个目录，更新 {r['updated']}，移除 {r['removed']}"
+            + (f"，失败 {r['failed']}" if r.get("failed") else "")
+            for r in results
+        )
+        self.btnIndexLibrary.setToolTip(("索引已取消\n" if cancelled else "索引已更新\n") + summary)
+
+    def _start_index_job(self, roots: List[str]) -> None:
+        if not roots or self._index_job is not None or self._metadata_index is None:
+            return
+        self._index_job = MetadataIndexJob(roots, self._metadata_index.db_path, self)
+        self._index_job.progress_changed.connect(self.on_index_progress)
+        self._index_job.job_finished.connect(self.on_index_finished)
+        # 线程真正退出后再释放对象
+        self._index_job.finished.connect(self._index_job.deleteLater)
+        self._index_job.start()
+        self._update_index_button()
+
+    def _update_index_button(self) -> None:
+        running = self._index_job is not None
+        self.btnIndexLibrary.setEnabled(self._metadata_index is not None and not running)
+        if not running:
+            self.btnIndexLibrary.setText("建立索引")
+
+    def _mark_index_stale(self, folder: str) -> None:
+        with self._stale_index_lock:
+            self._stale_index_folders.add(self._normalize_path(folder))
+
+    def _take_index_stale(self, folder: str) -> bool:
+        # 后台爬取进行中时保留标记，避免与爬取任务争用写锁
+        if self._index_job is not None:
+            return False
+        with self._stale_index_lock:
+            key = self._normalize_path(folder)
+            if key not in self._stale_index_folders:
+                return False
+            self._stale_index_folders.discard(key)
+            return True
+
+    def _refresh_index_entry(self, folder: str) -> None:
+        # 在元数据加载线程中执行；只更新这一个目录，不重新爬取整个根目录
+        if self._metadata_index is None:
             return
-        if row < 0 or row >= len(self._table_row_meta):
+        try:
+            if refresh_folder(self._metadata_index, folder):
+                logging.debug("[TabExplorer] 已更新索引记录: %s", folder)
+        except sqlite3.Error:
+            logging.exception("更新目录索引记录失败: %s", folder)
+
+    # ---------------------- 提示词搜索 ----------------------
+    def _setup_prompt_search(self) -> None:
+        layout = QVBoxLayout(self.ui.otherWidget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(2)
+        self.linePromptSearch = QLineEdit(self.ui.otherWidget)
+        self.linePromptSearch.setPlaceholderText("搜索素材库提示词（空格分隔多个关键词，需先建立索引）")
+        self.linePromptSearch.setClearButtonEnabled(True)
+        self.linePromptSearch.setEnabled(self._metadata_index is not None)
+        self.listPromptResults = QListWidget(self.ui.otherWidget)
+        self.listPromptResults.setMaximumHeight(160)
+        self.listPromptResults.hide()
+        self.comboMediaSort = QComboBox(self.ui.otherWidget)
+        for text, _key, _descending in MEDIA_SORT_OPTIONS:
+            self.comboMediaSort.addItem(text)
+        self.comboMediaSort.setToolTip("视频与参考图列表的排序方式")
+        self.comboMediaSort.currentIndexChanged.connect(self.on_media_sort_changed)
+        search_row = QHBoxLayout()
+        search_row.addWidget(self.linePromptSearch, 1)
+        search_row.addWidget(self.comboMediaSort)
+        layout.addLayout(search_row)
+        layout.addWidget(self.listPromptResults)
+        # 输入停顿后再查询，避免每个按键都访问数据库
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(200)
+        self._search_timer.timeout.connect(self.on_prompt_search)
+        self.linePromptSearch.textChanged.connect(lambda _text: self._search_timer.start())
+        self.linePromptSearch.returnPressed.connect(self.on_prompt_search)
+        self.listPromptResults.itemClicked.connect(self.on_prompt_result_activated)
+
+    def _setup_file_operation_bar(self) -> None:
+        # 顶部工具栏右侧：进度条与取消按钮，队列为空时隐藏
+        self.progressFileOperation = QProgressBar(self.ui.topControlWidget)
+        self.progressFileOperation.setRange(0, 1000)
+        self.progressFileOperation.setMinimumWidth(260)
+        self.progressFileOperation.setTextVisible(True)
+        self.btnCancelFileOperation = QPushButton("取消", self.ui.topControlWidget)
+        self.btnCancelFileOperation.setToolTip("取消正在执行与排队中的文件操作，已复制的文件保留，再次执行时跳过")
+        self.btnCancelFileOperation.clicked.connect(self._file_operations.cancel)
+        self.ui.horizontalLayout2.addWidget(self.progressFileOperation)
+        self.ui.horizontalLayout2.addWidget(self.btnCancelFileOperation)
+        self.progressFileOperation.hide()
+        self.btnCancelFileOperation.hide()
+
+    def on_enqueue_file_operation(self, operation: FileOperation):
+        self._file_operations.enqueue(operation)
+
+    def on_file_operation_queue_changed(self, pending: int):
+        running = pending > 0
+        if running and not self.progressFileOperation.isVisible():
+            self.progressFileOperation.setValue(0)
+            self.progressFileOperation.setFormat("准备中…")
+        self.progressFileOperation.setVisible(running)
+        self.btnCancelFileOperation.setVisible(running)
+
+    def on_file_operation_progress(self, title: str, path: str, done: int, total: int, rate: float, eta: float):
+        self.progressFileOperation.setValue(int(done * 1000 / total) if total else 0)
+        eta_text = f"，剩余 {eta:.0f} 秒" if eta >= 0 else ""
+        self.progressFileOperation.setFormat(
+            f"{format_bytes(done)} / {format_bytes(total)}  {format_bytes(int(rate))}/s{eta_text}"
+        )
+        self.progressFileOperation.setToolTip(f"{title}\n{path}" if path else title)
+
+    def on_file_operation_finished(self, operation: FileOperation, result: OperationResult):
+        logging.info("[TabExplorer] %s: %s", operation.title, result.summary())
+        if result.errors:
+            details = "\n".join(f"{path}: {error}" for path, error in result.errors[:10])
+            QMessageBox.warning(self, "文件操作失败", f"{operation.title}\n{result.summary()}\n\n{details}")
+        elif not result.cancelled:
+            # 列出实际写入的文件，便于确认游戏项目中哪些资源被更新
+            changed = "\n".join(os.path.basename(path) for path in result.changed[:20])
+            if len(result.changed) > 20:
+                changed += f"\n…等 {len(result.changed)} 个文件"
+            message = f"{operation.title}\n{result.summary()}"
+            QMessageBox.information(self, "操作完成", f"{message}\n\n{changed}" if changed else message)
+
+    def _setup_thumbnail_grid(self) -> None:
+        # 元数据表格与缩略图网格放在同一位置的两个标签页中
+        layout = self.ui.verticalLayout_3
+        position = layout.indexOf(self.ui.tableMeta)
+        layout.removeWidget(self.ui.tableMeta)
+        self.tabMetaViews = QTabWidget(self.ui.metaDataPanel)
+        self.tabMetaViews.addTab(self.ui.tableMeta, "元数据")
+        self.gridThumbnails = ThumbnailGridView(self._thumbnail_loader, self.tabMetaViews)
+        self.gridThumbnails.image_activated.connect(self.on_grid_item_activated)
+        self.tabMetaViews.addTab(self.gridThumbnails, "缩略图")
+        self.tabMetaViews.currentChanged.connect(self.on_meta_view_changed)
+        layout.insertWidget(position, self.tabMetaViews)
+
+    def _thumbnail_grid_visible(self) -> bool:
+        return self.tabMetaViews.currentWidget() is self.gridThumbnails
+
+    def on_meta_view_changed(self, _index: int):
+        folder = self._shown_folder
+        if self._thumbnail_grid_visible() and folder and self._grid_folder != folder:
+            self._thumbnail_loader.list_folder(folder)
+
+    def on_thumbnails_listed(self, folder: str, items: List[ThumbnailItem]):
+        if self._normalize_path(folder) != self._normalize_path(self._shown_folder):
             return
+        # 同一目录的刷新（文件监视触发）保留滚动位置
+        self.gridThumbnails.set_items(items, keep_position=self._grid_folder == folder)
+        self._grid_folder = folder
 
-        entry = self._table_row_meta[row]
+    def on_grid_item_activated(self, path: str):
+        # 视频在详情面板中显示元数据，图片用系统默认程序打开
+        self.on_metadata_operation_clicked("视频元数据" if is_video(path) else "打开文件", path)
+
+    def on_video_probed(self, item: ThumbnailItem, info: VideoInfo):
+        widget = self._video_detail_widget
+        if widget is None or self._normalize_path(widget.current_video()) != self._normalize_path(item[0]):
+            return
+        poster = None
+        if info.poster:
+            key = self._thumbnail_loader.key_for(item)
+            poster = self._thumbnail_loader.memory_cache.get(key)
+            if poster is None:
+                image = self._thumbnail_loader.disk_cache.get(key)
+                poster = QPixmap.fromImage(image) if image is not None else None
+        widget.set_video_info(info, poster)
+
+    def _request_video_info(self, video_path: str):
+        try:
+            st = os.stat(video_path)
+        except OSError:
+            return
+        item: ThumbnailItem = (video_path, st.st_size, st.st_mtime_ns)
+        info = self._video_probe.info(item)
+        if info is not None:
+            self.on_video_probed(item, info)
+        else:
+            self._video_probe.request(item)
+
+    def on_media_sort_changed(self, index: int):
+        _text, key, descending = MEDIA_SORT_OPTIONS[index]
+        self.meta_model.sort_media(key, descending)
+
+    def on_prompt_search(self):
+        self._search_timer.stop()
+        query = self.linePromptSearch.text().strip()
+        self.listPromptResults.clear()
+        if not query or self._metadata_index is None:
+            self.listPromptResults.hide()
+            return
+        try:
+            hits = self._metadata_index.search_prompts(query)
+        except sqlite3.Error:
+            logging.exception("搜索提示词失败: %s", query)
+            hits = []
+        for hit in hits:
+            self._add_prompt_result(hit)
+        if not hits:
+            item = QListWidgetItem("没有匹配的提示词")
+            item.setFlags(Qt.ItemFlag.NoItemFlags)
+            self.listPromptResults.addItem(item)
+        self.listPromptResults.show()
+
+    def _add_prompt_result(self, hit: PromptHit) -> None:
+        item = QListWidgetItem(f"{os.path.basename(hit.folder)}  [{hit.source}]  {hit.snippet}")
+        item.setToolTip(hit.folder)
+        item.setData(Qt.ItemDataRole.UserRole, hit.folder)
+        self.listPromptResults.addItem(item)
+
+    def on_prompt_result_activated(self, item: QListWidgetItem):
+        folder = item.data(Qt.ItemDataRole.UserRole)
+        if not folder:
+            return
+        if os.path.isdir(folder):
+            self.navigate_to_path(folder)
+        else:
+            # 目录暂不可访问时仍可查看索引中的记录
+            self.ui.lineAddress.setText(folder)
+            self.show_directory_metadata(folder)
+
+    def _open_metadata_index(self) -> Optional[MetadataIndex]:
+        try:
+            return MetadataIndex()
+        except (sqlite3.Error, OSError):
+            logging.exception("打开元数据索引失败，索引功能不可用")
+            return None
+
+    def _indexed_metadata(self, folder: str) -> Optional[Dict[str, MetaStruct]]:
+        if self._metadata_index is None:
+            return None
+        try:
+            data = self._metadata_index.get(folder)
+        except sqlite3.Error:
+            logging.exception("读取元数据索引失败: %s", folder)
+            return None
+        return metadata_to_structs(data) if data is not None else None
+
+    def closeEvent(self, event):
+        self.stop_background_jobs()
+        super().closeEvent(event)
+
+    def on_table_cell_activated(self, row: int, column: int) -> None:
+        if column != 1:
+            return
+        entry = self.meta_model.entry(row)
         if not entry or not entry.op_type:
             return
 
@@ -476,10 +887,6 @@ class TabExplorerWidget(QWidget):
         self.ui.btnRefresh.setEnabled(current_exists)
 
     # ---------------------- 工具函数 ----------------------
-    def _check_file_exists(self, path: str) -> bool:
-        return os.path.isfile(path)
-    
-    
     def _read_first_text(self, paths: List[str]) -> Optional[str]:
         # 读取第一个存在的文本文件内容
         for p in paths:
@@ -496,29 +903,6 @@ class TabExplorerWidget(QWidget):
                     pass
         return None
 
-    def _read_first_json(self, paths: List[str]) -> Optional[Dict[str, Any]]:
-        for p in paths:
-            try:
-                if os.path.isfile(p):
-                    with open(p, "r", encoding="utf-8") as f:
-                        return json.load(f)
-            except Exception:
-                continue
-        return None
-
-    def _list_files(self, folder: str, exts: set[str]) -> List[str]:
-        out: List[str]=[]
-        try:
-            for name in os.listdir(folder):
-                p=os.path.join(folder, name)
-                if os.path.isfile(p):
-                    _, ext=os.path.splitext(name)
-                    if ext.lower() in exts:
-                        out.append(p)
-        except Exception:
-            pass
-        return out
-
     # ---------------------- 状态持久化 ----------------------
     def _init_config_path(self) -> str:
         config_dir=os.path.join(os.path.expanduser("~"), ".muselog")
@@ -655,8 +1039,9 @@ class TabExplorerWidget(QWidget):
                 self._video_detail_widget.notify_close.connect(self._clear_detail_widget)
             self._video_detail_widget.set_video(video_path)
             self._show_detail_widget(self._video_detail_widget)
+            self._request_video_info(self._video_detail_widget.current_video() or video_path)
             return
-        if op_type == "打开文本文件":
+        if op_type in ("打开文本文件", "打开文件"):
             file_path=str(op_data)
             logging.info(f"打开文本文件: {file_path}")
             try:
@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from PySide6.QtCore import QSize, Qt
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+
+# 缩略图最长边（像素）
+THUMBNAIL_EDGE = 128
+# 内存缓存上限：按像素数据字节数计算，128px 的缩略图约 64 KB，可容纳约 4000 张
+THUMBNAIL_MEMORY_BUDGET = 256 * 1024 * 1024
+# 磁盘缓存目录与容量上限
+THUMBNAIL_DIR_NAME = "thumbnails"
+THUMBNAIL_DISK_BUDGET = 1024 * 1024 * 1024
+# 磁盘缓存的 JPEG 质量（有透明通道的图片存为 PNG）
+THUMBNAIL_JPEG_QUALITY = 85
+
+
+def default_thumbnail_dir() -> str:
+    # 与元数据索引同在 ~/.muselog 下
+    return os.path.join(os.path.expanduser("~"), ".muselog", THUMBNAIL_DIR_NAME)
+
+
+def thumbnail_key(path: str, size: int, mtime_ns: int, edge: int = THUMBNAIL_EDGE) -> str:
+    """缩略图的缓存键：源文件路径、大小、mtime 与缩略图尺寸，源文件被修改后自然失效。"""
+    raw = f"{os.path.normcase(os.path.abspath(path))}|{size}|{mtime_ns}|{edge}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def decode_thumbnail(path: str, edge: int = THUMBNAIL_EDGE) -> Optional[QImage]:
+    """
+    以缩小的尺寸解码图片（可在工作线程中调用）：
+    QImageReader 先只读取文件头得到原始尺寸，再按目标尺寸解码，JPEG 等格式可直接在解码阶段缩小。
+    """
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and (size.width() > edge or size.height() > edge):
+        reader.setScaledSize(size.scaled(QSize(edge, edge), Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        logging.debug("无法解码缩略图: %s (%s)", path, reader.errorString())
+        return None
+    if image.width() > edge or image.height() > edge:
+        # 不支持按尺寸读取的格式（或读取器忽略了 scaledSize）
+        image = image.scaled(edge, edge, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+    return image
+
+
+class ThumbnailMemoryCache:
+    """
+    缩略图的内存缓存：按像素数据字节数计的 LRU。
+    QPixmap 只能在界面线程中使用，本缓存也只应在界面线程中访问。
+    """
+
+    def __init__(self, budget: int = THUMBNAIL_MEMORY_BUDGET):
+        self.budget: int = budget
+        self._entries: "OrderedDict[str, QPixmap]" = OrderedDict()
+        self._bytes: int = 0
+
+    def get(self, key: str) -> Optional[QPixmap]:
+        pixmap = self._entries.get(key)
+        if pixmap is not None:
+            self._entries.move_to_end(key)
+        return pixmap
+
+    def put(self, key: str, pixmap: QPixmap) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= _pixmap_cost(old)
+        self._entries[key] = pixmap
+        self._bytes += _pixmap_cost(pixmap)
+        while self._entries and self._bytes > self.budget:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= _pixmap_cost(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Tuple[int, int]:
+        """(条目数, 字节数)"""
+        return len(self._entries), self._bytes
+
+
+def _pixmap_cost(pixmap: QPixmap) -> int:
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class ThumbnailDiskCache:
+    """
+    缩略图的磁盘缓存（~/.muselog/thumbnails），按缓存键分两级目录存放，可在多个线程中使用：
+    - 写入先写临时文件再替换，读取端不会读到半个文件
+    - prune 按最近访问时间删除最旧的文件，使总大小不超过上限
+    """
+
+    def __init__(self, root: Optional[str] = None, budget: int = THUMBNAIL_DISK_BUDGET):
+        self.root: str = root or default_thumbnail_dir()
+        self.budget: int = budget
+        self._prune_lock = threading.Lock()
+
+    def path_for(self, key: str, alpha: bool = False) -> str:
+        return os.path.join(self.root, key[:2], key + (".png" if alpha else ".jpg"))
+
+    def get(self, key: str) -> Optional[QImage]:
+        for alpha in (False, True):
+            path = self.path_for(key, alpha)
+            if os.path.isfile(path):
+                image = QImage(path)
+                if not image.isNull():
+                    return image
+        return None
+
+    def put(self, key: str, image: QImage) -> None:
+        alpha = image.hasAlphaChannel()
+        path = self.path_for(key, alpha)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if image.save(tmp, "PNG" if alpha else "JPG", -1 if alpha else THUMBNAIL_JPEG_QUALITY):
+                os.replace(tmp, path)
+            else:
+                logging.debug("写入缩略图缓存失败: %s", path)
+        except OSError:
+            logging.debug("写入缩略图缓存失败: %s", path, exc_info=True)
+        finally:
+            if os.path.exists(tmp):
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def prune(self) -> int:
+        """删除最久未访问的缩略图直到总大小不超过上限，返回删除的文件数。"""
+        with self._prune_lock:
+            files: List[Tuple[float, int, str]] = []
+            total = 0
+            try:
+                buckets = list(os.scandir(self.root))
+            except OSError:
+                return 0
+            for bucket in buckets:
+                if not bucket.is_dir():
+                    continue
+                try:
+                    with os.scandir(bucket.path) as it:
+                        for entry in it:
+                            try:
+                                st = entry.stat()
+                            except OSError:
+                                continue
+                            files.append((max(st.st_atime, st.st_mtime), st.st_size, entry.path))
+                            total += st.st_size
+                except OSError:
+                    continue
+            removed = 0
+            files.sort()
+            for _, size, path in files:
+                if total <= self.budget:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            if removed:
+                logging.info("清理缩略图缓存: 删除 %d 个文件", removed)
+            return removed
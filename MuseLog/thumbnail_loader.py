@@ -0,0 +1,229 @@
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage, QPixmap
+
+from MuseLog.explorer_metadata import scan_folder
+from MuseLog.thumbnail_cache import (
+    THUMBNAIL_EDGE,
+    ThumbnailDiskCache,
+    ThumbnailMemoryCache,
+    decode_thumbnail,
+    thumbnail_key,
+)
+from MuseLog.video_probe import VideoInfo
+from MuseLog.video_probe_service import VideoProbeService, is_video
+
+# 解码以 CPU 为主，留一半核心给界面与其他后台任务
+THUMBNAIL_MAX_THREADS = max(2, (os.cpu_count() or 4) // 2)
+# 排队中的请求如果之后又有这么多新请求（说明早已滚出可见区域），执行前直接放弃，再次绘制时会重新请求
+THUMBNAIL_STALE_REQUESTS = 256
+
+# (路径, 大小, mtime_ns)
+ThumbnailItem = Tuple[str, int, int]
+
+
+class _LoaderSignals(QObject):
+    # 请求代号、缓存键、缩略图（解码失败时为空图）
+    decoded = Signal(int, str, QImage)
+    # 请求代号、目录、图片列表
+    listed = Signal(int, str, list)
+
+
+class _ThumbnailTask(QRunnable):
+    def __init__(self, loader: "ThumbnailLoader", generation: int, serial: int, key: str, path: str):
+        super().__init__()
+        self._loader = loader
+        self._generation = generation
+        self._serial = serial
+        self._key = key
+        self._path = path
+
+    def run(self) -> None:
+        if not self._loader.is_wanted(self._generation, self._serial, self._key):
+            return
+        image = self._loader.disk_cache.get(self._key)
+        if image is None:
+            image = decode_thumbnail(self._path, self._loader.edge)
+            if image is not None:
+                self._loader.disk_cache.put(self._key, image)
+        self._loader.signals.decoded.emit(self._generation, self._key, image if image is not None else QImage())
+
+
+class _ListTask(QRunnable):
+    def __init__(self, loader: "ThumbnailLoader", generation: int, folder: str):
+        super().__init__()
+        self._loader = loader
+        self._generation = generation
+        self._folder = folder
+
+    def run(self) -> None:
+        if not self._loader.is_current(self._generation):
+            return
+        items = list_images(self._folder, videos=self._loader.video_probe is not None)
+        self._loader.signals.listed.emit(self._generation, self._folder, items)
+
+
+class _PruneTask(QRunnable):
+    def __init__(self, disk_cache: ThumbnailDiskCache):
+        super().__init__()
+        self._disk_cache = disk_cache
+
+    def run(self) -> None:
+        self._disk_cache.prune()
+
+
+def list_images(folder: str, videos: bool = False) -> List[ThumbnailItem]:
+    """目录中的图片（videos 为 True 时包括视频，按文件名排序）及其大小与 mtime，大小与 mtime 取自 DirEntry。"""
+    listing = scan_folder(folder)
+    items: List[ThumbnailItem] = []
+    for path in sorted(listing.images + listing.videos if videos else listing.images, key=str.lower):
+        try:
+            st = listing.entries[path].stat()
+        except OSError:
+            continue
+        items.append((path, st.st_size, st.st_mtime_ns))
+    return items
+
+
+class ThumbnailLoader(QObject):
+    """
+    两级缩略图缓存的加载器：
+    - 内存：ThumbnailMemoryCache（界面线程），命中时绘制不涉及任何 IO
+    - 磁盘：ThumbnailDiskCache（~/.muselog/thumbnails），按路径、大小与 mtime 作为键
+    两级都未命中时在线程池中按缩小的尺寸解码，结果写入磁盘缓存后通过 thumbnail_ready 通知界面。
+    后发出的请求优先执行（通常是当前可见区域），切换目录时作废尚未执行的请求。
+    提供 video_probe 时视频同样列出，封面帧由 VideoProbeService 写入磁盘缓存后按缩略图读取。
+    """
+
+    # 缓存键
+    thumbnail_ready = Signal(str)
+    # 目录、图片列表 [(路径, 大小, mtime_ns)]
+    folder_listed = Signal(str, list)
+
+    def __init__(
+        self,
+        parent: Optional[QObject] = None,
+        disk_cache: Optional[ThumbnailDiskCache] = None,
+        memory_cache: Optional[ThumbnailMemoryCache] = None,
+        edge: int = THUMBNAIL_EDGE,
+        video_probe: Optional[VideoProbeService] = None,
+    ):
+        super().__init__(parent)
+        self.edge: int = edge
+        self.video_probe: Optional[VideoProbeService] = video_probe
+        if video_probe is not None:
+            video_probe.video_probed.connect(self._on_video_probed)
+        self.disk_cache: ThumbnailDiskCache = disk_cache or ThumbnailDiskCache()
+        self.memory_cache: ThumbnailMemoryCache = memory_cache or ThumbnailMemoryCache()
+        self.signals = _LoaderSignals(self)
+        self.signals.decoded.connect(self._on_decoded)
+        self.signals.listed.connect(self._on_listed)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(THUMBNAIL_MAX_THREADS)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._serial = 0
+        # 排队或执行中的缓存键 -> 最近一次请求的序号
+        self._pending: Dict[str, int] = {}
+        # 解码失败的缓存键，不再重复请求
+        self._failed: set = set()
+        self._pool.start(_PruneTask(self.disk_cache), -1)
+
+    def key_for(self, item: ThumbnailItem) -> str:
+        return thumbnail_key(item[0], item[1], item[2], self.edge)
+
+    def pixmap(self, item: ThumbnailItem, key: Optional[str] = None) -> Optional[QPixmap]:
+        """内存缓存命中时直接返回，否则发出异步请求并返回 None。key 为 key_for(item) 的预先计算结果。"""
+        key = key or self.key_for(item)
+        pixmap = self.memory_cache.get(key)
+        if pixmap is None and key not in self._failed:
+            if self.video_probe is not None and is_video(item[0]):
+                # 视频的封面帧由探测服务生成，探测完成后再按缩略图读取
+                info = self.video_probe.info(item)
+                if info is None:
+                    self.video_probe.request(item)
+                elif info.poster:
+                    self._request(key, item[0])
+                else:
+                    self._failed.add(key)
+            else:
+                self._request(key, item[0])
+        return pixmap
+
+    def video_info(self, item: ThumbnailItem) -> Optional[VideoInfo]:
+        return self.video_probe.info(item) if self.video_probe is not None else None
+
+    def list_folder(self, folder: str) -> None:
+        """异步列出目录中的图片，结果通过 folder_listed 发出。"""
+        with self._lock:
+            generation = self._generation
+        self._pool.start(_ListTask(self, generation, folder), 1 << 30)
+
+    def cancel(self) -> None:
+        """作废尚未执行的请求（切换目录时调用）。"""
+        with self._lock:
+            self._generation += 1
+            self._pending.clear()
+        self._pool.clear()
+        if self.video_probe is not None:
+            self.video_probe.cancel()
+
+    def stop(self) -> None:
+        self.cancel()
+        self._pool.waitForDone()
+        if self.video_probe is not None:
+            self.video_probe.stop()
+
+    def is_current(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+    def is_wanted(self, generation: int, serial: int, key: str) -> bool:
+        with self._lock:
+            if generation != self._generation:
+                return False
+            if self._serial - serial > THUMBNAIL_STALE_REQUESTS:
+                self._pending.pop(key, None)
+                return False
+            return True
+
+    def _request(self, key: str, path: str) -> None:
+        with self._lock:
+            if key in self._pending:
+                return
+            self._serial += 1
+            serial = self._serial
+            self._pending[key] = serial
+            generation = self._generation
+        # 序号越大优先级越高：最后绘制的（当前可见的）缩略图先解码
+        self._pool.start(_ThumbnailTask(self, generation, serial, key, path), serial % (1 << 30))
+
+    def _on_decoded(self, generation: int, key: str, image: QImage) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+        if image.isNull():
+            self._failed.add(key)
+            return
+        # 切换目录后才返回的结果同样有效，放入缓存以便回到该目录时直接显示
+        self.memory_cache.put(key, QPixmap.fromImage(image))
+        if self.is_current(generation):
+            self.thumbnail_ready.emit(key)
+
+    def _on_video_probed(self, item: ThumbnailItem, info: VideoInfo) -> None:
+        key = self.key_for(item)
+        if info.poster:
+            self._request(key, item[0])
+        else:
+            self._failed.add(key)
+        # 没有封面时也需要重绘以显示时长
+        self.thumbnail_ready.emit(key)
+
+    def _on_listed(self, generation: int, folder: str, items: List[ThumbnailItem]) -> None:
+        if not self.is_current(generation):
+            logging.debug("丢弃过期的图片列表: %s", folder)
+            return
+        self.folder_listed.emit(folder, items)
@@ -16,9 +16,9 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QAbstractItemView, QApplication, QGroupBox, QHBoxLayout,
-    QLabel, QLineEdit, QListWidget, QListWidgetItem,
-    QPushButton, QRadioButton, QSizePolicy, QSpacerItem,
-    QSpinBox, QVBoxLayout, QWidget)
+    QLabel, QLineEdit, QListView, QPushButton,
+    QRadioButton, QSizePolicy, QSpacerItem, QSpinBox,
+    QVBoxLayout, QWidget)
 
 class Ui_TabBatchResize(object):
     def setupUi(self, TabBatchResize):
@@ -67,10 +67,11 @@ class Ui_TabBatchResize(object):
 
         self.verticalLayout.addLayout(self.horizontalLayoutOutput)
 
-        self.listImages = QListWidget(TabBatchResize)
+        self.listImages = QListView(TabBatchResize)
         self.listImages.setObjectName(u"listImages")
         self.listImages.setMinimumSize(QSize(0, 214))
-        self.listImages.setSelectionMode(QAbstractItemView.NoSelection)
+        self.listImages.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.listImages.setUniformItemSizes(True)
 
         self.verticalLayout.addWidget(self.listImages)
 
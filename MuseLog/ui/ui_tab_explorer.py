@@ -15,9 +15,9 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QFont, QFontDatabase, QGradient, QIcon,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
-from PySide6.QtWidgets import (QApplication, QHBoxLayout, QHeaderView, QLineEdit,
-    QPushButton, QSizePolicy, QSpacerItem, QSplitter,
-    QTableWidget, QTableWidgetItem, QTreeView, QVBoxLayout,
+from PySide6.QtWidgets import (QAbstractItemView, QApplication, QHBoxLayout, QHeaderView,
+    QLineEdit, QPushButton, QSizePolicy, QSpacerItem,
+    QSplitter, QTableView, QTreeView, QVBoxLayout,
     QWidget)
 
 class Ui_TabExplorer(object):
@@ -143,16 +143,10 @@ class Ui_TabExplorer(object):
 
         self.verticalLayout_3.addWidget(self.otherWidget)
 
-        self.tableMeta = QTableWidget(self.metaDataPanel)
-        if (self.tableMeta.columnCount() < 3):
-            self.tableMeta.setColumnCount(3)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.tableMeta.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.tableMeta.setHorizontalHeaderItem(1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.tableMeta.setHorizontalHeaderItem(2, __qtablewidgetitem2)
+        self.tableMeta = QTableView(self.metaDataPanel)
         self.tableMeta.setObjectName(u"tableMeta")
+        self.tableMeta.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableMeta.verticalHeader().setVisible(False)
 
         self.verticalLayout_3.addWidget(self.tableMeta)
 
@@ -188,11 +182,5 @@ class Ui_TabExplorer(object):
         self.btnSequenceFrames.setText(QCoreApplication.translate("TabExplorer", u"\u5e8f\u5217\u5e27", None))
         self.btnSpine.setText(QCoreApplication.translate("TabExplorer", u"spine", None))
         self.btnSizeModify.setText(QCoreApplication.translate("TabExplorer", u"\u5c3a\u5bf8\u4fee\u6539", None))
-        ___qtablewidgetitem = self.tableMeta.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("TabExplorer", u"\u952e", None));
-        ___qtablewidgetitem1 = self.tableMeta.horizontalHeaderItem(1)
-        ___qtablewidgetitem1.setText(QCoreApplication.translate("TabExplorer", u"\u503c", None));
-        ___qtablewidgetitem2 = self.tableMeta.horizontalHeaderItem(2)
-        ___qtablewidgetitem2.setText(QCoreApplication.translate("TabExplorer", u"\u64cd\u4f5c", None));
     # retranslateUi
 
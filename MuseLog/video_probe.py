@@ -0,0 +1,284 @@
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from fractions import Fraction
+from typing import Any, Dict, Optional, Tuple
+
+from PySide6.QtGui import QImage
+
+from MuseLog.thumbnail_cache import THUMBNAIL_EDGE
+
+VIDEO_PROBE_FILE_NAME = "video_probe.sqlite3"
+VIDEO_PROBE_SCHEMA_VERSION = 1
+# 封面帧取视频时长的这个比例处（片头常为黑场），但不晚于 POSTER_MAX_SECONDS
+POSTER_POSITION_RATIO = 0.1
+POSTER_MAX_SECONDS = 3.0
+# 外部命令的超时（秒），损坏或位于离线网络盘上的文件不会让探测线程一直挂起
+PROBE_TIMEOUT = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    info TEXT NOT NULL,
+    probed_at REAL NOT NULL
+);
+"""
+
+
+class VideoInfo:
+    """视频的技术元数据。poster 表示封面帧是否已写入缩略图磁盘缓存（键与缩略图相同）。"""
+
+    def __init__(
+        self,
+        duration: float = 0.0,
+        width: int = 0,
+        height: int = 0,
+        fps: float = 0.0,
+        codec: str = "",
+        backend: str = "",
+        poster: bool = False,
+        error: str = "",
+    ):
+        self.duration: float = duration
+        self.width: int = width
+        self.height: int = height
+        self.fps: float = fps
+        self.codec: str = codec
+        self.backend: str = backend
+        self.poster: bool = poster
+        self.error: str = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VideoInfo":
+        info = cls()
+        for key, value in data.items():
+            if hasattr(info, key):
+                setattr(info, key, value)
+        return info
+
+    def summary(self) -> str:
+        """例如 "00:12.5 · 1920×1080 · 24 fps · h264"，探测失败时为错误信息。"""
+        if self.error:
+            return f"无法读取视频信息：{self.error}"
+        parts = [format_duration(self.duration)]
+        if self.width and self.height:
+            parts.append(f"{self.width}×{self.height}")
+        if self.fps:
+            parts.append(f"{self.fps:.3g} fps")
+        if self.codec:
+            parts.append(self.codec)
+        return " · ".join(parts)
+
+
+def format_duration(seconds: float) -> str:
+    seconds = max(0.0, seconds)
+    minutes, secs = divmod(seconds, 60)
+    hours, minutes = divmod(int(minutes), 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{int(secs):02d}"
+    return f"{minutes:02d}:{secs:04.1f}"
+
+
+def default_probe_cache_path() -> str:
+    # 与元数据索引同在 ~/.muselog 下
+    return os.path.join(os.path.expanduser("~"), ".muselog", VIDEO_PROBE_FILE_NAME)
+
+
+class VideoProbeCache:
+    """
+    视频探测结果的持久化缓存（SQLite，位于 ~/.muselog），按路径存放，大小与 mtime 不一致时视为未命中。
+    连接可在多个线程间共享（内部加锁）。
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path: str = db_path or default_probe_cache_path()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, VIDEO_PROBE_SCHEMA_VERSION):
+                # 缓存可随时重建，结构变化时直接丢弃旧表
+                self._conn.execute("DROP TABLE IF EXISTS videos")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {VIDEO_PROBE_SCHEMA_VERSION}")
+            self._conn.commit()
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[VideoInfo]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, info FROM videos WHERE path = ?", (_cache_key(path),)
+            ).fetchone()
+        if row is None or row[0] != size or row[1] != mtime_ns:
+            return None
+        info = VideoInfo.from_dict(json.loads(row[2]))
+        # 旧版本曾写入失败的结果，视为未命中以便重新探测
+        return None if info.error else info
+
+    def put(self, path: str, size: int, mtime_ns: int, info: VideoInfo) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO videos (path, size, mtime_ns, info, probed_at) VALUES (?, ?, ?, ?, ?)",
+                (_cache_key(path), size, mtime_ns, json.dumps(info.to_dict(), ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _cache_key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+# ---------------------- 探测后端（可在工作线程中调用） ----------------------
+def _pyav_available() -> bool:
+    try:
+        import av  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def worker_backend() -> str:
+    """
+    可在工作线程中使用的探测后端："pyav"、"ffprobe" 或 ""（都不可用时，由界面线程使用 QtMultimedia）。
+    PyAV 在进程内解码，省去启动外部进程；ffprobe / ffmpeg 需在 PATH 中。
+    """
+    if _pyav_available():
+        return "pyav"
+    if shutil.which("ffprobe"):
+        return "ffprobe"
+    return ""
+
+
+def probe_video(path: str, backend: str, edge: int = THUMBNAIL_EDGE) -> Tuple[VideoInfo, Optional[QImage]]:
+    """用指定后端读取视频信息与缩小后的封面帧，失败时 VideoInfo.error 记录原因。"""
+    try:
+        if backend == "pyav":
+            return _probe_pyav(path, edge)
+        if backend == "ffprobe":
+            return _probe_ffprobe(path, edge)
+    except Exception as e:  # 各后端对损坏文件抛出的异常类型不一
+        logging.debug("探测视频失败: %s (%s)", path, e)
+        return VideoInfo(backend=backend, error=str(e) or type(e).__name__), None
+    raise ValueError(f"未知的视频探测后端: {backend}")
+
+
+def poster_position(duration: float) -> float:
+    return min(duration * POSTER_POSITION_RATIO, POSTER_MAX_SECONDS)
+
+
+def scaled_size(width: int, height: int, edge: int) -> Tuple[int, int]:
+    if width <= 0 or height <= 0:
+        return edge, edge
+    scale = min(1.0, edge / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _probe_pyav(path: str, edge: int) -> Tuple[VideoInfo, Optional[QImage]]:
+    import av
+
+    with av.open(path) as container:
+        stream = next((s for s in container.streams if s.type == "video"), None)
+        if stream is None:
+            return VideoInfo(backend="pyav", error="没有视频流"), None
+        if stream.duration is not None and stream.time_base is not None:
+            duration = float(stream.duration * stream.time_base)
+        else:
+            duration = (container.duration or 0) / av.time_base
+        rate = stream.average_rate or stream.guessed_rate
+        info = VideoInfo(
+            duration=duration,
+            width=stream.codec_context.width,
+            height=stream.codec_context.height,
+            fps=float(rate) if rate else 0.0,
+            codec=stream.codec_context.name,
+            backend="pyav",
+        )
+        # 跳到封面位置之前的关键帧，只解码一帧
+        stream.thread_type = "AUTO"
+        position = poster_position(duration)
+        if position > 0 and stream.time_base is not None:
+            container.seek(int(position / stream.time_base), stream=stream, any_frame=False, backward=True)
+        width, height = scaled_size(info.width, info.height, edge)
+        for frame in container.decode(stream):
+            rgb = frame.reformat(width=width, height=height, format="rgb24")
+            plane = rgb.planes[0]
+            image = QImage(bytes(plane), width, height, plane.line_size, QImage.Format.Format_RGB888).copy()
+            return info, image
+    return info, None
+
+
+def _probe_ffprobe(path: str, edge: int) -> Tuple[VideoInfo, Optional[QImage]]:
+    command = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=codec_name,width,height,avg_frame_rate,duration:format=duration",
+        "-of", "json", path,
+    ]
+    result = subprocess.run(command, capture_output=True, timeout=PROBE_TIMEOUT, **_no_window())
+    if result.returncode != 0:
+        return VideoInfo(backend="ffprobe", error=result.stderr.decode("utf-8", "replace").strip()[:200]), None
+    data = json.loads(result.stdout or b"{}")
+    streams = data.get("streams") or []
+    if not streams:
+        return VideoInfo(backend="ffprobe", error="没有视频流"), None
+    stream = streams[0]
+    duration = _float(stream.get("duration")) or _float((data.get("format") or {}).get("duration"))
+    rate = stream.get("avg_frame_rate") or "0/1"
+    try:
+        fps = float(Fraction(rate)) if not rate.endswith("/0") else 0.0
+    except (ValueError, ZeroDivisionError):
+        fps = 0.0
+    info = VideoInfo(
+        duration=duration,
+        width=int(stream.get("width") or 0),
+        height=int(stream.get("height") or 0),
+        fps=fps,
+        codec=stream.get("codec_name") or "",
+        backend="ffprobe",
+    )
+    return info, _ffmpeg_poster(path, info, edge)
+
+
+def _ffmpeg_poster(path: str, info: VideoInfo, edge: int) -> Optional[QImage]:
+    if not shutil.which("ffmpeg"):
+        return None
+    width, height = scaled_size(info.width, info.height, edge)
+    # -ss 放在 -i 之前按关键帧快速定位，只输出一帧 JPEG 到标准输出
+    command = [
+        "ffmpeg", "-v", "error", "-ss", f"{poster_position(info.duration):.3f}", "-i", path,
+        "-frames:v", "1", "-vf", f"scale={width}:{height}", "-f", "image2pipe", "-vcodec", "mjpeg", "-",
+    ]
+    result = subprocess.run(command, capture_output=True, timeout=PROBE_TIMEOUT, **_no_window())
+    if result.returncode != 0 or not result.stdout:
+        return None
+    image = QImage.fromData(result.stdout, "JPG")
+    return None if image.isNull() else image
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _no_window() -> Dict[str, Any]:
+    # Windows 上启动控制台程序时不弹出黑色窗口
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NO_WINDOW}
+    return {}
@@ -0,0 +1,256 @@
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, QTimer, QUrl, Signal
+from PySide6.QtGui import QImage
+
+from MuseLog.explorer_metadata import VIDEO_EXTENSIONS
+from MuseLog.thumbnail_cache import THUMBNAIL_EDGE, ThumbnailDiskCache, thumbnail_key
+from MuseLog.video_probe import VideoInfo, VideoProbeCache, poster_position, probe_video, worker_backend
+
+try:
+    from PySide6.QtMultimedia import QMediaMetaData, QMediaPlayer, QVideoSink
+except ImportError:  # 缺少多媒体模块或其系统依赖（例如 Linux 上的 libpulse）
+    QMediaPlayer = None
+
+# 外部进程 / 解码器以 IO 与子进程为主，两个线程即可，避免同时启动大量 ffprobe
+VIDEO_PROBE_MAX_THREADS = 2
+# QtMultimedia 后端单个视频的超时（毫秒）
+QT_PROBE_TIMEOUT_MS = 8000
+
+# (路径, 大小, mtime_ns)，与缩略图网格的条目相同
+VideoItem = Tuple[str, int, int]
+
+
+def is_video(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in VIDEO_EXTENSIONS
+
+
+class _ServiceSignals(QObject):
+    # 条目、VideoInfo
+    probed = Signal(object, object)
+    # 工作线程没有可用后端，交给界面线程的 QtMultimedia 处理
+    needs_qt = Signal(object)
+
+
+class _ProbeTask(QRunnable):
+    def __init__(self, service: "VideoProbeService", item: VideoItem):
+        super().__init__()
+        self._service = service
+        self._item = item
+
+    def run(self) -> None:
+        path, size, mtime_ns = self._item
+        service = self._service
+        info = service.cache.get(path, size, mtime_ns)
+        if info is not None:
+            service.signals.probed.emit(self._item, info)
+            return
+        if not service.backend:
+            service.signals.needs_qt.emit(self._item)
+            return
+        info, poster = probe_video(path, service.backend, service.edge)
+        service.store(self._item, info, poster)
+        service.signals.probed.emit(self._item, info)
+
+
+class VideoProbeService(QObject):
+    """
+    在后台读取视频的时长、分辨率、帧率、编码与封面帧：
+    - 成功的结果按路径、大小与 mtime 保存在 VideoProbeCache（~/.muselog），再次打开目录时不会重新探测
+    - 封面帧缩小后写入缩略图磁盘缓存，键与图片缩略图相同，缩略图网格可直接读取
+    - 工作线程中优先使用 PyAV，其次是 ffprobe / ffmpeg；都不可用时在界面线程中用 QtMultimedia 逐个探测
+    结果通过 video_probed 发出，同一文件的重复请求只探测一次。
+    """
+
+    # 条目 (路径, 大小, mtime_ns)、VideoInfo
+    video_probed = Signal(object, object)
+
+    def __init__(
+        self,
+        parent: Optional[QObject] = None,
+        cache: Optional[VideoProbeCache] = None,
+        disk_cache: Optional[ThumbnailDiskCache] = None,
+        edge: int = THUMBNAIL_EDGE,
+    ):
+        super().__init__(parent)
+        self.cache: VideoProbeCache = cache or VideoProbeCache()
+        self.disk_cache: ThumbnailDiskCache = disk_cache or ThumbnailDiskCache()
+        self.edge: int = edge
+        self.backend: str = worker_backend()
+        self.signals = _ServiceSignals(self)
+        self.signals.probed.connect(self._on_probed)
+        self.signals.needs_qt.connect(self._on_needs_qt)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(VIDEO_PROBE_MAX_THREADS)
+        self._lock = threading.Lock()
+        self._serial = 0
+        self._pending: Set[VideoItem] = set()
+        # 本次运行中已得到的结果（界面线程）
+        self._results: Dict[str, Tuple[VideoItem, VideoInfo]] = {}
+        self._qt_probe: Optional[_QtVideoProbe] = None
+        logging.info("视频探测后端: %s", self.backend or ("QtMultimedia" if QMediaPlayer is not None else "不可用"))
+
+    def info(self, item: VideoItem) -> Optional[VideoInfo]:
+        """已得到的结果；文件变化后旧结果不再返回。"""
+        cached = self._results.get(item[0])
+        if cached is None or cached[0] != item:
+            return None
+        return cached[1]
+
+    def request(self, item: VideoItem) -> None:
+        """请求探测，已有结果或正在探测时直接返回。后发出的请求优先执行。"""
+        if self.info(item) is not None:
+            return
+        with self._lock:
+            if item in self._pending:
+                return
+            self._pending.add(item)
+            self._serial += 1
+            serial = self._serial
+        self._pool.start(_ProbeTask(self, item), serial % (1 << 30))
+
+    def cancel(self) -> None:
+        """放弃尚未开始的探测（切换目录时调用），已写入缓存的结果不受影响。"""
+        self._pool.clear()
+        with self._lock:
+            self._pending.clear()
+        if self._qt_probe is not None:
+            self._qt_probe.clear()
+
+    def stop(self) -> None:
+        self.cancel()
+        self._pool.waitForDone()
+
+    def store(self, item: VideoItem, info: VideoInfo, poster: Optional[QImage]) -> None:
+        """
+        保存探测结果与封面帧（可在工作线程中调用）。失败的结果（超时、文件被占用等）不写入缓存，
+        只在本次运行中保留，下次打开目录时重新探测。
+        """
+        if info.error:
+            return
+        path, size, mtime_ns = item
+        if poster is not None and not poster.isNull():
+            self.disk_cache.put(thumbnail_key(path, size, mtime_ns, self.edge), poster)
+            info.poster = True
+        try:
+            self.cache.put(path, size, mtime_ns, info)
+        except Exception:
+            logging.exception("写入视频探测缓存失败: %s", path)
+
+    def _on_probed(self, item: VideoItem, info: VideoInfo) -> None:
+        with self._lock:
+            self._pending.discard(item)
+        self._results[item[0]] = (item, info)
+        self.video_probed.emit(item, info)
+
+    def _on_needs_qt(self, item: VideoItem) -> None:
+        if QMediaPlayer is None:
+            self._on_probed(item, VideoInfo(error="没有可用的视频解码后端（PyAV、ffprobe 或 QtMultimedia）"))
+            return
+        if self._qt_probe is None:
+            self._qt_probe = _QtVideoProbe(self, self.edge)
+            self._qt_probe.finished.connect(self._on_qt_finished)
+        self._qt_probe.enqueue(item)
+
+    def _on_qt_finished(self, item: VideoItem, info: VideoInfo, poster: QImage) -> None:
+        self.store(item, info, poster)
+        self._on_probed(item, info)
+
+
+class _QtVideoProbe(QObject):
+    """
+    用一个 QMediaPlayer 依次探测视频（只能在界面线程中使用）：
+    加载完成后读取时长与元数据，跳到封面位置播放到第一帧即停止。后加入的视频先探测。
+    """
+
+    # 条目、VideoInfo、封面帧（可能为空图）
+    finished = Signal(object, object, QImage)
+
+    def __init__(self, parent: Optional[QObject] = None, edge: int = THUMBNAIL_EDGE):
+        super().__init__(parent)
+        self._edge = edge
+        self._queue: List[VideoItem] = []
+        self._item: Optional[VideoItem] = None
+        self._info: Optional[VideoInfo] = None
+        self._seeking = False
+        self._player = QMediaPlayer(self)
+        self._sink = QVideoSink(self)
+        self._player.setVideoSink(self._sink)
+        self._player.mediaStatusChanged.connect(self._on_status_changed)
+        self._player.errorOccurred.connect(self._on_error)
+        self._sink.videoFrameChanged.connect(self._on_frame)
+        self._timeout = QTimer(self)
+        self._timeout.setSingleShot(True)
+        self._timeout.setInterval(QT_PROBE_TIMEOUT_MS)
+        self._timeout.timeout.connect(self._on_timeout)
+
+    def enqueue(self, item: VideoItem) -> None:
+        self._queue.append(item)
+        if self._item is None:
+            self._next()
+
+    def clear(self) -> None:
+        self._queue.clear()
+
+    def _next(self) -> None:
+        if not self._queue:
+            self._item = None
+            return
+        self._item = self._queue.pop()
+        self._info = None
+        self._seeking = False
+        self._timeout.start()
+        self._player.setSource(QUrl.fromLocalFile(self._item[0]))
+
+    def _on_status_changed(self, status) -> None:
+        if self._item is None:
+            return
+        if status == QMediaPlayer.MediaStatus.InvalidMedia:
+            self._finish(VideoInfo(backend="qt", error="无法解码"), QImage())
+        elif status == QMediaPlayer.MediaStatus.LoadedMedia and self._info is None:
+            meta = self._player.metaData()
+            resolution = meta.value(QMediaMetaData.Key.Resolution)
+            fps = meta.value(QMediaMetaData.Key.VideoFrameRate)
+            self._info = VideoInfo(
+                duration=self._player.duration() / 1000,
+                width=resolution.width() if isinstance(resolution, QSize) else 0,
+                height=resolution.height() if isinstance(resolution, QSize) else 0,
+                fps=float(fps) if fps else 0.0,
+                codec=meta.stringValue(QMediaMetaData.Key.VideoCodec),
+                backend="qt",
+            )
+            self._seeking = True
+            self._player.setPosition(int(poster_position(self._info.duration) * 1000))
+            self._player.play()
+
+    def _on_frame(self, frame) -> None:
+        if self._item is None or not self._seeking or not frame.isValid():
+            return
+        image = frame.toImage()
+        if image.isNull():
+            return
+        if image.width() > self._edge or image.height() > self._edge:
+            image = image.scaled(self._edge, self._edge, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+        self._finish(self._info, image.convertToFormat(QImage.Format.Format_RGB32))
+
+    def _on_error(self, _error, message: str) -> None:
+        if self._item is not None:
+            self._finish(self._info or VideoInfo(backend="qt", error=message or "无法解码"), QImage())
+
+    def _on_timeout(self) -> None:
+        if self._item is not None:
+            # 读到了元数据但没有等到画面时仍保留元数据
+            self._finish(self._info or VideoInfo(backend="qt", error="读取超时"), QImage())
+
+    def _finish(self, info: VideoInfo, poster: QImage) -> None:
+        item = self._item
+        self._timeout.stop()
+        self._seeking = False
+        self._item = None
+        self._player.stop()
+        self._player.setSource(QUrl())
+        self.finished.emit(item, info, poster)
+        self._next()
@@ -3,14 +3,18 @@ import os
 from copy import deepcopy
 from typing import Any, Dict, List, Optional
 
-from PySide6.QtWidgets import QComboBox, QMessageBox, QWidget
-from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QMessageBox, QWidget
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QPixmap
 from MuseLog.ui.ui_widget_video_detail import Ui_Form
+from MuseLog.thumbnail_cache import THUMBNAIL_EDGE
+from MuseLog.video_probe import VideoInfo
 
 
 REFERENCE_HISTORY_KEY = "__reference_history__"
 REFERENCE_HISTORY_LIMIT = 20
 REFERENCE_PLACEHOLDER = "可选：参考图路径或链接"
+VIDEO_INFO_PENDING = "读取视频信息…"
 
 
 class VideoDetailWidget(QWidget):
@@ -40,6 +44,7 @@ class VideoDetailWidget(QWidget):
         self.ui.textEdit.setPlaceholderText("填写或查看该视频的提示词内容")
 
         self._reference_combo: QComboBox = self._setup_reference_combo()
+        self._poster_label, self._info_label = self._setup_video_info()
 
         self.ui.textEdit.textChanged.connect(self._on_prompt_changed)
         self.ui.saveButton.clicked.connect(self._on_save_clicked)
@@ -82,17 +87,56 @@ class VideoDetailWidget(QWidget):
 
         return combo
 
+    def _setup_video_info(self):
+        # 标题栏下方一行：封面帧 + 时长、分辨率等技术信息（由 VideoProbeService 异步填入）
+        container = QWidget(self)
+        container.setObjectName("videoInfoWidget")
+        row = QHBoxLayout(container)
+        row.setContentsMargins(9, 0, 9, 0)
+
+        poster = QLabel(container)
+        poster.setObjectName("videoPosterLabel")
+        poster.setFixedSize(THUMBNAIL_EDGE, THUMBNAIL_EDGE * 9 // 16)
+        poster.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        poster.setStyleSheet("background: rgba(128, 128, 128, 40);")
+        row.addWidget(poster)
+
+        info = QLabel(container)
+        info.setObjectName("videoInfoLabel")
+        info.setWordWrap(True)
+        info.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        row.addWidget(info, 1)
+
+        layout = self.ui.verticalLayout
+        layout.insertWidget(layout.indexOf(self.ui.widget_2) + 1, container)
+        return poster, info
+
     # ---------------------- 对外接口 ----------------------
+    def current_video(self) -> Optional[str]:
+        return self._video_path
+
+    def set_video_info(self, info: Optional[VideoInfo], poster: Optional[QPixmap] = None) -> None:
+        """显示视频探测结果；info 为 None 时表示仍在读取。"""
+        self._info_label.setText(info.summary() if info is not None else VIDEO_INFO_PENDING)
+        if poster is not None and not poster.isNull():
+            self._poster_label.setPixmap(poster.scaled(
+                self._poster_label.size(), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+            ))
+        else:
+            self._poster_label.clear()
+
     def set_video(self, video_path: str) -> None:
         """绑定视频文件，读取并展示其关联元数据。"""
         video_path = os.path.abspath(video_path)
         self._video_path = video_path
         self._metadata_path = self._default_metadata_path(video_path)
         self._metadata_key = os.path.basename(video_path)
+        self.set_video_info(None)
 
         if not os.path.isfile(video_path):
             self._set_buttons_enabled(False)
             self._show_error(f"视频文件不存在：{video_path}")
+            self._info_label.clear()
             self._current_label_title = self._default_label_text
             self._dirty = False
             self._reference_history = []
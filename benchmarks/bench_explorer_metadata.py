@@ -0,0 +1,153 @@
+"""
+对比资源管理器目录元数据收集的两种实现：
+- legacy：原 TabExplorerWidget.collect_metadata，逐个 isfile + 两次 listdir（每个条目再 stat 一次）
+- scandir：MuseLog.explorer_metadata.collect_metadata，一次 os.scandir 完成分类
+
+用法：
+    python -m benchmarks.bench_explorer_metadata [目录] [--repeat 200] [--images 300]
+
+未指定目录时会在临时目录生成一个典型的生成结果目录（提示词、JSON、视频、图片、ref/ 子目录）。
+指定网络共享上的目录时，差异主要来自文件系统往返次数。
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from MuseLog.explorer_metadata import MediaList, MetaStruct, collect_metadata
+
+
+# ---------------------- 原实现（保留用于对比） ----------------------
+def _legacy_list_files(folder: str, exts: set) -> List[str]:
+    out: List[str] = []
+    try:
+        for name in os.listdir(folder):
+            p = os.path.join(folder, name)
+            if os.path.isfile(p):
+                _, ext = os.path.splitext(name)
+                if ext.lower() in exts:
+                    out.append(p)
+    except Exception:
+        pass
+    return out
+
+
+def _legacy_read_first_json(paths: List[str]) -> Optional[Dict[str, Any]]:
+    for p in paths:
+        try:
+            if os.path.isfile(p):
+                with open(p, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception:
+            continue
+    return None
+
+
+def legacy_collect_metadata(folder: str) -> Dict[str, MetaStruct]:
+    meta: Dict[str, MetaStruct] = {"目录": MetaStruct(folder, op_type='打开文件夹', op_name='打开', op_data=folder)}
+    prompt_text_count = 0
+    for name in ("提示词.txt", "prompt.txt", "prompts.txt", "neg_prompt.txt", "caption.txt"):
+        if os.path.isfile(os.path.join(folder, name)):
+            meta[f'提示词_{prompt_text_count}'] = MetaStruct(name, op_type='打开文本文件', op_name='查看',
+                                                          op_data=os.path.join(folder, name))
+            prompt_text_count += 1
+    json_data = _legacy_read_first_json([
+        os.path.join(folder, name) for name in ("metadata.json", "params.json", "info.json")
+    ])
+    if json_data:
+        model = json_data.get("model") or json_data.get("model_name") or json_data.get("ckpt")
+        if model:
+            meta["模型名称"] = MetaStruct("模型名称", model)
+        if "prompt" in json_data and "提示词" not in meta:
+            meta["提示词"] = MetaStruct("提示词", str(json_data.get("prompt"))[:2000])
+        meta["其他参数"] = MetaStruct("其他参数", json_data)
+    videos = _legacy_list_files(folder, exts={".mp4", ".mov", ".avi", ".mkv", ".webm"})
+    for i, video in enumerate(videos):
+        meta[f'视频文件_{i}'] = MetaStruct(os.path.basename(video), op_type='视频元数据', op_name='元数据', op_data=video)
+    refs = []
+    images = _legacy_list_files(folder, exts={".png", ".jpg", ".jpeg", ".bmp", ".gif"})
+    for p in images:
+        name = os.path.basename(p).lower()
+        if ("ref" in name) or ("reference" in name):
+            refs.append(p)
+    ref_dir = os.path.join(folder, "ref")
+    if os.path.isdir(ref_dir):
+        refs.extend(_legacy_list_files(ref_dir, exts={".png", ".jpg", ".jpeg", ".bmp", ".gif"}))
+    if refs:
+        meta["参考图"] = MetaStruct("参考图", ", ".join(os.path.basename(r) for r in refs[:20]) + (" ..." if len(refs) > 20 else ""))
+    return meta
+
+
+# ---------------------- 测试素材与计时 ----------------------
+def _make_sample(folder: str, images: int) -> None:
+    def touch(name: str, content: str = "") -> None:
+        with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    touch("提示词.txt", "a cat")
+    touch("neg_prompt.txt", "blurry")
+    touch("params.json", json.dumps({"model": "sdxl", "prompt": "a cat", "steps": 30}))
+    for i in range(3):
+        touch(f"clip_{i}.mp4")
+    for i in range(images):
+        touch(f"frame_{i:05d}.png")
+    for i in range(5):
+        touch(f"ref_{i}.jpg")
+    os.makedirs(os.path.join(folder, "ref"))
+    for i in range(10):
+        touch(os.path.join("ref", f"pose_{i}.png"))
+    os.makedirs(os.path.join(folder, "sequence_001"))
+
+
+def _as_comparable(meta: Dict[str, MetaStruct]) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for k, v in meta.items():
+        media = v.op_data if isinstance(v.op_data, MediaList) else None
+        if media is None:
+            out[k] = vars(v)
+        elif media.kind == "视频文件":
+            # 视频行改为表格分页生成，展开后与逐行实现比较
+            for i, path in enumerate(media.paths):
+                key, row = media.row(i, path)
+                out[key] = vars(row)
+        else:
+            out[k] = dict(vars(v), op_data=None)
+    return out
+
+
+def _time(func, folder: str, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(folder)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", nargs="?", help="待测试的目录（默认生成样本目录）")
+    parser.add_argument("--repeat", type=int, default=200, help="每种实现的重复次数")
+    parser.add_argument("--images", type=int, default=300, help="样本目录中的图片数量")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as sample:
+        folder = args.folder
+        if not folder:
+            _make_sample(sample, args.images)
+            folder = sample
+        # 先比对两种实现的结果，同时起到预热目录缓存的作用
+        if _as_comparable(legacy_collect_metadata(folder)) != _as_comparable(collect_metadata(folder)):
+            print("两种实现的结果不一致", file=sys.stderr)
+            return 1
+        legacy_ms = _time(legacy_collect_metadata, folder, args.repeat)
+        scandir_ms = _time(collect_metadata, folder, args.repeat)
+        print(f"目录: {folder}（{len(os.listdir(folder))} 个条目）")
+        print(f"  legacy : {legacy_ms:.3f} ms/次")
+        print(f"  scandir: {scandir_ms:.3f} ms/次（{legacy_ms / max(scandir_ms, 1e-9):.1f}x）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+后台文件操作（MuseLog.file_operations 的 CopyTreeOperation / DeltaSyncOperation）与 shutil.copytree 的对比。
+
+用法：
+    python -m benchmarks.bench_file_operations [源目录] [--files 2000] [--size-kb 256]
+
+未指定源目录时在临时目录生成序列帧大小的文件。依次测量：
+- 首次复制：两者都需要写入全部字节
+- 再次同步（无变化）：copytree 会重新写入全部文件，CopyTreeOperation 按大小与 mtime 跳过
+- 修改其中 1% 的文件后再次同步
+- 重新导出（全部文件被重写、mtime 变化，内容只有 1% 不同）：按大小与 mtime 判断时全部重新复制，
+  DeltaSyncOperation 按内容哈希只写入真正变化的文件
+哈希缓存写入临时目录，不影响 ~/.muselog。
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from MuseLog.file_operations import CopyTreeOperation, DeltaSyncOperation, FileOperation, run_operation
+
+
+def _make_files(folder: str, count: int, size: int) -> None:
+    payload = os.urandom(size)
+    for i in range(count):
+        with open(os.path.join(folder, f"frame_{i:05d}.png"), "wb") as handler:
+            handler.write(payload)
+
+
+def _timed(label: str, func) -> None:
+    started = time.perf_counter()
+    detail = func()
+    print(f"  {label:<22} {(time.perf_counter() - started) * 1000:8.1f} ms  {detail or ''}")
+
+
+def _run(operation: FileOperation) -> str:
+    result = run_operation(operation, lambda _count, _path: None, lambda: False)
+    return f"{result.summary()}，写入 {result.done_bytes / 1024 / 1024:.1f} MB"
+
+
+def _reexport(source: str, names: List[str]) -> None:
+    # 模拟重新导出：重写全部文件，只有每 100 个中的 1 个内容变化
+    for i, name in enumerate(names):
+        path = os.path.join(source, name)
+        with open(path, "rb") as handler:
+            data = handler.read()
+        with open(path, "wb") as handler:
+            handler.write(os.urandom(len(data)) if i % 100 == 0 else data)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", nargs="?", help="源目录（默认生成文件）")
+    parser.add_argument("--files", type=int, default=2000, help="生成的文件数量")
+    parser.add_argument("--size-kb", type=int, default=256, help="每个生成文件的大小（KB）")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.source
+        if not source:
+            source = os.path.join(tmp, "source")
+            os.makedirs(source)
+            _make_files(source, args.files, args.size_kb * 1024)
+        names = sorted(os.listdir(source))
+        print(f"源目录: {source}（{len(names)} 个文件）")
+        copytree_dst = os.path.join(tmp, "copytree")
+        sync_dst = os.path.join(tmp, "sync")
+        delta_dst = os.path.join(tmp, "delta")
+        hash_cache = os.path.join(tmp, "hashes.sqlite3")
+
+        print("shutil.copytree")
+        _timed("首次复制", lambda: shutil.copytree(source, copytree_dst, dirs_exist_ok=True) and None)
+        _timed("再次同步（无变化）", lambda: shutil.copytree(source, copytree_dst, dirs_exist_ok=True) and None)
+        print("CopyTreeOperation")
+        _timed("首次复制", lambda: _run(CopyTreeOperation(source, sync_dst)))
+        _timed("再次同步（无变化）", lambda: _run(CopyTreeOperation(source, sync_dst)))
+        print("DeltaSyncOperation")
+        _timed("首次复制", lambda: _run(DeltaSyncOperation(source, delta_dst, hash_cache_path=hash_cache)))
+        _timed("再次同步（无变化）", lambda: _run(DeltaSyncOperation(source, delta_dst, hash_cache_path=hash_cache)))
+        if not args.source:
+            print("重新导出后同步")
+            _reexport(source, names)
+            _timed("CopyTreeOperation", lambda: _run(CopyTreeOperation(source, sync_dst)))
+            _timed("DeltaSyncOperation", lambda: _run(DeltaSyncOperation(source, delta_dst, hash_cache_path=hash_cache)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+对比读取图片内嵌生成参数的两种方式：
+- pillow：Image.open(...).text，PNG 需要解码像素才能确认 IDAT 之后没有文本块
+- header：MuseLog.image_params.read_image_params，只读取文件头部的元数据块，不解码像素
+
+用法：
+    python -m benchmarks.bench_image_params [目录] [--images 1000] [--size 512] [--repeat 3]
+
+未指定目录时在临时目录生成 ComfyUI 风格的 PNG（prompt 节点图 + 较大的 workflow 文本块 + 噪声像素）。
+每轮计时前清空 read_image_params 的缓存；操作系统的页缓存无法清空，结果反映热缓存下的 CPU 开销，
+冷缓存时 header 方式只读取每个文件开头的几 KB，差距更大。
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from PIL import Image, PngImagePlugin
+
+from MuseLog.image_params import EMBEDDED_PARAMS_EXTENSIONS, clear_image_params_cache, read_image_params
+
+
+def _make_images(folder: str, count: int, size: int, seed: int) -> None:
+    rng = random.Random(seed)
+    pixels = Image.frombytes("RGB", (size, size), rng.randbytes(size * size * 3))
+    for i in range(count):
+        graph = {
+            "3": {"class_type": "KSampler", "inputs": {"seed": rng.randint(0, 2 ** 32), "positive": ["6", 0], "negative": ["7", 0]}},
+            "4": {"class_type": "CheckpointLoaderSimple", "inputs": {"ckpt_name": "sdxl_base_1.0.safetensors"}},
+            "6": {"class_type": "CLIPTextEncode", "inputs": {"text": f"a cat sitting on the window, 一只猫 {i}"}},
+            "7": {"class_type": "CLIPTextEncode", "inputs": {"text": "blurry, low quality"}},
+        }
+        info = PngImagePlugin.PngInfo()
+        info.add_text("prompt", json.dumps(graph, ensure_ascii=False))
+        info.add_text("workflow", json.dumps({"nodes": [graph] * 40}))
+        pixels.save(os.path.join(folder, f"ComfyUI_{i:05d}_.png"), pnginfo=info)
+
+
+def _pillow(paths: List[str]) -> int:
+    found = 0
+    for path in paths:
+        with Image.open(path) as im:
+            found += bool(getattr(im, "text", None) or im.info.get("exif"))
+    return found
+
+
+def _header(paths: List[str]) -> int:
+    clear_image_params_cache()
+    return sum(read_image_params(path) is not None for path in paths)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", nargs="?", help="待测试的图片目录（默认生成 PNG）")
+    parser.add_argument("--images", type=int, default=1000, help="生成的图片数量")
+    parser.add_argument("--size", type=int, default=512, help="生成图片的边长")
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式的重复次数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = args.folder
+        if not folder:
+            folder = tmp
+            _make_images(folder, args.images, args.size, args.seed)
+        paths = sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if os.path.splitext(name)[1].lower() in EMBEDDED_PARAMS_EXTENSIONS
+        )
+        total_mb = sum(os.path.getsize(p) for p in paths) / 1024 / 1024
+        print(f"目录: {folder}（{len(paths)} 张图片，{total_mb:.0f} MB）")
+        for name, func in (("pillow", _pillow), ("header", _header)):
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                found = func(paths)
+            elapsed = (time.perf_counter() - started) / args.repeat
+            print(f"  {name:<6}: {elapsed * 1000:8.1f} ms/轮  {elapsed / max(len(paths), 1) * 1e6:7.1f} µs/张  含参数 {found} 张")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
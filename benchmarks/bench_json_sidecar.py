@@ -0,0 +1,112 @@
+"""
+对比大型 JSON 附属文件（例如 ComfyUI 工作流导出）的两种读取方式：
+- json.load：整体解析，构建完整对象树
+- stream：MuseLog.json_sidecar.extract_top_level_keys，内存映射扫描，只解码常用键，其余值按块在 C 层跳过
+
+用法：
+    python -m benchmarks.bench_json_sidecar [文件] [--size-mb 30] [--repeat 3]
+
+未指定文件时在临时目录生成两个工作流导出：
+- keys-last：常用键位于大段节点数据之后，需要扫描完整个文件，属于流式提取的最坏情况
+- keys-first：常用键在前，SIDECAR_STOP_KEYS 找齐后立即停止扫描
+任一文件中流式提取慢于 json.load 时以退出码 1 结束：即使在 keys-last 这种最坏情况下也不应比整体解析更慢。
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from MuseLog.json_sidecar import SIDECAR_KEYS, SIDECAR_STOP_KEYS, extract_top_level_keys
+
+
+def _make_workflow(path: str, size_mb: int, seed: int, keys_first: bool = False) -> None:
+    rng = random.Random(seed)
+    nodes: Dict[str, Any] = {}
+    target = size_mb * 1024 * 1024
+    approx = 0
+    i = 0
+    while approx < target:
+        node = {
+            "class_type": rng.choice(["KSampler", "CLIPTextEncode", "VAEDecode", "LoadImage", "SaveImage"]),
+            "inputs": {
+                "seed": rng.randint(0, 2 ** 48),
+                "steps": rng.randint(10, 60),
+                "text": "masterpiece, {best quality}, [cinematic] \"lighting\" 电影感光影 " * rng.randint(1, 4),
+                "links": [[rng.randint(0, 999), rng.randint(0, 9)] for _ in range(rng.randint(1, 6))],
+            },
+            "widgets_values": [rng.random() for _ in range(rng.randint(2, 12))],
+        }
+        nodes[str(i)] = node
+        approx += len(json.dumps(node))
+        i += 1
+    keys = {
+        "model": "sdxl_base_1.0.safetensors",
+        "prompt": "a cat sitting on the window, 一只猫坐在窗边",
+        "ckpt": "sdxl_base_1.0",
+    }
+    workflow = {"workflow": {"nodes": nodes, "version": 0.4}}
+    data = {**keys, **workflow} if keys_first else {**workflow, **keys}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _full(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {k: data[k] for k in SIDECAR_KEYS if k in data}
+
+
+def _stream(path: str) -> Optional[Dict[str, Any]]:
+    return extract_top_level_keys(path, SIDECAR_KEYS, stop_keys=SIDECAR_STOP_KEYS)
+
+
+def _measure(func: Callable[[str], Any], path: str, repeat: int) -> Tuple[float, float, Any]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(path)
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", help="待测试的 JSON 文件（默认生成工作流导出）")
+    parser.add_argument("--size-mb", type=int, default=30, help="生成文件的大致大小（MB）")
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式的重复次数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [args.file] if args.file else []
+        if not paths:
+            for name, keys_first in (("keys-last.json", False), ("keys-first.json", True)):
+                paths.append(os.path.join(tmp, name))
+                _make_workflow(paths[-1], args.size_mb, args.seed, keys_first)
+        for path in paths:
+            full_ms, full_mb, full_result = _measure(_full, path, args.repeat)
+            stream_ms, stream_mb, stream_result = _measure(_stream, path, args.repeat)
+            # 提前停止时其后的常用键不会出现在流式结果中，只比较停止键与已提取的键
+            compared = set(SIDECAR_STOP_KEYS) | set(stream_result or ())
+            if {k: v for k, v in full_result.items() if k in compared} != stream_result:
+                print("两种方式提取的结果不一致", file=sys.stderr)
+                return 1
+            print(f"文件: {os.path.basename(path)}（{os.path.getsize(path) / 1024 / 1024:.1f} MB）")
+            print(f"  json.load: {full_ms:8.1f} ms/次  峰值内存 {full_mb:8.1f} MB")
+            print(f"  stream   : {stream_ms:8.1f} ms/次  峰值内存 {stream_mb:8.1f} MB")
+            if stream_ms > full_ms:
+                print("流式提取慢于 json.load", file=sys.stderr)
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+提示词全文搜索（MuseLog.metadata_index.MetadataIndex.search_prompts）的查询耗时。
+
+用法：
+    python -m benchmarks.bench_prompt_search [--folders 100000] [--repeat 20]
+
+在临时目录中生成一个只含索引记录的数据库（不创建真实目录），
+提示词由中英文词汇随机组合，然后对若干典型查询计时：
+长词走 FTS5 trigram 索引，单字 / 双字查询走 LIKE 扫描。
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from MuseLog.explorer_metadata import FolderMetadata
+from MuseLog.metadata_index import MetadataIndex
+
+_WORDS = [
+    "a cat", "sitting on", "the window", "cinematic lighting", "masterpiece", "best quality", "portrait",
+    "sunset", "cyberpunk city", "neon", "watercolor", "一只猫", "坐在窗边", "电影感光影", "赛博朋克城市",
+    "水彩风格", "少女", "古风", "樱花", "夜景", "霓虹灯", "高清细节", "rainy street", "dragon", "森林",
+]
+_QUERIES = ["cyberpunk", "电影感光影", "a cat window", "赛博朋克 neon", "樱花", "猫", "dragon 森林", "不存在的词", "龙", "水彩 龙", "ca"]
+
+
+def _build(index: MetadataIndex, folders: int, seed: int) -> None:
+    rng = random.Random(seed)
+    root = os.path.join(os.path.dirname(index.db_path), "library")
+    for i in range(folders):
+        folder = os.path.join(root, f"batch_{i // 1000:03d}", f"shot_{i:06d}")
+        prompt = ", ".join(rng.sample(_WORDS, 6))
+        data = FolderMetadata(folder, {"提示词.txt": os.path.join(folder, "提示词.txt")}, {"prompt": prompt})
+        index.upsert(root, data, 0, {}, [], [("提示词.txt", prompt), ("其他参数", prompt)])
+        if i % 5000 == 0:
+            index.commit()
+    index.commit()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folders", type=int, default=100000, help="生成的目录数量")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询的重复次数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = MetadataIndex(os.path.join(tmp, "bench.sqlite3"))
+        started = time.perf_counter()
+        _build(index, args.folders, args.seed)
+        print(f"建立索引: {args.folders} 个目录，{time.perf_counter() - started:.1f} s")
+        worst = 0.0
+        for query in _QUERIES:
+            hits = index.search_prompts(query)
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                index.search_prompts(query)
+            elapsed = (time.perf_counter() - started) / args.repeat * 1000
+            worst = max(worst, elapsed)
+            print(f"  {query!r:<16} {len(hits):>4} 条  {elapsed:7.2f} ms/次")
+        print(f"最慢查询: {worst:.2f} ms")
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+对比 BatchResizer 的 quality / speed 两种策略在 4K、8K 渲染图上的耗时与峰值内存。
+
+用法：
+    python -m benchmarks.bench_resize_policy [图片文件夹] [--scale 25] [--count 6]
+
+未指定文件夹时会在临时目录生成带噪点的 4K 与 8K JPEG 作为测试素材。
+每个策略在独立子进程中运行，峰值内存取子进程的最大常驻内存（仅 Unix 可用）。
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+from MuseLog.batch_resize_utils import RESIZE_POLICIES, BatchResizer
+
+SIZES = {"4K": (3840, 2160), "8K": (7680, 4320)}
+
+
+def _make_samples(folder: str, size_name: str, count: int) -> str:
+    target = os.path.join(folder, size_name)
+    os.makedirs(target, exist_ok=True)
+    width, height = SIZES[size_name]
+    # 噪点 + 渐变，避免纯色图被编码器过度压缩导致结果失真
+    noise = Image.effect_noise((width, height), 64).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    sample = Image.blend(noise, gradient, 0.5)
+    for i in range(count):
+        sample.save(os.path.join(target, f"render_{i:03d}.jpg"), quality=92)
+    return target
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _run_policy(in_folder: str, out_folder: str, scale: int, policy: str, queue) -> None:
+    resizer = BatchResizer(in_folder, out_folder, "scale", scale, policy=policy)
+    resizer.validate_folders()
+    started = time.perf_counter()
+    resizer.process_images()
+    queue.put({"seconds": time.perf_counter() - started, "peak_mb": _peak_rss_mb(), "count": len(resizer.image_paths)})
+
+
+def bench(in_folder: str, scale: int) -> Dict[str, Dict]:
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for policy in RESIZE_POLICIES:
+        with tempfile.TemporaryDirectory() as out_folder:
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_run_policy, args=(in_folder, out_folder, scale, policy, queue))
+            proc.start()
+            results[policy] = queue.get()
+            proc.join()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", nargs="?", help="待测试的图片文件夹（默认生成 4K/8K 样本）")
+    parser.add_argument("--scale", type=int, default=25, help="缩放百分比，默认 25")
+    parser.add_argument("--count", type=int, default=6, help="每种分辨率生成的样本数量")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as sample_root:
+        if args.folder:
+            folders = {os.path.basename(os.path.normpath(args.folder)): args.folder}
+        else:
+            # 在子进程里生成样本：ru_maxrss 会被子进程继承，主进程需保持较小的内存占用
+            ctx = multiprocessing.get_context("spawn")
+            folders = {}
+            for name in SIZES:
+                proc = ctx.Process(target=_make_samples, args=(sample_root, name, args.count))
+                proc.start()
+                proc.join()
+                folders[name] = os.path.join(sample_root, name)
+        for name, folder in folders.items():
+            results = bench(folder, args.scale)
+            for policy, data in results.items():
+                peak = f"{data['peak_mb']:.0f} MB" if data["peak_mb"] is not None else "n/a"
+                per_image = data["seconds"] / max(1, data["count"]) * 1000
+                print(f"{name:>6} {policy:>8}: {data['seconds']:.2f}s ({per_image:.0f} ms/张), 峰值内存 {peak}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+序列帧预览（MuseLog.sequence_player.SequencePlayerWidget）的播放稳定性。
+
+用法：
+    python -m benchmarks.bench_sequence_player [目录] [--frames 1200] [--fps 24] [--seconds 10]
+
+未指定目录时在临时目录生成带渐变与噪点的 PNG 序列帧（接近真实渲染的解码开销）。
+- 逐帧同步解码：每次计时器触发时在界面线程中解码下一帧，即改造前的做法
+- 环形缓冲区：后台线程按显示尺寸预解码，计时器只取已解码的帧
+统计相邻两次换帧的间隔（理想值为 1000 / fps 毫秒）、卡顿次数与中途拖动定位后的出图延迟。
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from PySide6.QtCore import QEventLoop, QSize, QTimer, Qt
+from PySide6.QtGui import QColor, QImage, QLinearGradient, QPainter
+from PySide6.QtWidgets import QApplication
+
+from MuseLog.sequence_player import SequencePlayerWidget, decode_frame, list_sequence_frames
+
+_EDGE = 1024
+
+
+def _make_frames(folder: str, count: int) -> None:
+    rng = random.Random(0)
+    for i in range(count):
+        image = QImage(_EDGE, _EDGE, QImage.Format.Format_ARGB32)
+        image.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(image)
+        gradient = QLinearGradient(0, 0, _EDGE, _EDGE)
+        gradient.setColorAt(0, QColor(i % 255, 80, 160))
+        gradient.setColorAt(1, QColor(40, (i * 3) % 255, 90))
+        painter.fillRect(0, 0, _EDGE, _EDGE, gradient)
+        for _ in range(400):
+            painter.fillRect(rng.randrange(_EDGE), rng.randrange(_EDGE), 8, 8, QColor(rng.randrange(1 << 24)))
+        painter.end()
+        image.save(os.path.join(folder, f"frame_{i}.png"), "PNG")
+
+
+def _spin(ms: int) -> None:
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def _report(label: str, intervals: List[float], fps: int, extra: str = "") -> None:
+    intervals = sorted(intervals)
+    if not intervals:
+        print(f"  {label:<12} 没有换帧")
+        return
+    late = sum(1 for value in intervals if value > 1500 / fps)
+    p99 = intervals[min(len(intervals) - 1, int(len(intervals) * 0.99))]
+    print(
+        f"  {label:<12} {len(intervals) + 1:>5} 帧  实际 {1000 / (sum(intervals) / len(intervals)):5.1f} fps  "
+        f"间隔中位 {intervals[len(intervals) // 2]:6.1f} ms  p99 {p99:6.1f} ms  超时 {late} 次{extra}"
+    )
+
+
+def _bench_sync(paths: List[str], fps: int, seconds: float, size: QSize) -> List[float]:
+    # 改造前：计时器每触发一次就在界面线程中解码下一帧
+    intervals: List[float] = []
+    state = {"index": 0, "last": time.perf_counter()}
+
+    def on_tick() -> None:
+        decode_frame(paths[state["index"] % len(paths)], size)
+        state["index"] += 1
+        now = time.perf_counter()
+        intervals.append((now - state["last"]) * 1000)
+        state["last"] = now
+
+    timer = QTimer()
+    timer.setTimerType(Qt.TimerType.PreciseTimer)
+    timer.timeout.connect(on_tick)
+    timer.start(int(1000 / fps))
+    _spin(int(seconds * 1000))
+    timer.stop()
+    return intervals[1:]
+
+
+def _bench_ring(player: SequencePlayerWidget, seconds: float) -> List[float]:
+    intervals: List[float] = []
+    state = {"shown": player.position, "last": time.perf_counter()}
+
+    def on_tick() -> None:
+        if player.position != state["shown"]:
+            now = time.perf_counter()
+            intervals.append((now - state["last"]) * 1000)
+            state["last"] = now
+            state["shown"] = player.position
+
+    probe = QTimer()
+    probe.timeout.connect(on_tick)
+    probe.start(1)
+    player.play()
+    _spin(int(seconds * 1000))
+    player.pause()
+    probe.stop()
+    return intervals[1:]
+
+
+def _seek_latency(app: QApplication, player: SequencePlayerWidget, count: int) -> float:
+    # 跳到远处未缓冲的位置，等待画面出现
+    latencies: List[float] = []
+    for frame in (count // 2, count // 4, count - 10):
+        started = time.perf_counter()
+        player.sliderFrame.setValue(frame)
+        while player.source.frame(frame) is None:
+            app.processEvents()
+            time.sleep(0.001)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return max(latencies)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", nargs="?", help="序列帧目录（默认生成 PNG）")
+    parser.add_argument("--frames", type=int, default=1200, help="生成的帧数")
+    parser.add_argument("--fps", type=int, default=24, help="播放帧率")
+    parser.add_argument("--seconds", type=float, default=10, help="每种方式的播放时长")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = args.folder
+        if not folder:
+            folder = os.path.join(tmp, "frames")
+            os.makedirs(folder)
+            print(f"生成 {args.frames} 帧 {_EDGE}×{_EDGE} PNG…")
+            _make_frames(folder, args.frames)
+        paths = list_sequence_frames(folder)
+        print(f"目录: {folder}（{len(paths)} 帧），{args.fps} fps，理想间隔 {1000 / args.fps:.1f} ms")
+
+        player = SequencePlayerWidget()
+        player.resize(640, 680)
+        player.show()
+        player.set_sequence(paths, args.fps)
+        app.processEvents()
+        size = player.canvas.target_size()
+
+        _report("逐帧同步解码", _bench_sync(paths, args.fps, args.seconds, size), args.fps)
+        intervals = _bench_ring(player, args.seconds)
+        extra = f"  卡顿 {player.stalls} 次  缓冲 {player.source.capacity} 帧"
+        _report("环形缓冲区", intervals, args.fps, extra)
+        print(f"  拖动定位后出图最长 {_seek_latency(app, player, len(paths)):.1f} ms")
+        player.stop()
+        player.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+缩略图网格（MuseLog.explorer_thumbnail_grid.ThumbnailGridView）滚动时每帧的绘制耗时。
+
+用法：
+    python -m benchmarks.bench_thumbnail_grid [目录] [--images 5000]
+
+未指定目录时在临时目录生成 JPEG。磁盘缓存写入临时目录，不影响 ~/.muselog。
+依次从上到下滚动整个网格，每步重绘一次视口并记录耗时：
+- 首次浏览：缩略图在线程池中解码，绘制时只画占位框并发出请求
+- 再次浏览：全部命中内存缓存
+- 清空内存缓存后：从磁盘缓存读取
+60 fps 对应每帧 16.7 ms。
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from PySide6.QtCore import QEventLoop, QTimer
+from PySide6.QtGui import QColor, QImage
+from PySide6.QtWidgets import QApplication
+
+from MuseLog.explorer_thumbnail_grid import ThumbnailGridView
+from MuseLog.thumbnail_cache import ThumbnailDiskCache
+from MuseLog.thumbnail_loader import ThumbnailLoader, list_images
+
+
+def _make_images(folder: str, count: int) -> None:
+    image = QImage(768, 512, QImage.Format.Format_RGB32)
+    for i in range(count):
+        image.fill(QColor(i % 255, (i * 7) % 255, 90))
+        image.save(os.path.join(folder, f"render_{i:05d}.jpg"), "JPG", 85)
+
+
+def _spin(ms: int) -> None:
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec()
+
+
+def _sweep(app: QApplication, view: ThumbnailGridView, wait_ms: int) -> List[float]:
+    bar = view.verticalScrollBar()
+    step = max(1, view.viewport().height() // 3)
+    frames: List[float] = []
+    value = 0
+    while value <= bar.maximum():
+        bar.setValue(value)
+        started = time.perf_counter()
+        view.viewport().repaint()
+        frames.append((time.perf_counter() - started) * 1000)
+        app.processEvents()
+        if wait_ms:
+            _spin(wait_ms)
+        value += step
+    return sorted(frames)
+
+
+def _report(label: str, frames: List[float]) -> None:
+    p99 = frames[min(len(frames) - 1, int(len(frames) * 0.99))]
+    print(f"  {label:<10} {len(frames):>4} 帧  中位 {frames[len(frames) // 2]:6.2f} ms  p99 {p99:6.2f} ms  最大 {frames[-1]:6.2f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", nargs="?", help="待测试的图片目录（默认生成 JPEG）")
+    parser.add_argument("--images", type=int, default=5000, help="生成的图片数量")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = args.folder
+        if not folder:
+            folder = os.path.join(tmp, "images")
+            os.makedirs(folder)
+            _make_images(folder, args.images)
+        loader = ThumbnailLoader(disk_cache=ThumbnailDiskCache(os.path.join(tmp, "thumbnails")))
+        view = ThumbnailGridView(loader)
+        view.resize(900, 700)
+        view.show()
+        view.set_items(list_images(folder))
+        print(f"目录: {folder}（{view.grid_model.rowCount()} 张图片）")
+
+        _report("首次浏览", _sweep(app, view, 30))
+        loader.stop()
+        app.processEvents()
+        _report("内存缓存", _sweep(app, view, 0))
+        loader.memory_cache.clear()
+        _report("磁盘缓存", _sweep(app, view, 10))
+        loader.stop()
+        count, size = loader.memory_cache.stats()
+        print(f"内存缓存: {count} 张，{size / 1024 / 1024:.0f} MB")
+        view.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
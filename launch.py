@@ -1,6 +1,9 @@
 
 # 启动 MuseLog 中的 main.py
+import multiprocessing
+
 import MuseLog.main
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     MuseLog.main.main()
\ No newline at end of file
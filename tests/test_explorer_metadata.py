@@ -0,0 +1,51 @@
+import os
+import struct
+import zlib
+
+import MuseLog.explorer_metadata as explorer_metadata
+from MuseLog.explorer_metadata import MetadataCache, collect_embedded_metadata
+from MuseLog.image_params import clear_image_params_cache
+
+
+def _png_with_prompt(path, prompt: str) -> None:
+    def chunk(chunk_type: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + chunk_type + body + struct.pack(">I", zlib.crc32(chunk_type + body))
+
+    text = b"parameters\0" + prompt.encode("latin-1") + b"\nSteps: 20, Model: sdxl"
+    ihdr = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"tEXt", text) + chunk(b"IEND", b""))
+
+
+def test_folder_cache_does_not_read_images(tmp_path, monkeypatch):
+    _png_with_prompt(tmp_path / "a.png", "a cat")
+    calls = []
+    monkeypatch.setattr(explorer_metadata, "read_image_params", lambda *args: calls.append(args))
+    meta = MetadataCache().get_or_collect(str(tmp_path))
+    assert calls == []
+    assert "内嵌参数" not in meta
+
+
+def test_embedded_params_follow_in_place_overwrite(tmp_path):
+    clear_image_params_cache()
+    image = tmp_path / "a.png"
+    _png_with_prompt(image, "a cat")
+    cache = MetadataCache()
+    cache.get_or_collect(str(tmp_path))
+    meta = collect_embedded_metadata(str(tmp_path), cache.images(str(tmp_path)))
+    assert meta["内嵌提示词"].name == "a cat"
+    dir_mtime = os.stat(tmp_path).st_mtime_ns
+    _png_with_prompt(image, "a dog on the beach")
+    st = os.stat(image)
+    os.utime(image, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    # 原地覆盖不改变目录 mtime，目录缓存仍然命中
+    assert os.stat(tmp_path).st_mtime_ns == dir_mtime
+    cache.get_or_collect(str(tmp_path))
+    meta = collect_embedded_metadata(str(tmp_path), cache.images(str(tmp_path)))
+    assert meta["内嵌提示词"].name == "a dog on the beach"
+
+
+def test_sequence_folder_is_skipped(tmp_path):
+    folder = tmp_path / "序列帧"
+    folder.mkdir()
+    _png_with_prompt(folder / "0001.png", "a cat")
+    assert collect_embedded_metadata(str(folder)) == {}
@@ -0,0 +1,147 @@
+import os
+
+import pytest
+
+from MuseLog.explorer_custom_widgets import _Json42SyncOperation
+from MuseLog.file_operations import (
+    PARTIAL_SOURCE_SUFFIX,
+    PARTIAL_SUFFIX,
+    CopyTreeOperation,
+    DeltaSyncOperation,
+    OperationCancelled,
+    copy_file,
+    run_operation,
+)
+
+
+def _noop(_count, _path):
+    pass
+
+
+def _cancel_after(limit: int):
+    # 写入超过 limit 字节后请求取消
+    written = [0]
+
+    def progress(count, _path):
+        written[0] += count
+
+    return progress, lambda: written[0] >= limit
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr("MuseLog.file_operations.COPY_CHUNK_SIZE", 1024)
+
+
+def _write_files(folder, files):
+    folder.mkdir(parents=True, exist_ok=True)
+    for name, data in files.items():
+        (folder / name).write_bytes(data)
+
+
+def _sync(source, destination, tmp_path):
+    operation = DeltaSyncOperation(str(source), str(destination), hash_cache_path=str(tmp_path / "hashes.sqlite3"))
+    return run_operation(operation, _noop, lambda: False)
+
+
+def test_cancelled_copy_resumes_to_identical_file(tmp_path, small_chunks):
+    source = tmp_path / "frame.png"
+    data = os.urandom(10 * 1024 + 17)
+    source.write_bytes(data)
+    destination = str(tmp_path / "out" / "frame.png")
+    progress, should_stop = _cancel_after(4096)
+    with pytest.raises(OperationCancelled):
+        copy_file(str(source), destination, progress, should_stop)
+    partial_size = os.path.getsize(destination + PARTIAL_SUFFIX)
+    assert 0 < partial_size < len(data)
+    reported = []
+    copy_file(str(source), destination, lambda count, _path: reported.append(count), lambda: False)
+    # 续传时先报告已写入的字节数，再只复制剩余部分
+    assert reported[0] == partial_size
+    assert sum(reported) == len(data)
+    with open(destination, "rb") as f:
+        assert f.read() == data
+    assert not os.path.exists(destination + PARTIAL_SUFFIX)
+    assert os.stat(destination).st_mtime_ns == os.stat(source).st_mtime_ns
+
+
+def test_copy_tree_skips_by_size_and_mtime(tmp_path):
+    source = tmp_path / "source"
+    destination = tmp_path / "destination"
+    _write_files(source, {"a.png": b"a" * 100, "b.png": b"b" * 200})
+    first = run_operation(CopyTreeOperation(str(source), str(destination)), _noop, lambda: False)
+    assert (first.copied, first.skipped) == (2, 0)
+    second = run_operation(CopyTreeOperation(str(source), str(destination)), _noop, lambda: False)
+    assert (second.copied, second.skipped) == (0, 2)
+    (source / "b.png").write_bytes(b"c" * 201)
+    third = run_operation(CopyTreeOperation(str(source), str(destination)), _noop, lambda: False)
+    assert (third.copied, third.skipped) == (1, 1)
+    assert (destination / "b.png").read_bytes() == b"c" * 201
+
+
+def test_delta_sync_skips_touched_but_identical_source(tmp_path):
+    source = tmp_path / "source"
+    destination = tmp_path / "destination"
+    _write_files(source, {"a.png": b"a" * 100})
+    _sync(source, destination, tmp_path)
+    target_mtime = os.stat(destination / "a.png").st_mtime_ns
+    # 重新导出：内容相同，mtime 变化
+    st = os.stat(source / "a.png")
+    os.utime(source / "a.png", ns=(st.st_atime_ns, st.st_mtime_ns + 60_000_000_000))
+    result = _sync(source, destination, tmp_path)
+    assert (result.copied, result.skipped, result.changed) == (0, 1, [])
+    assert os.stat(destination / "a.png").st_mtime_ns == target_mtime
+
+
+def test_delta_sync_copies_only_changed_file(tmp_path):
+    source = tmp_path / "source"
+    destination = tmp_path / "destination"
+    _write_files(source, {"a.png": b"a" * 100, "b.png": b"b" * 100, "c.png": b"c" * 100})
+    _sync(source, destination, tmp_path)
+    (source / "b.png").write_bytes(b"x" * 100)
+    result = _sync(source, destination, tmp_path)
+    assert result.changed == [str(destination / "b.png")]
+    assert result.skipped == 2
+    assert (destination / "b.png").read_bytes() == b"x" * 100
+
+
+def test_json42_sync_renames_json_to_atlas(tmp_path):
+    source = tmp_path / "json42"
+    destination = tmp_path / "game"
+    _write_files(source, {"monster_101.atlas": b"atlas", "monster_101.png": b"png", "skeleton.json": b"{}"})
+    operation = _Json42SyncOperation(source, destination, lambda _result: None)
+    operation.hash_cache_path = str(tmp_path / "hashes.sqlite3")
+    result = run_operation(operation, _noop, lambda: False)
+    assert result.ok
+    assert sorted(os.listdir(destination)) == ["monster_101.atlas", "monster_101.json", "monster_101.png"]
+    assert (destination / "monster_101.json").read_bytes() == b"{}"
+
+
+def test_delta_sync_cancel_leaves_no_partial(tmp_path, small_chunks):
+    source = tmp_path / "source"
+    destination = tmp_path / "destination"
+    _write_files(source, {"big.png": os.urandom(64 * 1024)})
+    operation = DeltaSyncOperation(str(source), str(destination), hash_cache_path=str(tmp_path / "hashes.sqlite3"))
+    progress, should_stop = _cancel_after(8192)
+    result = run_operation(operation, progress, should_stop)
+    assert result.cancelled
+    assert not os.path.exists(destination / "big.png")
+    assert [name for name in os.listdir(destination) if name.startswith("big.png")] == []
+
+
+def test_resume_ignores_part_of_replaced_source(tmp_path, small_chunks):
+    source = tmp_path / "frame.png"
+    destination = str(tmp_path / "out" / "frame.png")
+    source.write_bytes(b"a" * 8192)
+    progress, should_stop = _cancel_after(2048)
+    with pytest.raises(OperationCancelled):
+        copy_file(str(source), destination, progress, should_stop)
+    assert os.path.exists(destination + PARTIAL_SUFFIX)
+    # 从备份恢复：内容不同、mtime 更早
+    source.write_bytes(b"b" * 8192)
+    old = os.stat(destination + PARTIAL_SUFFIX).st_mtime_ns - 10_000_000_000
+    os.utime(source, ns=(old, old))
+    copy_file(str(source), destination, _noop, lambda: False)
+    with open(destination, "rb") as f:
+        assert f.read() == b"b" * 8192
+    assert not os.path.exists(destination + PARTIAL_SOURCE_SUFFIX)
@@ -0,0 +1,25 @@
+import pytest
+
+import MuseLog.image_list_model as image_list_model
+from MuseLog.image_list_model import ImagePathListModel
+
+
+def _paths(count):
+    return [f"/images/{i:03d}.png" for i in range(count)]
+
+
+@pytest.mark.parametrize("rows", [[3, 4, 5], [1, 3, 5, 7, 9, 11]])
+def test_remove_rows_keeps_index_consistent(monkeypatch, rows):
+    # 第二组为零散选择，走一次压缩后重置的分支
+    monkeypatch.setattr(image_list_model, "REMOVE_RANGES_LIMIT", 2)
+    model = ImagePathListModel()
+    model.set_paths(_paths(20))
+    assert model.remove_rows(rows) == len(rows)
+    # 连续两次删除后才查询，过期的行号只在 row_of 时重建一次
+    assert model.remove_rows([0]) == 1
+    expected = [p for i, p in enumerate(_paths(20)) if i not in rows][1:]
+    assert model.paths() == expected
+    assert [model.row_of(p) for p in expected] == list(range(len(expected)))
+    assert model.row_of("/images/000.png") == -1
+    assert model.add_paths(["/images/000.png", expected[0]]) == 1
+    assert model.row_of("/images/000.png") == len(expected)
@@ -0,0 +1,55 @@
+import struct
+import zlib
+
+from MuseLog.image_params import clear_image_params_cache, read_image_params
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_IHDR = struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0)
+
+
+def _chunk(chunk_type: bytes, body: bytes, length: int = -1) -> bytes:
+    length = len(body) if length < 0 else length
+    return struct.pack(">I", length) + chunk_type + body + struct.pack(">I", zlib.crc32(chunk_type + body))
+
+
+def _png(*chunks: bytes) -> bytes:
+    return _PNG_SIGNATURE + _chunk(b"IHDR", _IHDR) + b"".join(chunks) + _chunk(b"IEND", b"")
+
+
+def _read(tmp_path, name: str, data: bytes):
+    path = tmp_path / name
+    path.write_bytes(data)
+    clear_image_params_cache()
+    return read_image_params(str(path))
+
+
+def test_itxt_truncated_after_keyword(tmp_path):
+    assert _read(tmp_path, "itxt.png", _png(_chunk(b"iTXt", b"parameters\0"))) is None
+
+
+def test_itxt_truncated_after_flags(tmp_path):
+    assert _read(tmp_path, "itxt_flags.png", _png(_chunk(b"iTXt", b"parameters\0\1"))) is None
+
+
+def test_text_chunk_longer_than_file(tmp_path):
+    # 长度字段超出文件末尾
+    data = _PNG_SIGNATURE + _chunk(b"IHDR", _IHDR) + _chunk(b"tEXt", b"parameters\0a cat", length=4096)
+    assert _read(tmp_path, "text.png", data) is None
+
+
+def test_ztxt_with_broken_stream(tmp_path):
+    assert _read(tmp_path, "ztxt.png", _png(_chunk(b"zTXt", b"parameters\0\0not zlib"))) is None
+
+
+def test_jpeg_segment_with_invalid_length(tmp_path):
+    data = b"\xff\xd8" + b"\xff\xfe" + struct.pack(">H", 0) + b"\xff\xd9"
+    assert _read(tmp_path, "bad.jpg", data) is None
+
+
+def test_valid_text_chunk(tmp_path):
+    text = b"parameters\0a cat\nNegative prompt: blurry\nSteps: 20, Model: sdxl"
+    params = _read(tmp_path, "ok.png", _png(_chunk(b"tEXt", text)))
+    assert params is not None
+    assert params.prompt == "a cat"
+    assert params.negative_prompt == "blurry"
+    assert params.model == "sdxl"
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+import MuseLog.json_sidecar as json_sidecar
+from MuseLog.json_sidecar import extract_top_level_keys
+
+_NODES = {
+    str(i): {
+        "class_type": "CLIPTextEncode",
+        "inputs": {"text": 'a "quoted" {brace} [bracket] \\ 电影感光影\n' * (i % 3 + 1), "links": [[i, 0], [i + 1, 1]]},
+        "widgets_values": [i, None, True, "}]"],
+    }
+    for i in range(200)
+}
+
+
+def _write(tmp_path, data, name="workflow.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk", [7, 64, 4096])
+def test_keys_after_large_value(tmp_path, monkeypatch, chunk):
+    # 块很小时字符串、转义与括号都会跨块
+    monkeypatch.setattr(json_sidecar, "SIDECAR_SKIP_CHUNK", chunk)
+    path = _write(tmp_path, {"workflow": {"nodes": _NODES}, "extra": "x", "model": "sdxl", "prompt": {"text": "a cat"}})
+    assert extract_top_level_keys(path, ("model", "prompt")) == {"model": "sdxl", "prompt": {"text": "a cat"}}
+
+
+def test_value_over_limit_is_skipped(tmp_path):
+    path = _write(tmp_path, {"prompt": _NODES, "model": "sdxl"})
+    assert extract_top_level_keys(path, ("model", "prompt"), value_limit=1024) == {"model": "sdxl"}
+
+
+def test_not_an_object(tmp_path):
+    assert extract_top_level_keys(_write(tmp_path, [1, 2]), ("model",)) is None
+
+
+def test_unclosed_object(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"workflow": {"nodes": [1, 2, "]}"', encoding="utf-8")
+    with pytest.raises(ValueError):
+        extract_top_level_keys(str(path), ("model",))
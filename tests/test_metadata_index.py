@@ -0,0 +1,66 @@
+import os
+
+import MuseLog.metadata_index as metadata_index
+from MuseLog.explorer_metadata import FolderMetadata
+from MuseLog.metadata_index import MetadataIndex, crawl_root
+
+
+def _add_prompt(index: MetadataIndex, root: str, name: str, prompt: str) -> None:
+    folder = os.path.join(root, name)
+    data = FolderMetadata(folder, {"提示词.txt": os.path.join(folder, "提示词.txt")}, {"prompt": prompt})
+    index.upsert(root, data, 0, {}, [], [("提示词.txt", prompt)])
+
+
+def test_crawl_skips_unreadable_folder(tmp_path, monkeypatch):
+    root = tmp_path / "lib"
+    for name in ("a", "b", "c"):
+        (root / name / "frames").mkdir(parents=True)
+    scan_folder = metadata_index.scan_folder
+
+    def failing_scan(folder):
+        if os.path.basename(folder) == "b":
+            raise PermissionError(folder)
+        return scan_folder(folder)
+
+    monkeypatch.setattr(metadata_index, "scan_folder", failing_scan)
+    index = MetadataIndex(str(tmp_path / "index.sqlite3"))
+    try:
+        stats = crawl_root(index, str(root))
+    finally:
+        index.close()
+    assert stats.failed == 1
+    # 失败目录之后的目录仍被遍历
+    assert stats.visited == 6
+    assert stats.updated == 5
+    assert not stats.cancelled
+
+
+def test_search_prompt_shorter_than_trigram(tmp_path):
+    root = str(tmp_path / "lib")
+    index = MetadataIndex(str(tmp_path / "index.sqlite3"))
+    try:
+        _add_prompt(index, root, "short", "夜景")
+        _add_prompt(index, root, "long", "城市夜景, neon")
+        _add_prompt(index, root, "other", "森林, 少女")
+        index.commit()
+        assert {os.path.basename(hit.folder) for hit in index.search_prompts("夜景")} == {"short", "long"}
+        assert {os.path.basename(hit.folder) for hit in index.search_prompts("夜")} == {"short", "long"}
+        assert [os.path.basename(hit.folder) for hit in index.search_prompts("夜景 neon")] == ["long"]
+        assert index.search_prompts("景色") == []
+    finally:
+        index.close()
+
+
+def test_search_short_prompt_only(tmp_path):
+    # 短词不在任何 trigram 中时仍能找到短提示词
+    root = str(tmp_path / "lib")
+    index = MetadataIndex(str(tmp_path / "index.sqlite3"))
+    try:
+        _add_prompt(index, root, "short", "猫")
+        _add_prompt(index, root, "long", "dragon, 森林")
+        index.commit()
+        hits = index.search_prompts("猫")
+        assert [os.path.basename(hit.folder) for hit in hits] == ["short"]
+        assert hits[0].source == "提示词.txt"
+    finally:
+        index.close()